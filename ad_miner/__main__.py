@@ -1,18 +1,23 @@
 #!/usr/bin/env python3
 
+from __future__ import annotations
+
 # Built-in imports
 import json
+import multiprocessing as mp
 import shutil
 from pathlib import Path
 import time
 import traceback
 import signal
 import sys
+from typing import TYPE_CHECKING
 
 # Local library imports
 from ad_miner.sources.modules import logger, utils, generic_formating, main_page
-from ad_miner.sources.modules.neo4j_class import Neo4j, pre_request
 from ad_miner.sources.modules import controls
+from ad_miner.sources.modules.result_lifetime import ResultLifetime
+from ad_miner.sources.modules.memory_tracking import tracker as memory_tracker
 from ad_miner.sources.modules.common_analysis import (
     rating_color,
     generateDomainMapTrust,
@@ -31,11 +36,90 @@ from ad_miner.sources.modules.common_analysis import (
 )
 
 # Third party library imports
+# neo4j_class imports the neo4j driver, numpy and tqdm: it is only imported
+# once arguments are parsed, so that --help and argument errors are fast
+if TYPE_CHECKING:
+    from ad_miner.sources.modules.neo4j_class import Neo4j
 
 
 # Constants
 SOURCES_DIRECTORY = Path(__file__).parent / "sources"
 
+# Pages generated before controls: map trusts, users, computers, dc...
+GENERAL_PAGES = [
+    generateDomainMapTrust,
+    genNumberOfDCPage,
+    genUsersListPage,
+    genAllGroupsPage,
+    generateComputersListPage,
+    generateADCSListPage,
+    genAzureTenants,
+    genAzureUsers,
+    genAzureAdmin,
+    genAzureGroups,
+    genAzureVM,
+    genAzureDevices,
+    genAzureApps,
+]
+
+# Requests read by main_page.render, kept in memory until the end
+MAIN_PAGE_REQUESTS = [
+    "azure_admin",
+    "azure_apps",
+    "azure_devices",
+    "azure_groups",
+    "azure_tenants",
+    "azure_user",
+    "azure_vm",
+    "domains",
+    "nb_computers",
+    "nb_domain_admins",
+    "nb_domain_collected",
+    "nb_domain_controllers",
+    "nb_enabled_accounts",
+    "nb_groups",
+    "os",
+    "set_is_adcs",
+]
+
+# Requests that later requests depend on (TransitiveMemberOf relations):
+# always run, whatever config.json says, and the run stops if they fail
+MANDATORY_REQUESTS = ["set_membership_closure"]
+
+# Requests read by compute_common_cache, the general pages and the main page:
+# they are run whatever the selected controls
+COMMON_REQUESTS = [
+    "azure_admin",
+    "azure_apps",
+    "azure_devices",
+    "azure_groups",
+    "azure_tenants",
+    "azure_user",
+    "azure_vm",
+    "computers_admin_on_computers",
+    "computers_not_connected_since",
+    "domain_map_trust",
+    "domains",
+    "dormant_accounts",
+    "get_computers_linked_admin_group",
+    "get_groups_linked_admin_group",
+    "get_users_direct_admin",
+    "get_users_linked_admin_group",
+    "nb_computers",
+    "nb_domain_admins",
+    "nb_domain_collected",
+    "nb_domain_controllers",
+    "nb_enabled_accounts",
+    "nb_groups",
+    "nb_kerberoastable_accounts",
+    "objects_to_domain_admin",
+    "os",
+    "set_is_adcs",
+    "users_admin_on_computers",
+    "users_admin_on_servers_1",
+    "users_admin_on_servers_2",
+]
+
 
 # Catch ctrl-c correctly
 def handler(signum, frame):
@@ -82,22 +166,105 @@ def serialize_entire_dict(data):
     return serialize(data, set())
 
 
-def remove_fields(data):
-    return {
-        k: {x: y for x, y in v.items() if x not in ["output_type", "postProcessing"]}
-        for k, v in data.items()
-    }
+def dump_requests_knowledge(neo4j, requests_results, lifetime, file_path) -> None:
+    """Write every request (without output_type and postProcessing) and the
+    data computed from their results to a json file. Entries are serialized
+    one at a time, so that released results are read back one by one.
+
+    Args:
+        neo4j (Neo4j): An instance of the Neo4j class.
+        requests_results (dict): requests results and common cache.
+        lifetime (ResultLifetime): gives back released results.
+        file_path (str): path of the json file.
+    """
+
+    def entries():
+        for request_key, request in neo4j.all_requests.items():
+            knowledge = {
+                x: y
+                for x, y in request.items()
+                if x not in ["output_type", "postProcessing"]
+            }
+            if "result" in knowledge:
+                knowledge["result"] = lifetime.get(request_key)
+            yield request_key, knowledge
+        for k in requests_results:
+            if k not in neo4j.all_requests:
+                yield k, lifetime.get(k)
+
+    with open(file_path, "w") as f:
+        f.write("{")
+        separator = ""
+        for k, v in entries():
+            # Same layout as json.dump(..., indent=4) of the whole dict
+            entry = json.dumps({k: serialize_entire_dict(v)}, indent=4)[1:-2]
+            f.write(separator + entry)
+            separator = ","
+        f.write("\n}")
+
+
+def get_required_requests(neo4j: Neo4j, selected_controls: list) -> set:
+    """Requests needed by the selected controls.
+
+    Write requests and requests with a postProcessing prepare the database
+    or the cache for the following ones, they are always kept, as well as
+    COMMON_REQUESTS. Other requests are only kept if a selected control
+    declares them in its request_keys.
+
+    Args:
+        neo4j (Neo4j): An instance of the Neo4j class.
+        selected_controls (list): Control classes that will be run.
+
+    Returns:
+        set: keys of the requests to run.
+    """
+    if len(selected_controls) == len(controls.control_list):
+        return set(neo4j.all_requests.keys())
+
+    required = set(COMMON_REQUESTS)
+    for control in selected_controls:
+        required.update(control.request_keys)
+    for request_key, request in neo4j.all_requests.items():
+        if request.get("is_a_write_request") or request.get("postProcessing"):
+            required.add(request_key)
+
+    return required
+
+
+def get_profiled_requests(neo4j: Neo4j, arguments) -> list:
+    """Requests selected with --profile_queries (comma-separated keys, or all).
+
+    Args:
+        neo4j (Neo4j): An instance of the Neo4j class.
+        arguments: Parsed command line arguments.
+
+    Returns:
+        list: keys of the requests to profile.
+    """
+    if arguments.profile_queries == "all":
+        return list(neo4j.all_requests.keys())
+
+    request_keys = []
+    for request_key in arguments.profile_queries.split(","):
+        request_key = request_key.strip()
+        if request_key in neo4j.all_requests:
+            request_keys.append(request_key)
+        elif request_key:
+            logger.print_warning("Unknown request to profile : %s" % request_key)
+    return request_keys
 
 
 # Do all the requests (if cached, retrieve from cache, else store in cache)
-def populate_data_and_cache(neo4j: Neo4j) -> dict:
+def populate_data_and_cache(neo4j: Neo4j, selected_controls: list) -> dict:
     """Populate data and cache it based on configuration settings.
 
     This function reads a configuration file (config.json) and determines
     whether to execute specific requests or skip them based on the configuration.
+    Requests that none of the selected controls need are skipped as well.
 
     Args:
         neo4j (Neo4j): An instance of the Neo4j class.
+        selected_controls (list): Control classes that will be run.
 
     Returns:
         None: This function does not return any values.
@@ -115,24 +282,63 @@ def populate_data_and_cache(neo4j: Neo4j) -> dict:
     except (FileNotFoundError, json.JSONDecodeError) as error:
         logger.print_error(f"Error while parsing {config_file_path}: {error}")
 
+    required_requests = get_required_requests(neo4j, selected_controls)
+
     nb_requests = len(neo4j.all_requests.keys())
     requests_count = 0
 
+    # With --async_requests, read requests are queued until the next write
+    # or postProcessing request (or the end), then run together
+    concurrent_requests = []
+    concurrent = neo4j.arguments.async_requests and not neo4j.arguments.cluster
+
+    def run_concurrent_requests():
+        if not concurrent_requests:
+            return
+        with memory_tracker.step(
+            "request", "%d concurrent requests" % len(concurrent_requests)
+        ):
+            neo4j.process_concurrent_requests(neo4j, concurrent_requests)
+        concurrent_requests.clear()
+
     for request_key in neo4j.all_requests.keys():
         requests_count = requests_count + 1
         print(f"[{requests_count}/{nb_requests}] ", end="")
         req = neo4j.all_requests[request_key]
-        if not config_data.get(request_key) or config_data[request_key] == "true":
+        if request_key not in required_requests:
+            req["result"] = None
+            logger.print_warning(
+                "Skipping request : %s    (not used by selected controls)" % request_key
+            )
+        elif (
+            request_key in MANDATORY_REQUESTS
+            or not config_data.get(request_key)
+            or config_data[request_key] == "true"
+        ):
+            if concurrent and neo4j.concurrentRead(neo4j, request_key):
+                logger.print_debug("Queued : %s" % req["name"])
+                concurrent_requests.append(request_key)
+                continue
+            if "is_a_write_request" in req or "postProcessing" in req:
+                run_concurrent_requests()
             try:
-                neo4j.process_request(neo4j, request_key)
+                with memory_tracker.step("request", request_key):
+                    neo4j.process_request(neo4j, request_key)
             except Exception as error:  # FIXME specify exception
                 logger.print_error(error)
                 logger.print_error(traceback.format_exc())
+                if request_key in MANDATORY_REQUESTS:
+                    logger.print_error(
+                        "%s is needed by the following requests, stopping" % request_key
+                    )
+                    sys.exit(-1)
 
         else:
             req["result"] = None
             logger.print_warning("Skipping request : %s    (config.json)" % request_key)
 
+    run_concurrent_requests()
+
     logger.print_success("Requests finished !")
 
     requests_results = {}
@@ -144,11 +350,115 @@ def populate_data_and_cache(neo4j: Neo4j) -> dict:
                 f"No result found for request {request_key}. Trying to generate incomplete report."
             )
 
-    neo4j.compute_common_cache(requests_results)
+    with memory_tracker.step("common_cache", "compute_common_cache"):
+        neo4j.compute_common_cache(requests_results)
 
     return requests_results
 
 
+def run_control(control_class, arguments, requests_results):
+    """Run a control and return only what the main page needs from it.
+
+    Returns:
+        dict: the control outputs (None if the control could not be created).
+    """
+    t_start = time.time()
+    cpu_start = time.process_time()
+    control = None
+    try:
+        control = control_class(arguments, requests_results)
+        logger.print_debug(str("Generating control " + control.control_key))
+        with memory_tracker.step("control", control.control_key) as memory:
+            control.run()
+
+        output = {
+            "control_key": control.control_key,
+            "category": control.category,
+            "azure_or_onprem": control.azure_or_onprem,
+            "description": control.get_dico_description(),
+            "name_description": control.name_description,
+            "rating": control.get_rating(),
+            "data": control.data,
+            "failed": False,
+            "memory": memory,
+        }
+
+        d = round(time.time() - t_start, 2)
+        logger.print_warning(str("Done in " + str(d) + "s"))
+        output["wall"] = time.time() - t_start
+        output["cpu"] = time.process_time() - cpu_start
+        return output
+    except Exception as e:
+        logger.print_error("Error while running the following control: ")
+        logger.print_error(control_class.control_key)
+        logger.print_error(e)
+        logger.print_error(traceback.format_exc())
+
+        try:
+            return {
+                "control_key": control.control_key,
+                "category": control.category,
+                "azure_or_onprem": control.azure_or_onprem,
+                "description": control.get_dico_description(),
+                "name_description": f"{control.title} analysis failed (control crashed).",
+                "rating": -1,
+                "data": None,
+                "failed": True,
+                "wall": time.time() - t_start,
+                "cpu": time.process_time() - cpu_start,
+            }
+        except Exception as e:
+            logger.print_error("Error while trying to add the control as disabled.")
+            logger.print_error(e)
+            logger.print_error(traceback.format_exc())
+            return None
+
+
+# Requests results inherited by forked control workers (copy-on-write)
+_shared_requests_results = None
+
+
+def _run_control_in_worker(control_class, arguments):
+    return run_control(control_class, arguments, _shared_requests_results)
+
+
+def run_controls(arguments, requests_results, selected_controls, lifetime) -> list:
+    """Run the selected controls, in forked worker processes if
+    --parallel_controls is set. Workers share the requests results with
+    the main process and only send back the small control outputs.
+    Results are released once the last control reading them is done
+    (once every control is done in parallel mode).
+
+    Returns:
+        list: control outputs, in the order of selected_controls.
+    """
+    if not arguments.parallel_controls or "fork" not in mp.get_all_start_methods():
+        outputs = []
+        for position, control_class in enumerate(selected_controls):
+            outputs.append(run_control(control_class, arguments, requests_results))
+            lifetime.control_done(position)
+        return outputs
+
+    global _shared_requests_results
+    _shared_requests_results = requests_results
+    try:
+        with mp.get_context("fork").Pool(arguments.nb_cores) as pool:
+            outputs = pool.starmap(
+                _run_control_in_worker,
+                [(c, arguments) for c in selected_controls],
+                chunksize=1,
+            )
+    finally:
+        _shared_requests_results = None
+
+    # Memory of each control was measured in its worker
+    memory_tracker.add_steps(output.get("memory") for output in outputs if output)
+
+    for position in range(len(selected_controls)):
+        lifetime.control_done(position)
+    return outputs
+
+
 def prepare_render(arguments) -> None:
     """Prepares the render folder by copying necessary assets.
 
@@ -189,6 +499,8 @@ def main() -> None:
     """Main execution function for the script."""
     start = time.time()
     arguments = utils.args()
+    if arguments.memory_profile:
+        memory_tracker.start()
     cache_check = utils.cache_check(f"{arguments.cache_prefix}_*", arguments.cache)
 
     if cache_check["nb_cache"] > 0:
@@ -206,9 +518,9 @@ def main() -> None:
 
     prepare_render(arguments)
 
-    neo4j_version, extract_date, total_objects, number_relations, boolean_azure = (
-        pre_request(arguments)
-    )
+    from ad_miner.sources.modules.neo4j_class import Neo4j, pre_request
+
+    neo4j_version, extract_date, statistics, boolean_azure = pre_request(arguments)
     arguments.boolean_azure = boolean_azure
     version = neo4j_version.get("version")
     logger.print_success("Your neo4j database uses neo4j version " + version)
@@ -219,9 +531,7 @@ def main() -> None:
         )
         sys.exit(-1)
 
-    number_objects = sum([type_label["number_type"] for type_label in total_objects])
-
-    if number_objects == 0:
+    if statistics.total_nodes == 0:
         logger.print_error(
             "Empty neo4j database : you need to collect data with Sharphound (https://github.com/BloodHoundAD/SharpHound), BloodHound.py (https://github.com/dirkjanm/BloodHound.py) or RustHound (https://github.com/NH-RED-TEAM/RustHound)"
         )
@@ -232,27 +542,50 @@ def main() -> None:
 
     string_information_database = ""
 
-    for type_label in total_objects:
-        type_label_2 = generic_formating.clean_label(type_label["labels(x)"])
+    for label, number in statistics.labels.items():
+        label = generic_formating.clean_label([label])
 
-        if type_label_2 != "":
-            string_information_database += (
-                f"{type_label_2} : {type_label['number_type']} | "
-            )
+        if label != "" and number > 0:
+            string_information_database += f"{label} : {number} | "
 
-    string_information_database += f"Relations : {number_relations}"
+    string_information_database += f"Relations : {statistics.total_relations}"
     logger.print_magenta(string_information_database)
 
     if arguments.extract_date:
         extract_date = arguments.extract_date
     arguments.extract_date = extract_date
 
-    neo4j = Neo4j(arguments, extract_date, boolean_azure)
+    neo4j = Neo4j(arguments, extract_date, boolean_azure, statistics)
+
+    if arguments.cache:
+        neo4j.check_cache_fingerprint(neo4j)
 
     if arguments.cluster:
         neo4j.verify_integrity(neo4j)
 
-    requests_results = populate_data_and_cache(neo4j)
+    if arguments.create_indexes:
+        neo4j.create_indexes(neo4j)
+
+    if arguments.audit_queries:
+        neo4j.audit_queries(neo4j, f"query_plans_{arguments.cache_prefix}.json")
+
+    selected_controls = controls.select_controls(arguments)
+    if len(selected_controls) < len(controls.control_list):
+        logger.print_magenta(
+            f"{len(selected_controls)}/{len(controls.control_list)} controls selected"
+        )
+
+    requests_results = populate_data_and_cache(neo4j, selected_controls)
+    neo4j.save_cache_fingerprint(neo4j)
+
+    # Once write requests have set the flags (path_candidate, is_dag...)
+    # that read requests filter on
+    if arguments.profile_queries:
+        neo4j.profile_queries(
+            neo4j,
+            get_profiled_requests(neo4j, arguments),
+            f"query_profiles_{arguments.cache_prefix}.json",
+        )
 
     # Define legacy dicts
     dico_name_description = {}
@@ -292,71 +625,32 @@ def main() -> None:
 
     # Generate general pages: map trusts, users, computers, dc
 
-    generateDomainMapTrust(requests_results, arguments)
-    genNumberOfDCPage(requests_results, arguments)
-    genUsersListPage(requests_results, arguments)
-    genAllGroupsPage(requests_results, arguments)
-    generateComputersListPage(requests_results, arguments)
-    generateADCSListPage(requests_results, arguments)
-    genAzureTenants(requests_results, arguments)
-    genAzureUsers(requests_results, arguments)
-    genAzureAdmin(requests_results, arguments)
-    genAzureGroups(requests_results, arguments)
-    genAzureVM(requests_results, arguments)
-    genAzureDevices(requests_results, arguments)
-    genAzureApps(requests_results, arguments)
-
-    # Run controls, generate secondary pages, and populate legacy dicts
-    for c in controls.control_list:
-        t_start = time.time()
-        try:
-            control = c(arguments, requests_results)
-            logger.print_debug(str("Generating control " + control.control_key))
-            control.run()
-
-            dico_category[control.category].append(control.control_key)
-
-            DESCRIPTION_MAP[control.control_key] = {
-                "title": control.title,
-                "description": control.description,
-                "interpretation": control.interpretation,
-                "risk": control.risk,
-                "poa": control.poa,
-            }
-
-            dico_name_description[control.control_key] = control.name_description
-
-            data_rating[control.azure_or_onprem][control.get_rating()].append(
-                control.control_key
-            )
+    for generate_page in GENERAL_PAGES:
+        generate_page(requests_results, arguments)
 
-            dico_data["value"][control.control_key] = control.data
+    # Results only needed by compute_common_cache and the general pages
+    lifetime = ResultLifetime(
+        neo4j, requests_results, selected_controls, MAIN_PAGE_REQUESTS
+    )
+    lifetime.release_unused()
 
-            d = round(time.time() - t_start, 2)
-            logger.print_warning(str("Done in " + str(d) + "s"))
-        except Exception as e:
-            logger.print_error("Error while running the following control: ")
-            logger.print_error(control.control_key)
-            logger.print_error(e)
-            logger.print_error(traceback.format_exc())
+    # Run controls, generate secondary pages, and populate legacy dicts
+    for output in run_controls(
+        arguments, requests_results, selected_controls, lifetime
+    ):
+        if output is None:
+            continue
+        control_key = output["control_key"]
+        neo4j.telemetry.control(
+            control_key, output["failed"], output["wall"], output["cpu"]
+        )
 
-            try:
-                dico_category[control.category].append(control.control_key)
-                dico_name_description[control.control_key] = (
-                    f"{control.title} analysis failed (control crashed)."
-                )
-                data_rating[control.azure_or_onprem][-1].append(control.control_key)
-                DESCRIPTION_MAP[control.control_key] = {
-                    "title": control.title,
-                    "description": control.description,
-                    "interpretation": control.interpretation,
-                    "risk": control.risk,
-                    "poa": control.poa,
-                }
-            except Exception as e:
-                logger.print_error("Error while trying to add the control as disabled.")
-                logger.print_error(e)
-                logger.print_error(traceback.format_exc())
+        dico_category[output["category"]].append(control_key)
+        DESCRIPTION_MAP[control_key] = output["description"]
+        dico_name_description[control_key] = output["name_description"]
+        data_rating[output["azure_or_onprem"]][output["rating"]].append(control_key)
+        if not output["failed"]:
+            dico_data["value"][control_key] = output["data"]
 
     dico_rating_color = rating_color(data_rating)
 
@@ -372,16 +666,17 @@ def main() -> None:
     )
     neo4j.close()
 
+    neo4j.telemetry.summary()
+    neo4j.telemetry.close()
+    memory_tracker.report(f"memory_profile_{arguments.cache_prefix}.json")
+
     logger.print_success(
         f"{utils.timer_format(time.time() - start)}! Program finished. Report generated in render_{arguments.cache_prefix}"
     )
 
-    requests_knowledge = remove_fields(neo4j.all_requests)
-    for k, v in requests_results.items():
-        if k not in requests_knowledge.keys():
-            requests_knowledge[k] = v
-    with open("agent/llm_assets/requests_results.json", "w") as f:
-        json.dump(serialize_entire_dict(requests_knowledge), f, indent=4)
+    dump_requests_knowledge(
+        neo4j, requests_results, lifetime, "agent/llm_assets/requests_results.json"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,312 @@
+# Benchmark of the controls and pages of AD Miner, without neo4j.
+#
+# Requests results are read from cache_neo4j (results of a previous run,
+# --cache_prefix) or generated by synthetic_dataset.py (--size). Then
+# compute_common_cache, each general page and each control (__init__ and
+# run(), which generates its pages) are timed separately, with the size
+# and number of pages they write in render_<prefix>.
+#
+# Timings can be saved as a baseline (--save_baseline) and later runs
+# compared with it: a step is a regression when it is slower than the
+# baseline by more than --threshold (ratio) and --min_delta (seconds).
+# The exit code is 1 when a regression is found.
+#
+# Usage:
+#   python -m ad_miner.scripts.benchmark_controls --size 100k --save_baseline baseline_100k.json
+#   python -m ad_miner.scripts.benchmark_controls --size 100k --baseline baseline_100k.json
+#   python -m ad_miner.scripts.benchmark_controls --cache_prefix Audit --controls users_admin_of_computers
+
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from ad_miner.__main__ import GENERAL_PAGES, prepare_render
+from ad_miner.scripts import synthetic_dataset
+from ad_miner.sources.modules import controls, logger, utils
+from ad_miner.sources.modules.membership_closure import MembershipClosure
+from ad_miner.sources.modules.neo4j_class import Neo4j
+
+# Extraction date used when the results do not come from a real run
+DEFAULT_EXTRACT_DATE = "20231114"
+
+
+def args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark AD Miner controls and pages on cached or synthetic requests results"
+    )
+    parser.add_argument(
+        "--cache_prefix",
+        default=None,
+        help="Read requests results from cache_neo4j/<cache_prefix>_*",
+    )
+    parser.add_argument(
+        "--size",
+        default=None,
+        choices=synthetic_dataset.PRESETS.keys(),
+        help="Generate synthetic requests results of this size instead",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--controls",
+        default="",
+        help="Only benchmark these controls. ex : kerberoastables,as_rep,...",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of runs of each step, the fastest one is kept",
+    )
+    parser.add_argument(
+        "--extract_date",
+        default=DEFAULT_EXTRACT_DATE,
+        help="Extract date of the results (e.g., 20220131)",
+    )
+    parser.add_argument("--baseline", default=None, help="Baseline to compare with")
+    parser.add_argument(
+        "--save_baseline", default=None, help="Write the timings in this file"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.5,
+        help="Slowdown ratio above which a step is a regression. Default: 1.5",
+    )
+    parser.add_argument(
+        "--min_delta",
+        type=float,
+        default=0.1,
+        help="Slowdowns shorter than this (in seconds) are ignored. Default: 0.1",
+    )
+    arguments = parser.parse_args()
+    if (arguments.cache_prefix is None) == (arguments.size is None):
+        parser.error("one of --cache_prefix and --size is required")
+    return arguments
+
+
+def load_requests_results(neo4j, benchmark_arguments):
+    """Results of every request, like populate_data_and_cache does,
+    without running post processings (they write to neo4j)"""
+    if benchmark_arguments.size:
+        counts = synthetic_dataset.PRESETS[benchmark_arguments.size]
+        environment = synthetic_dataset.SyntheticEnvironment(
+            benchmark_arguments.seed, **counts
+        )
+        template = synthetic_dataset.load_template(synthetic_dataset.DEFAULT_TEMPLATE)
+        results = synthetic_dataset.synthetic_requests_results(environment, template)
+    else:
+        results = {}
+        for request_key in neo4j.all_requests:
+            result = neo4j.cache.retrieveCacheEntry(request_key)
+            if result is False:
+                logger.print_warning("No cached result for %s" % request_key)
+                result = None
+            results[request_key] = result
+
+    requests_results = {}
+    for request_key, request in neo4j.all_requests.items():
+        request["result"] = results.get(request_key)
+        requests_results[request_key] = request["result"]
+
+    # State normally set by the set_membership_closure post processing
+    neo4j.membership_closure = MembershipClosure(
+        results.get("set_membership_closure") or []
+    )
+    return requests_results
+
+
+def render_files(folder):
+    """Size of every file of the render folder, by path"""
+    files = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            path = os.path.join(root, name)
+            files[path] = os.path.getsize(path)
+    return files
+
+
+class Step:
+    """Fastest of the timed runs of a benchmark step, with what it wrote
+    in the render folder"""
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.timings = {}
+        self.bytes = 0
+        self.pages = 0
+        self.failed = False
+
+    def time(self, phase, function, *function_args):
+        start = time.perf_counter()
+        result = function(*function_args)
+        duration = time.perf_counter() - start
+        self.timings[phase] = min(duration, self.timings.get(phase, duration))
+        return result
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "timings": self.timings,
+            "total": self.total,
+            "bytes": self.bytes,
+            "pages": self.pages,
+            "failed": self.failed,
+        }
+
+
+def measure(step, folder, repeat, phases):
+    """Run the phases of a step (list of (name, callable)), repeat times"""
+    before = render_files(folder)
+    for _ in range(repeat):
+        try:
+            state = None
+            for phase, function in phases:
+                state = step.time(phase, function, state)
+        except Exception as e:
+            logger.print_error("%s %s failed : %s" % (step.kind, step.name, e))
+            logger.print_error(traceback.format_exc())
+            step.failed = True
+            break
+    after = render_files(folder)
+    written = [path for path, size in after.items() if before.get(path) != size]
+    step.bytes = sum(after[path] for path in written)
+    step.pages = sum(1 for path in written if path.endswith(".html"))
+    return step
+
+
+def run_benchmark(arguments, requests_results, neo4j, benchmark_arguments):
+    folder = "render_%s" % arguments.cache_prefix
+    repeat = benchmark_arguments.repeat
+    steps = []
+
+    steps.append(
+        measure(
+            Step("cache", "compute_common_cache"),
+            folder,
+            1,  # compute_common_cache adds its results to requests_results
+            [("run", lambda _: neo4j.compute_common_cache(requests_results))],
+        )
+    )
+
+    for generate_page in GENERAL_PAGES:
+        steps.append(
+            measure(
+                Step("page", generate_page.__name__),
+                folder,
+                repeat,
+                [("run", lambda _, g=generate_page: g(requests_results, arguments))],
+            )
+        )
+
+    for control_class in controls.select_controls(arguments):
+        logger.print_debug("Benchmarking control %s" % control_class.control_key)
+        steps.append(
+            measure(
+                Step("control", control_class.control_key),
+                folder,
+                repeat,
+                [
+                    (
+                        "init",
+                        lambda _, c=control_class: c(arguments, requests_results),
+                    ),
+                    ("run", lambda control: control.run()),
+                ],
+            )
+        )
+    return steps
+
+
+def compare(steps, baseline, threshold, min_delta):
+    """Steps slower than in the baseline, as (step, baseline total)"""
+    regressions = []
+    for step in steps:
+        reference = baseline.get(step.name)
+        if reference is None or step.failed:
+            continue
+        if (
+            step.total > reference["total"] * threshold
+            and step.total - reference["total"] > min_delta
+        ):
+            regressions.append((step, reference["total"]))
+    return regressions
+
+
+def print_report(steps, baseline):
+    print(
+        "%-10s %-45s %9s %9s %9s %7s %11s"
+        % ("kind", "name", "init", "run", "baseline", "pages", "bytes")
+    )
+    for step in sorted(steps, key=lambda s: -s.total):
+        reference = baseline.get(step.name, {}).get("total")
+        print(
+            "%-10s %-45s %9s %9.3f %9s %7d %11d%s"
+            % (
+                step.kind,
+                step.name,
+                "%.3f" % step.timings["init"] if "init" in step.timings else "",
+                step.timings.get("run", 0),
+                "%.3f" % reference if reference is not None else "",
+                step.pages,
+                step.bytes,
+                " (failed)" if step.failed else "",
+            )
+        )
+
+
+def main():
+    benchmark_arguments = args()
+    cache_prefix = benchmark_arguments.cache_prefix or (
+        "synthetic_" + benchmark_arguments.size
+    )
+    arguments = utils.args(
+        ["-cf", cache_prefix, "--only_controls", benchmark_arguments.controls]
+    )
+    arguments.extract_date = benchmark_arguments.extract_date
+    arguments.boolean_azure = False
+
+    prepare_render(arguments)
+    # No connection is made: results are not requested to neo4j
+    neo4j = Neo4j(arguments, arguments.extract_date, False)
+    requests_results = load_requests_results(neo4j, benchmark_arguments)
+
+    steps = run_benchmark(arguments, requests_results, neo4j, benchmark_arguments)
+
+    baseline = {}
+    if benchmark_arguments.baseline:
+        baseline = json.loads(Path(benchmark_arguments.baseline).read_text())
+    print_report(steps, baseline)
+
+    if benchmark_arguments.save_baseline:
+        Path(benchmark_arguments.save_baseline).write_text(
+            json.dumps({step.name: step.as_dict() for step in steps}, indent=4)
+        )
+        logger.print_success(
+            "Baseline written in %s" % benchmark_arguments.save_baseline
+        )
+
+    regressions = compare(
+        steps, baseline, benchmark_arguments.threshold, benchmark_arguments.min_delta
+    )
+    for step, reference in regressions:
+        logger.print_error(
+            "Regression : %s %s took %.3fs instead of %.3fs"
+            % (step.kind, step.name, step.total, reference)
+        )
+    if regressions:
+        sys.exit(1)
+    logger.print_success("%d steps benchmarked, no regression" % len(steps))
+
+
+if __name__ == "__main__":
+    main()
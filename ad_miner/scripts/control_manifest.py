@@ -0,0 +1,124 @@
+# Manifest of the controls of AD Miner (controls/manifest.json).
+#
+# AD Miner reads the manifest at startup instead of importing every
+# control module: a control module is only imported when the control is
+# about to run. The manifest is built from the source of the modules,
+# without importing them: for each class decorated with
+# @register_control, its control_key, request_keys, and the category and
+# azure_or_onprem set in its __init__.
+#
+# Run it after adding a control or changing the request_keys of one.
+# Control modules missing from the manifest still work, but they are
+# imported at startup.
+#
+# Usage:
+#   python -m ad_miner.scripts.control_manifest
+#   python -m ad_miner.scripts.control_manifest --check
+
+
+import argparse
+import ast
+import json
+import os
+import sys
+from pathlib import Path
+
+# Not imported from the controls package, which reads the manifest
+CONTROLS_DIRECTORY = Path(__file__).parents[1] / "sources" / "modules" / "controls"
+MANIFEST_PATH = CONTROLS_DIRECTORY / "manifest.json"
+
+
+def literal(node):
+    """Value of a literal node, None if it is not a literal"""
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def is_registered(class_node):
+    return any(
+        getattr(decorator, "id", None) == "register_control"
+        for decorator in class_node.decorator_list
+    )
+
+
+def control_entry(module_name, class_node):
+    """Manifest entry of a control class"""
+    entry = {
+        "control_key": None,
+        "module": module_name,
+        "class_name": class_node.name,
+        "category": None,
+        "azure_or_onprem": None,
+        "request_keys": [],
+    }
+    for statement in class_node.body:
+        if isinstance(statement, ast.Assign):
+            for target in statement.targets:
+                if isinstance(target, ast.Name) and target.id in (
+                    "control_key",
+                    "request_keys",
+                ):
+                    entry[target.id] = literal(statement.value)
+        elif isinstance(statement, ast.FunctionDef) and statement.name == "__init__":
+            for node in ast.walk(statement):
+                if not isinstance(node, ast.Assign):
+                    continue
+                for target in node.targets:
+                    if (
+                        isinstance(target, ast.Attribute)
+                        and isinstance(target.value, ast.Name)
+                        and target.value.id == "self"
+                        and target.attr in ("category", "azure_or_onprem")
+                    ):
+                        entry[target.attr] = literal(node.value)
+    return entry
+
+
+def build_manifest():
+    """Entries of every control, ordered by module name"""
+    manifest = []
+    for filename in sorted(os.listdir(CONTROLS_DIRECTORY)):
+        if filename == "__init__.py" or not filename.endswith(".py"):
+            continue
+        module_name = filename[:-3]
+        tree = ast.parse((CONTROLS_DIRECTORY / filename).read_text(encoding="utf-8"))
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and is_registered(node):
+                entry = control_entry(module_name, node)
+                if not entry["control_key"]:
+                    print("No literal control_key in %s.%s" % (module_name, node.name))
+                    sys.exit(1)
+                manifest.append(entry)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the manifest of AD Miner controls"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check that the manifest is up to date (exit code 1 otherwise)",
+    )
+    arguments = parser.parse_args()
+
+    manifest = build_manifest()
+    if arguments.check:
+        current = (
+            json.loads(MANIFEST_PATH.read_text()) if MANIFEST_PATH.exists() else []
+        )
+        if current != manifest:
+            print("%s is outdated, run this script without --check" % MANIFEST_PATH)
+            sys.exit(1)
+        print("%s is up to date (%d controls)" % (MANIFEST_PATH, len(manifest)))
+        return
+
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=4) + "\n")
+    print("%d controls written in %s" % (len(manifest), MANIFEST_PATH))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,487 @@
+# Replay of the path requests of requests.json on an in-memory graph,
+# to compare path search strategies without a neo4j database.
+#
+# A snapshot holds the relations followed by path requests and, for each
+# request with native_sources / native_targets, its source ids and its
+# targets with their partition. It is captured from neo4j (--bolt, and
+# saved with --save_snapshot), read from a file saved before (--snapshot)
+# or generated by synthetic_dataset.py (--size). On synthetic data the
+# sources and targets are the objects AD Miner would flag, see
+# SYNTHETIC_ENDPOINTS (requests not listed there are not replayed).
+#
+# Every request is replayed by each backend (see BACKENDS):
+#   - shortest_path : one breadth-first search per source, like the
+#     cypher shortestPath requests (at most --level relations)
+#   - dijkstra : one Dijkstra search per source on exploitability
+#     ratings, like the GDS requests
+#   - native_bfs / native_dijkstra : one reverse search per partition of
+#     targets, the engine used with --native_paths (graph_engine.py)
+# The runtime of each backend is reported, and its memory peak with
+# --memory (measured in a second run, tracemalloc slows python down).
+# Results are compared with the first backend of the same metric (hops
+# or exploitability): (source, target) pairs missing or extra, and
+# pairs whose shortest path has a different length or cost. Shortest
+# paths of the same length can differ, so only lengths are compared.
+#
+# Usage:
+#   python -m ad_miner.scripts.replay_paths --size 10k
+#   python -m ad_miner.scripts.replay_paths -b bolt://localhost:7687 -u neo4j -p bloodhoundcommunityedition --save_snapshot snapshot.json
+#   python -m ad_miner.scripts.replay_paths --snapshot snapshot.json --backends native_bfs,shortest_path --sample 0
+
+
+import argparse
+import json
+import random
+import time
+from heapq import heappop, heappush
+from pathlib import Path
+
+from ad_miner.scripts import synthetic_dataset
+from ad_miner.sources.modules import logger, utils
+from ad_miner.sources.modules.graph_engine import (
+    GraphSnapshot,
+    shortest_paths_to_targets,
+)
+from ad_miner.sources.modules.memory_tracking import MemoryTracker
+from ad_miner.sources.modules.neo4j_class import Neo4j, pre_request
+
+# Extraction date used when the snapshot does not come from neo4j
+DEFAULT_EXTRACT_DATE = "20231114"
+
+# Groups flagged is_dag (domain admin groups) by AD Miner
+DOMAIN_ADMIN_GROUPS = ["DOMAIN ADMINS", "ENTERPRISE ADMINS", "ADMINISTRATORS"]
+
+# Labels of the objects that can be flagged path_candidate
+CANDIDATE_LABELS = ["User", "Computer", "Group", "OU", "GPO"]
+
+
+def synthetic_flags(environment):
+    """Objects of a synthetic environment flagged like AD Miner does:
+    is_dag, is_dc, path_candidate and target_kud"""
+    flags = {"is_dag": {}, "is_dc": set()}
+    for domain in environment.domains:
+        for group_name in DOMAIN_ADMIN_GROUPS:
+            flags["is_dag"][environment.builtin[(domain, group_name)]] = domain
+
+    candidates = []
+    target_kud = []
+    enabled = set()
+    for object_id, label, name, _, _ in environment.objects:
+        if label not in CANDIDATE_LABELS or object_id in flags["is_dag"]:
+            continue
+        properties = environment.properties(object_id)
+        if properties.get("isdc"):
+            flags["is_dc"].add(object_id)
+            continue
+        if properties.get("enabled"):
+            enabled.add(object_id)
+        elif label == "User":
+            continue
+        if name.startswith("DOMAIN CONTROLLERS@"):
+            continue
+        candidates.append(object_id)
+        if properties.get("unconstraineddelegation"):
+            target_kud.append(object_id)
+
+    flags["path_candidate"] = candidates
+    flags["target_kud"] = target_kud
+    flags["enabled"] = enabled
+    return flags
+
+
+def objects_to_domain_admin(environment, flags):
+    # One partition per domain admin group, like native_targets
+    return flags["path_candidate"], [[group, group] for group in flags["is_dag"]]
+
+
+def kud(environment, flags):
+    sources = [
+        object_id
+        for object_id in flags["path_candidate"]
+        if environment.objects[object_id][1] == "Computer"
+        or (
+            environment.objects[object_id][1] == "User"
+            and object_id in flags["enabled"]
+        )
+    ]
+    return sources, [[target, target] for target in flags["target_kud"]]
+
+
+def objects_to_dcsync(environment, flags):
+    targets = list(flags["is_dag"]) + sorted(flags["is_dc"])
+    targets += [
+        environment.builtin[(domain, "DOMAIN CONTROLLERS")]
+        for domain in environment.domains
+    ]
+    return flags["path_candidate"], [[target, target] for target in targets]
+
+
+# Sources and targets of the native path requests on synthetic data
+SYNTHETIC_ENDPOINTS = {
+    "objects_to_domain_admin": objects_to_domain_admin,
+    "kud": kud,
+    "objects_to_dcsync": objects_to_dcsync,
+}
+
+
+def synthetic_snapshot(size, seed, neo4j):
+    """Snapshot of a synthetic environment of a preset size"""
+    environment = synthetic_dataset.SyntheticEnvironment(
+        seed, **synthetic_dataset.PRESETS[size]
+    )
+    flags = synthetic_flags(environment)
+    requests = {}
+    for request_key, endpoints in SYNTHETIC_ENDPOINTS.items():
+        sources, targets = endpoints(environment, flags)
+        requests[request_key] = {
+            "sources": sources,
+            "targets": targets,
+            "relations": neo4j.all_requests[request_key]["native_relations"],
+        }
+    return {"relations": list(environment.relations()), "requests": requests}
+
+
+def neo4j_snapshot(neo4j):
+    """Snapshot of the neo4j database, for every native path request"""
+    neo4j.graph_snapshot = neo4j.loadGraphSnapshot(neo4j)
+    requests = {}
+    for request_key, request in neo4j.all_requests.items():
+        if "native_targets" not in request:
+            continue
+        sources, target_partitions = neo4j.nativeEndpoints(neo4j, request_key)
+        requests[request_key] = {
+            "sources": sources,
+            "targets": [
+                [target, partition]
+                for partition, targets in target_partitions.items()
+                for target in targets
+            ],
+            "relations": request["native_relations"],
+        }
+        logger.print_debug(
+            "%s : %d sources, %d targets"
+            % (request_key, len(sources), len(requests[request_key]["targets"]))
+        )
+    return {"relations": list(neo4j.graph_snapshot.relations()), "requests": requests}
+
+
+class ReplayGraph:
+    """Relations of a snapshot, in the forms used by the backends"""
+
+    def __init__(self, relations, ratings):
+        self.snapshot = GraphSnapshot(relations)
+        self.ratings = ratings
+        self.weights = self.snapshot.relation_weights(ratings)
+        self._adjacency = {}
+
+    def adjacency(self, relation_types, weighted):
+        """source id -> [(target id, cost)] following relation_types, the
+        cost being 1 or the exploitability rating of the relation"""
+        key = (relation_types, weighted)
+        if key not in self._adjacency:
+            allowed = set(relation_types)
+            adjacency = {}
+            for source, target, relation_type in self.snapshot.relations():
+                if relation_type not in allowed:
+                    continue
+                cost = self.weights[self.snapshot.type_index[relation_type]]
+                adjacency.setdefault(source, []).append(
+                    (target, cost if weighted else 1)
+                )
+            self._adjacency[key] = adjacency
+        return self._adjacency[key]
+
+    def path_cost(self, relation_types, weighted):
+        """Length or exploitability cost of a path"""
+        if not weighted:
+            return len(relation_types) - 1
+        return sum(
+            self.weights[self.snapshot.type_index[t]] for t in relation_types[:-1]
+        )
+
+
+class Replay:
+    """A request to replay: sampled sources, targets by partition,
+    relations followed and maximum length of unweighted paths"""
+
+    def __init__(self, request_key, sources, targets, relations, max_depth):
+        self.request_key = request_key
+        self.sources = sources
+        self.targets = set()
+        self.target_partitions = {}
+        for target, partition in targets:
+            self.targets.add(target)
+            self.target_partitions.setdefault(str(partition), []).append(target)
+        self.relations = tuple(relations.split("|"))
+        self.max_depth = max_depth
+
+
+def per_source_search(graph, replay, weighted):
+    """Shortest path cost from each source to each target, one search
+    per source (uniform cost search, breadth-first when unweighted),
+    like the cypher requests that ignore target partitions"""
+    adjacency = graph.adjacency(replay.relations, weighted)
+    costs = {}
+    for source in replay.sources:
+        remaining = len(replay.targets - {source})
+        best = {source: 0}
+        heap = [(0, source)]
+        done = set()
+        while heap and remaining:
+            cost, node = heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            if not weighted and cost > replay.max_depth:
+                break
+            if node != source and node in replay.targets:
+                costs[(source, node)] = cost
+                remaining -= 1
+            for neighbour, relation_cost in adjacency.get(node, ()):
+                neighbour_cost = cost + relation_cost
+                if neighbour_cost < best.get(neighbour, neighbour_cost + 1):
+                    best[neighbour] = neighbour_cost
+                    heappush(heap, (neighbour_cost, neighbour))
+    return costs
+
+
+def native_search(graph, replay, weighted):
+    """Shortest path cost from each source to the target reached in each
+    partition, computed by the native engine (one reverse search per
+    partition). A partition of several targets gives a single pair per
+    source, so the pairs to its other targets are reported missing."""
+    costs = {}
+    for partition, targets in replay.target_partitions.items():
+        for node_ids, relation_types in shortest_paths_to_targets(
+            graph.snapshot,
+            replay.sources,
+            {partition: targets},
+            replay.relations,
+            replay.max_depth,
+            graph.weights if weighted else None,
+        ):
+            costs[(node_ids[0], node_ids[-1])] = graph.path_cost(
+                relation_types, weighted
+            )
+    return costs
+
+
+# name -> (search, weighted)
+BACKENDS = {
+    "shortest_path": (per_source_search, False),
+    "dijkstra": (per_source_search, True),
+    "native_bfs": (native_search, False),
+    "native_dijkstra": (native_search, True),
+}
+
+
+def compare(reference, costs):
+    """Differences between the costs of two backends"""
+    return {
+        "missing": len(reference.keys() - costs.keys()),
+        "extra": len(costs.keys() - reference.keys()),
+        "different_cost": sum(
+            1
+            for pair in reference.keys() & costs.keys()
+            if reference[pair] != costs[pair]
+        ),
+    }
+
+
+def replay_request(graph, replay, backends, tracker):
+    """Results of every backend on a request"""
+    results = {}
+    references = {}
+    # Not timed, like the graph snapshot of native backends
+    for name in backends:
+        graph.adjacency(replay.relations, BACKENDS[name][1])
+    for name in backends:
+        search, weighted = BACKENDS[name]
+        start = time.perf_counter()
+        costs = search(graph, replay, weighted)
+        result = {
+            "time": time.perf_counter() - start,
+            "pairs": len(costs),
+            # Sources that native_write would flag
+            "flagged": len({source for source, _ in costs}),
+        }
+        if tracker.enabled:
+            with tracker.step(name, replay.request_key) as record:
+                search(graph, replay, weighted)
+            result["peak"] = record["peak"]
+
+        if weighted in references:
+            result["reference"] = references[weighted][0]
+            result.update(compare(references[weighted][1], costs))
+        else:
+            references[weighted] = (name, costs)
+        results[name] = result
+    return results
+
+
+def print_report(report):
+    print(
+        "%-28s %-16s %9s %9s %8s %8s %8s %8s %8s"
+        % (
+            "request",
+            "backend",
+            "time",
+            "peak MB",
+            "pairs",
+            "flagged",
+            "missing",
+            "extra",
+            "cost",
+        )
+    )
+    for request_key, results in report.items():
+        for name, result in results.items():
+            print(
+                "%-28s %-16s %9.3f %9s %8d %8d %8s %8s %8s"
+                % (
+                    request_key,
+                    name,
+                    result["time"],
+                    "%.1f" % (result["peak"] / 2**20) if "peak" in result else "",
+                    result["pairs"],
+                    result["flagged"],
+                    result.get("missing", ""),
+                    result.get("extra", ""),
+                    result.get("different_cost", ""),
+                )
+            )
+
+
+def args():
+    parser = argparse.ArgumentParser(
+        description="Replay AD Miner path requests on an in-memory graph with several path search backends"
+    )
+    parser.add_argument("--snapshot", default=None, help="Snapshot to replay")
+    parser.add_argument(
+        "--size",
+        default=None,
+        choices=synthetic_dataset.PRESETS.keys(),
+        help="Replay a synthetic environment of this size",
+    )
+    parser.add_argument("-b", "--bolt", default=None, help="Capture from this neo4j")
+    parser.add_argument("-u", "--username", default="neo4j")
+    parser.add_argument("-p", "--password", default="bloodhoundcommunityedition")
+    parser.add_argument(
+        "--save_snapshot", default=None, help="Write the snapshot in this file"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--requests",
+        default="",
+        help="Only replay these requests. ex : kud,objects_to_dcsync",
+    )
+    parser.add_argument(
+        "--backends",
+        default=",".join(BACKENDS),
+        help="Backends to compare, the first one of each metric is the reference. Default: %(default)s",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=100,
+        help="Number of sources of each request replayed (0 for all). Default: 100",
+    )
+    parser.add_argument(
+        "--level",
+        default="14",
+        help="Maximum length of unweighted paths, like AD Miner --level. Default: 14",
+    )
+    parser.add_argument(
+        "--memory", action="store_true", help="Measure the memory peak of backends"
+    )
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    arguments = parser.parse_args()
+    if [arguments.snapshot, arguments.size, arguments.bolt].count(None) != 2:
+        parser.error("one of --snapshot, --size and --bolt is required")
+    for name in arguments.backends.split(","):
+        if name not in BACKENDS:
+            parser.error("unknown backend %s, choose among %s" % (name, list(BACKENDS)))
+    return arguments
+
+
+def main():
+    replay_arguments = args()
+    neo4j_arguments = ["-cf", "replay", "--level", replay_arguments.level]
+    if replay_arguments.bolt:
+        neo4j_arguments += [
+            "-b",
+            replay_arguments.bolt,
+            "-u",
+            replay_arguments.username,
+            "-p",
+            replay_arguments.password,
+        ]
+    arguments = utils.args(neo4j_arguments)
+
+    if replay_arguments.bolt:
+        _, extract_date, statistics, boolean_azure = pre_request(arguments)
+        neo4j = Neo4j(arguments, extract_date, boolean_azure, statistics)
+        snapshot = neo4j_snapshot(neo4j)
+        neo4j.close()
+    else:
+        # No connection is made: requests are only read from requests.json
+        neo4j = Neo4j(arguments, DEFAULT_EXTRACT_DATE, True)
+        if replay_arguments.size:
+            snapshot = synthetic_snapshot(
+                replay_arguments.size, replay_arguments.seed, neo4j
+            )
+        else:
+            snapshot = json.loads(Path(replay_arguments.snapshot).read_text())
+
+    if replay_arguments.save_snapshot:
+        Path(replay_arguments.save_snapshot).write_text(json.dumps(snapshot))
+        logger.print_success("Snapshot written in %s" % replay_arguments.save_snapshot)
+
+    start = time.perf_counter()
+    graph = ReplayGraph(snapshot["relations"], neo4j.edges_rating)
+    logger.print_debug(
+        "Graph snapshot : %d nodes - %d relations (%s)"
+        % (
+            len(graph.snapshot),
+            len(snapshot["relations"]),
+            utils.timer_format(time.perf_counter() - start),
+        )
+    )
+
+    tracker = MemoryTracker()
+    if replay_arguments.memory:
+        tracker.start()
+
+    selected = [r for r in replay_arguments.requests.split(",") if r]
+    rng = random.Random(replay_arguments.seed)
+    report = {}
+    for request_key, request in snapshot["requests"].items():
+        if selected and request_key not in selected:
+            continue
+        sources = request["sources"]
+        if 0 < replay_arguments.sample < len(sources):
+            sources = sorted(rng.sample(sources, replay_arguments.sample))
+        request_definition = neo4j.all_requests.get(request_key, {})
+        replay = Replay(
+            request_key,
+            sources,
+            request["targets"],
+            request["relations"],
+            int(request_definition.get("native_max_depth", arguments.level)),
+        )
+        logger.print_debug(
+            "Replaying %s : %d sources, %d target partitions"
+            % (request_key, len(sources), len(replay.target_partitions))
+        )
+        report[request_key] = replay_request(
+            graph, replay, replay_arguments.backends.split(","), tracker
+        )
+
+    print_report(report)
+    if replay_arguments.output:
+        Path(replay_arguments.output).write_text(json.dumps(report, indent=4))
+        logger.print_success("Results written in %s" % replay_arguments.output)
+
+
+if __name__ == "__main__":
+    main()
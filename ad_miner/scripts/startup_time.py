@@ -0,0 +1,100 @@
+# Startup time of AD Miner, measured on `AD-miner --help`.
+#
+# The command is run --repeat times in a new interpreter with
+# -X importtime, the fastest run is compared with --budget (seconds) and
+# the modules that took the longest to import are listed. Startup also
+# fails if a module of DEFERRED_MODULES was imported: the neo4j driver,
+# numpy, tqdm and the control modules are only needed once arguments
+# are parsed. The exit code is 1 when the budget is exceeded.
+#
+# Usage:
+#   python -m ad_miner.scripts.startup_time
+#   python -m ad_miner.scripts.startup_time --budget 0.5 --repeat 10
+
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+# Modules that must not be imported to print the help
+DEFERRED_MODULES = [
+    "neo4j",
+    "numpy",
+    "tqdm",
+    "ad_miner.sources.modules.neo4j_class",
+    # Submodules only, the controls package reads the manifest
+    "ad_miner.sources.modules.controls.",
+]
+
+# Number of modules listed in the report
+TOP_IMPORTS = 10
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_help():
+    """Wall time of AD-miner --help and the import times it printed,
+    as (cumulative microseconds, nesting level, module)"""
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "ad_miner", "--help"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    duration = time.perf_counter() - start
+    imports = []
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, module = match.groups()
+            imports.append((int(cumulative), len(indent) // 2, module))
+    return duration, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup time of AD Miner")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=0.3,
+        help="Maximum startup time in seconds. Default: 0.3",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of runs, the fastest one is kept. Default: 5",
+    )
+    arguments = parser.parse_args()
+
+    duration, imports = min(run_help() for _ in range(arguments.repeat))
+
+    print("Slowest imports (cumulative):")
+    for cumulative, level, module in sorted(imports, reverse=True)[:TOP_IMPORTS]:
+        print("    %8.1f ms  %s%s" % (cumulative / 1000, "  " * level, module))
+
+    deferred = sorted(
+        {
+            deferred
+            for _, _, module in imports
+            for deferred in DEFERRED_MODULES
+            if module == deferred or module.startswith(deferred.rstrip(".") + ".")
+        }
+    )
+    failed = False
+    if deferred:
+        print("Modules imported before arguments are parsed: " + ", ".join(deferred))
+        failed = True
+
+    print("Startup time: %.3fs (budget %.3fs)" % (duration, arguments.budget))
+    if duration > arguments.budget:
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,962 @@
+# Synthetic Active Directory environments, to measure AD Miner on
+# estates of any size without a customer dataset.
+#
+# The generator builds an environment (domains, trusts, users, nested
+# groups, computers, sessions, ACLs, OUs, GPO links, ADCS templates and
+# Azure tenants) and exports it:
+#   - as SharpHound / AzureHound JSON files, to be imported in BloodHound
+#     and neo4j (--sharphound DIRECTORY)
+#   - as requests results in cache_neo4j (--cache_prefix PREFIX), so that
+#     controls can be run without neo4j (see benchmark_controls.py)
+#
+# Requests results are built from the results of a real run
+# (agent/llm_assets/requests_results.json by default): each record is
+# replicated and the objects it contains are replaced by synthetic
+# objects of the same type and domain, so the results have the shapes
+# controls expect. The same template object is replaced by the same
+# synthetic object in every request, so joins between requests still
+# match. Paths of the template with missing nodes are skipped, and
+# requests without template records (e.g. Azure ones on a template
+# without tenant) stay empty.
+#
+# Usage:
+#   python -m ad_miner.scripts.synthetic_dataset --size 100k --cache_prefix synthetic_100k
+#   python -m ad_miner.scripts.synthetic_dataset --size 10k --users 20000 --sharphound synthetic_10k/
+
+
+import argparse
+import json
+import os
+import random
+import re
+import uuid
+import zlib
+from array import array
+from pathlib import Path as pathlib
+
+from ad_miner.sources.modules.cache_class import Cache
+from ad_miner.sources.modules.node_neo4j import Node
+from ad_miner.sources.modules.path_neo4j import Path
+
+DEFAULT_TEMPLATE = (
+    pathlib(__file__).parents[2] / "agent" / "llm_assets" / "requests_results.json"
+)
+REQUESTS_FILE = pathlib(__file__).parents[1] / "sources" / "modules" / "requests.json"
+
+# Number of objects of each type for the standard estate sizes
+PRESETS = {
+    "10k": {
+        "domains": 2,
+        "users": 6000,
+        "groups": 1000,
+        "computers": 2500,
+        "ous": 300,
+        "gpos": 100,
+        "templates": 40,
+        "tenants": 1,
+        "azure_users": 1000,
+        "sessions": 5000,
+        "acls": 3000,
+    },
+    "100k": {
+        "domains": 4,
+        "users": 60000,
+        "groups": 10000,
+        "computers": 25000,
+        "ous": 3000,
+        "gpos": 1000,
+        "templates": 100,
+        "tenants": 2,
+        "azure_users": 10000,
+        "sessions": 50000,
+        "acls": 30000,
+    },
+    "1M": {
+        "domains": 8,
+        "users": 600000,
+        "groups": 100000,
+        "computers": 250000,
+        "ous": 30000,
+        "gpos": 10000,
+        "templates": 200,
+        "tenants": 4,
+        "azure_users": 100000,
+        "sessions": 500000,
+        "acls": 300000,
+    },
+}
+
+# Well-known groups of every domain (RID, name)
+BUILTIN_GROUPS = [
+    (512, "DOMAIN ADMINS"),
+    (513, "DOMAIN USERS"),
+    (515, "DOMAIN COMPUTERS"),
+    (516, "DOMAIN CONTROLLERS"),
+    (519, "ENTERPRISE ADMINS"),
+    (544, "ADMINISTRATORS"),
+    (548, "ACCOUNT OPERATORS"),
+    (551, "BACKUP OPERATORS"),
+]
+
+ACL_RIGHTS = [
+    "GenericAll",
+    "GenericWrite",
+    "WriteDacl",
+    "WriteOwner",
+    "Owns",
+    "ForceChangePassword",
+    "AddMember",
+    "AllExtendedRights",
+    "AddKeyCredentialLink",
+]
+
+OPERATING_SYSTEMS = [
+    "WINDOWS 10 ENTERPRISE",
+    "WINDOWS 11 ENTERPRISE",
+    "WINDOWS 7 PROFESSIONAL",
+    "WINDOWS SERVER 2012 R2 STANDARD",
+    "WINDOWS SERVER 2016 STANDARD",
+    "WINDOWS SERVER 2019 DATACENTER",
+    "WINDOWS SERVER 2022 STANDARD",
+]
+
+# SharpHound file of each label
+SHARPHOUND_TYPES = {
+    "Domain": "domains",
+    "User": "users",
+    "Group": "groups",
+    "Computer": "computers",
+    "OU": "ous",
+    "GPO": "gpos",
+    "EnterpriseCA": "enterprisecas",
+    "CertTemplate": "certtemplates",
+}
+
+AZURE_LABELS = ["AZTenant", "AZUser", "AZGroup", "AZDevice"]
+
+# Last logon dates are spread over this many days before the extraction
+LOGON_SPREAD_DAYS = 730
+
+# Offset between the ids of two copies of a template object that has no
+# synthetic counterpart (e.g. containers)
+COPY_ID_STRIDE = 1 << 40
+
+
+class SyntheticEnvironment:
+    """Objects and relations of a generated Active Directory.
+
+    Objects are (id, label, name, domain, identifier) tuples, identifier
+    being the SID (or GUID) used in SharpHound files. Relations are kept in
+    arrays, see relations(). Properties are derived from the object id
+    when needed (properties()), so that 1M-object estates fit in memory."""
+
+    def __init__(self, seed=0, extract_date=None, **counts):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.extract_date = extract_date or 1_700_000_000
+        self.counts = counts
+
+        self.objects = []
+        # label -> domain -> object indices
+        self.by_label = {}
+        self.relation_types = []
+        self._type_index = {}
+        self._sources = array("q")
+        self._targets = array("q")
+        self._types = array("h")
+
+        self.domains = []
+        self.domain_sids = {}
+        self.builtin = {}
+
+        self._build_domains(counts.get("domains", 1))
+        self._build_ous(counts.get("ous", 0))
+        self._build_groups(counts.get("groups", 0))
+        self._build_users(counts.get("users", 0))
+        self._build_computers(counts.get("computers", 0))
+        self._build_sessions(counts.get("sessions", 0))
+        self._build_acls(counts.get("acls", 0))
+        self._build_gpos(counts.get("gpos", 0))
+        self._build_adcs(counts.get("templates", 0))
+        self._build_azure(counts.get("tenants", 0), counts.get("azure_users", 0))
+
+    # Construction
+
+    def add_object(self, label, name, domain, identifier=None):
+        object_id = len(self.objects)
+        if identifier is None:
+            identifier = str(uuid.UUID(int=self.rng.getrandbits(128))).upper()
+        self.objects.append((object_id, label, name, domain, identifier))
+        self.by_label.setdefault(label, {}).setdefault(domain, []).append(object_id)
+        return object_id
+
+    def add_relation(self, source, target, relation_type):
+        if relation_type not in self._type_index:
+            self._type_index[relation_type] = len(self.relation_types)
+            self.relation_types.append(relation_type)
+        self._sources.append(source)
+        self._targets.append(target)
+        self._types.append(self._type_index[relation_type])
+
+    def pick(self, label, domain=None):
+        """Random object id of a label, in a domain or in any domain"""
+        pools = self.by_label.get(label, {})
+        if domain is None:
+            domain = self.rng.choice(list(pools))
+        return self.rng.choice(pools[domain])
+
+    def sid(self, domain, rid):
+        return "%s-%d" % (self.domain_sids[domain], rid)
+
+    def _build_domains(self, nb_domains):
+        root = "SYNTHETIC.LOCAL"
+        self.domains = [root] + ["CHILD%d.%s" % (i, root) for i in range(1, nb_domains)]
+        for domain in self.domains:
+            self.domain_sids[domain] = "S-1-5-21-%d-%d-%d" % tuple(
+                self.rng.randrange(10**9, 4 * 10**9) for _ in range(3)
+            )
+            domain_id = self.add_object(
+                "Domain", domain, domain, self.domain_sids[domain]
+            )
+            for rid, group_name in BUILTIN_GROUPS:
+                self.builtin[(domain, group_name)] = self.add_object(
+                    "Group",
+                    "%s@%s" % (group_name, domain),
+                    domain,
+                    self.sid(domain, rid),
+                )
+            self.add_relation(
+                self.builtin[(domain, "DOMAIN ADMINS")],
+                self.builtin[(domain, "ADMINISTRATORS")],
+                "MemberOf",
+            )
+            self.add_relation(
+                self.builtin[(domain, "DOMAIN ADMINS")], domain_id, "GenericAll"
+            )
+        # Parent-child trusts between the root and every child domain
+        root_id = self.by_label["Domain"][root][0]
+        for domain in self.domains[1:]:
+            domain_id = self.by_label["Domain"][domain][0]
+            self.add_relation(root_id, domain_id, "TrustedBy")
+            self.add_relation(domain_id, root_id, "TrustedBy")
+
+    def _build_ous(self, nb_ous):
+        for domain in self.domains:
+            self.add_object("OU", "DOMAIN CONTROLLERS@%s" % domain, domain)
+        for i in range(nb_ous):
+            domain = self.domains[i % len(self.domains)]
+            parents = self.by_label["OU"][domain] + self.by_label["Domain"][domain]
+            parent = self.rng.choice(parents)
+            ou = self.add_object("OU", "OU%d@%s" % (i, domain), domain)
+            self.add_relation(parent, ou, "Contains")
+
+    def _contain(self, object_id, domain):
+        self.add_relation(self.pick("OU", domain), object_id, "Contains")
+
+    def _build_groups(self, nb_groups):
+        for i in range(nb_groups):
+            domain = self.domains[i % len(self.domains)]
+            # Nested in an older group only, so that nestings have no cycle
+            parent = self.pick("Group", domain) if self.rng.random() < 0.5 else None
+            group = self.add_object(
+                "Group", "GROUP%d@%s" % (i, domain), domain, self.sid(domain, 10000 + i)
+            )
+            self._contain(group, domain)
+            if parent is not None:
+                self.add_relation(group, parent, "MemberOf")
+            if self.rng.random() < 0.002:
+                self.add_relation(
+                    group, self.builtin[(domain, "ACCOUNT OPERATORS")], "MemberOf"
+                )
+
+    def _build_users(self, nb_users):
+        for i in range(nb_users):
+            domain = self.domains[i % len(self.domains)]
+            user = self.add_object(
+                "User",
+                "USER%d@%s" % (i, domain),
+                domain,
+                self.sid(domain, 1000000 + i),
+            )
+            self._contain(user, domain)
+            self.add_relation(user, self.builtin[(domain, "DOMAIN USERS")], "MemberOf")
+            for _ in range(self.rng.randrange(4)):
+                self.add_relation(user, self.pick("Group", domain), "MemberOf")
+            if self.rng.random() < 0.002:
+                self.add_relation(
+                    user, self.builtin[(domain, "DOMAIN ADMINS")], "MemberOf"
+                )
+
+    def _build_computers(self, nb_computers):
+        for i in range(nb_computers):
+            domain = self.domains[i % len(self.domains)]
+            is_dc = i < 2 * len(self.domains)
+            prefix = "DC" if is_dc else "COMP"
+            computer = self.add_object(
+                "Computer",
+                "%s%d.%s" % (prefix, i, domain),
+                domain,
+                self.sid(domain, 5000000 + i),
+            )
+            if is_dc:
+                self.add_relation(self.by_label["OU"][domain][0], computer, "Contains")
+                self.add_relation(
+                    computer, self.builtin[(domain, "DOMAIN CONTROLLERS")], "MemberOf"
+                )
+                continue
+            self._contain(computer, domain)
+            self.add_relation(
+                computer, self.builtin[(domain, "DOMAIN COMPUTERS")], "MemberOf"
+            )
+            self.add_relation(self.pick("Group", domain), computer, "AdminTo")
+
+    def _build_sessions(self, nb_sessions):
+        if "Computer" not in self.by_label or "User" not in self.by_label:
+            return
+        for _ in range(nb_sessions):
+            domain = self.rng.choice(self.domains)
+            self.add_relation(
+                self.pick("Computer", domain), self.pick("User", domain), "HasSession"
+            )
+
+    def _build_acls(self, nb_acls):
+        principals = [label for label in ("User", "Group") if label in self.by_label]
+        targets = [
+            label
+            for label in ("User", "Group", "Computer", "OU")
+            if label in self.by_label
+        ]
+        if not principals:
+            return
+        for _ in range(nb_acls):
+            domain = self.rng.choice(self.domains)
+            self.add_relation(
+                self.pick(self.rng.choice(principals), domain),
+                self.pick(self.rng.choice(targets), domain),
+                self.rng.choice(ACL_RIGHTS),
+            )
+
+    def _build_gpos(self, nb_gpos):
+        for i in range(nb_gpos):
+            domain = self.domains[i % len(self.domains)]
+            gpo = self.add_object("GPO", "GPO%d@%s" % (i, domain), domain)
+            for _ in range(1 + self.rng.randrange(3)):
+                self.add_relation(gpo, self.pick("OU", domain), "GPLink")
+            if self.rng.random() < 0.05:
+                self.add_relation(gpo, self.by_label["Domain"][domain][0], "GPLink")
+
+    def _build_adcs(self, nb_templates):
+        if nb_templates == 0:
+            return
+        for domain in self.domains:
+            self.add_object("EnterpriseCA", "CA@%s" % domain, domain)
+        for i in range(nb_templates):
+            domain = self.domains[i % len(self.domains)]
+            template = self.add_object(
+                "CertTemplate", "TEMPLATE%d@%s" % (i, domain), domain
+            )
+            self.add_relation(
+                template, self.pick("EnterpriseCA", domain), "PublishedTo"
+            )
+            self.add_relation(
+                self.builtin[(domain, "DOMAIN USERS")], template, "Enroll"
+            )
+
+    def _build_azure(self, nb_tenants, nb_users):
+        for t in range(nb_tenants):
+            tenant_name = "TENANT%d.ONMICROSOFT.COM" % t
+            tenant = self.add_object("AZTenant", tenant_name, tenant_name)
+            groups = []
+            for i in range(max(1, nb_users // 20)):
+                group = self.add_object(
+                    "AZGroup", "AZGROUP%d@%s" % (i, tenant_name), tenant_name
+                )
+                self.add_relation(tenant, group, "AZContains")
+                groups.append(group)
+            for i in range(nb_users // nb_tenants):
+                user = self.add_object(
+                    "AZUser", "AZUSER%d@%s" % (i, tenant_name), tenant_name
+                )
+                self.add_relation(tenant, user, "AZContains")
+                self.add_relation(user, self.rng.choice(groups), "AZMemberOf")
+                if "User" in self.by_label and self.rng.random() < 0.5:
+                    self.add_relation(user, self.pick("User"), "SyncedToADUser")
+            for i in range(max(1, nb_users // 10)):
+                device = self.add_object(
+                    "AZDevice", "AZDEVICE%d@%s" % (i, tenant_name), tenant_name
+                )
+                self.add_relation(tenant, device, "AZContains")
+
+    # Access
+
+    def __len__(self):
+        return len(self.objects)
+
+    @property
+    def nb_relations(self):
+        return len(self._types)
+
+    def relations(self, relation_types=None):
+        """Generator of (source id, target id, relation type)"""
+        types = self.relation_types
+        for source, target, t in zip(self._sources, self._targets, self._types):
+            if relation_types is None or types[t] in relation_types:
+                yield source, target, types[t]
+
+    def incoming(self, relation_types):
+        """target id -> [(source id, relation type)] for some relation types"""
+        result = {}
+        for source, target, relation_type in self.relations(relation_types):
+            result.setdefault(target, []).append((source, relation_type))
+        return result
+
+    def outgoing(self, relation_types):
+        """source id -> [(target id, relation type)] for some relation types"""
+        result = {}
+        for source, target, relation_type in self.relations(relation_types):
+            result.setdefault(source, []).append((target, relation_type))
+        return result
+
+    def properties(self, object_id):
+        """Properties of an object, always the same for a given seed"""
+        _, label, name, domain, identifier = self.objects[object_id]
+        rng = random.Random(self.seed * 1_000_003 + object_id)
+        last_logon = self.extract_date - rng.randrange(LOGON_SPREAD_DAYS) * 86400
+        properties = {
+            "name": name,
+            "domain": domain,
+            "objectid": identifier,
+        }
+        if label in ("User", "Computer"):
+            properties.update(
+                enabled=rng.random() < 0.9,
+                lastlogon=last_logon,
+                lastlogontimestamp=last_logon,
+                pwdlastset=last_logon - rng.randrange(LOGON_SPREAD_DAYS) * 86400,
+                whencreated=last_logon - LOGON_SPREAD_DAYS * 86400,
+            )
+        if label == "User":
+            has_spn = rng.random() < 0.02
+            properties.update(
+                samaccountname=name.split("@")[0],
+                hasspn=has_spn,
+                serviceprincipalnames=(
+                    ["MSSQLSvc/%s:1433" % name.split("@")[0].lower()] if has_spn else []
+                ),
+                dontreqpreauth=rng.random() < 0.01,
+                admincount=rng.random() < 0.01,
+                passwordnotreqd=rng.random() < 0.005,
+                pwdneverexpires=rng.random() < 0.05,
+            )
+        elif label == "Computer":
+            is_dc = name.startswith("DC")
+            properties.update(
+                samaccountname=name.split(".")[0] + "$",
+                operatingsystem=(
+                    OPERATING_SYSTEMS[-1] if is_dc else rng.choice(OPERATING_SYSTEMS)
+                ),
+                unconstraineddelegation=is_dc or rng.random() < 0.005,
+                haslaps=rng.random() < 0.6,
+                isdc=is_dc,
+            )
+        elif label == "Group":
+            properties.update(
+                admincount=name.split("@")[0] in ("DOMAIN ADMINS", "ADMINISTRATORS")
+            )
+        elif label == "Domain":
+            properties.update(domainsid=identifier, functionallevel="2016")
+        elif label == "OU":
+            properties.update(blocksinheritance=rng.random() < 0.02)
+        elif label == "GPO":
+            properties.update(
+                gpcpath="\\\\%s\\SYSVOL\\%s\\POLICIES\\{%s}"
+                % (domain, domain, identifier)
+            )
+        elif label == "CertTemplate":
+            properties.update(
+                enrolleesuppliessubject=rng.random() < 0.05,
+                requiresmanagerapproval=rng.random() < 0.2,
+                authenticationenabled=rng.random() < 0.7,
+            )
+        elif label.startswith("AZ"):
+            properties["tenantid"] = self.tenant_id(domain)
+        return properties
+
+    def tenant_id(self, tenant_name):
+        return str(uuid.UUID(int=zlib.crc32(tenant_name.encode()) << 96)).upper()
+
+
+# SharpHound / AzureHound export
+
+
+def write_json_stream(file_path, items, meta):
+    """Write {"data": [items...], "meta": meta} one item at a time"""
+    count = 0
+    with open(file_path, "w") as f:
+        f.write('{"data": [')
+        for item in items:
+            f.write(("," if count else "") + json.dumps(item))
+            count += 1
+        meta = dict(meta, count=count)
+        f.write('], "meta": %s}' % json.dumps(meta))
+    return count
+
+
+def export_sharphound(environment, directory):
+    """SharpHound (v5) files of the on-premise objects and an AzureHound
+    file of the Azure ones, ready to be imported in BloodHound"""
+    os.makedirs(directory, exist_ok=True)
+    objects = environment.objects
+
+    def reference(object_id):
+        return {
+            "ObjectIdentifier": objects[object_id][4],
+            "ObjectType": objects[object_id][1],
+        }
+
+    members = environment.incoming({"MemberOf"})
+    aces = environment.incoming(set(ACL_RIGHTS) | {"Enroll"})
+    links = environment.incoming({"GPLink"})
+    children = environment.outgoing({"Contains"})
+    sessions = environment.outgoing({"HasSession"})
+    admins = environment.incoming({"AdminTo"})
+    trusts = environment.outgoing({"TrustedBy"})
+
+    def item(object_id):
+        _, label, _, domain, identifier = objects[object_id]
+        properties = environment.properties(object_id)
+        properties["name"] = properties["name"].upper()
+        properties["domainsid"] = environment.domain_sids.get(domain)
+        entry = {
+            "ObjectIdentifier": identifier,
+            "Properties": properties,
+            "Aces": [
+                {
+                    "PrincipalSID": objects[source][4],
+                    "PrincipalType": objects[source][1],
+                    "RightName": right,
+                    "IsInherited": False,
+                }
+                for source, right in aces.get(object_id, [])
+            ],
+            "IsDeleted": False,
+            "IsACLProtected": False,
+        }
+        if label == "Group":
+            entry["Members"] = [
+                reference(member) for member, _ in members.get(object_id, [])
+            ]
+        elif label == "Computer":
+            entry["Sessions"] = {
+                "Results": [
+                    {"UserSID": objects[user][4], "ComputerSID": identifier}
+                    for user, _ in sessions.get(object_id, [])
+                ],
+                "Collected": True,
+                "FailureReason": None,
+            }
+            entry["LocalAdmins"] = {
+                "Results": [reference(admin) for admin, _ in admins.get(object_id, [])],
+                "Collected": True,
+                "FailureReason": None,
+            }
+            entry["PrimaryGroupSID"] = environment.sid(domain, 515)
+            entry["AllowedToDelegate"] = []
+            entry["AllowedToAct"] = []
+            entry["HasSIDHistory"] = []
+        elif label == "User":
+            entry["PrimaryGroupSID"] = environment.sid(domain, 513)
+            entry["AllowedToDelegate"] = []
+            entry["HasSIDHistory"] = []
+            entry["SPNTargets"] = []
+        if label in ("Domain", "OU"):
+            entry["Links"] = [
+                {"GUID": objects[gpo][4], "IsEnforced": False}
+                for gpo, _ in links.get(object_id, [])
+            ]
+            entry["ChildObjects"] = [
+                reference(child) for child, _ in children.get(object_id, [])
+            ]
+        if label == "Domain":
+            entry["Trusts"] = [
+                {
+                    "TargetDomainSid": objects[target][4],
+                    "TargetDomainName": objects[target][2],
+                    "IsTransitive": True,
+                    "SidFilteringEnabled": False,
+                    "TrustDirection": "Bidirectional",
+                    "TrustType": "ParentChild",
+                }
+                for target, _ in trusts.get(object_id, [])
+            ]
+        return entry
+
+    def ids_of(label):
+        for ids in environment.by_label.get(label, {}).values():
+            yield from ids
+
+    for label, data_type in SHARPHOUND_TYPES.items():
+        write_json_stream(
+            os.path.join(directory, data_type + ".json"),
+            (item(object_id) for object_id in ids_of(label)),
+            {"methods": 0, "type": data_type, "version": 5},
+        )
+
+    azure_members = environment.incoming({"AZMemberOf"})
+
+    def azure_items():
+        for label in AZURE_LABELS:
+            for object_id in ids_of(label):
+                _, _, name, tenant, identifier = objects[object_id]
+                data = {
+                    "id": identifier,
+                    "displayName": name.split("@")[0],
+                    "tenantId": environment.tenant_id(tenant),
+                }
+                if label == "AZUser":
+                    data["userPrincipalName"] = name
+                yield {"kind": label, "data": data}
+                if label == "AZGroup" and object_id in azure_members:
+                    yield {
+                        "kind": "AZGroupMember",
+                        "data": {
+                            "groupId": identifier,
+                            "members": [
+                                {
+                                    "groupMember": {
+                                        "id": objects[member][4],
+                                        "@odata.type": "#microsoft.graph.user",
+                                    }
+                                }
+                                for member, _ in azure_members[object_id]
+                            ],
+                        },
+                    }
+
+    write_json_stream(
+        os.path.join(directory, "azurehound.json"),
+        azure_items(),
+        {"type": "azure", "version": 5},
+    )
+
+
+# Requests results
+
+
+def load_template(file_path):
+    """Results of each request of a requests_results.json dump (see
+    dump_requests_knowledge), with Path and Node objects rebuilt"""
+
+    def rebuild(value):
+        if isinstance(value, list):
+            return [rebuild(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        if value.get("__class__") == "Path":
+            nodes = value.get("nodes") or []
+            if any(node is None for node in nodes):
+                return None  # Node shared with another path in the dump
+            return Path([rebuild(node) for node in nodes])
+        if value.get("__class__") == "Node":
+            return Node(
+                value["id"],
+                value["labels"],
+                value["name"],
+                value["domain"],
+                value.get("tenant_id"),
+                value.get("relation_type", ""),
+            )
+        return {k: rebuild(v) for k, v in value.items()}
+
+    with open(file_path, encoding="utf-8") as f:
+        dump = json.load(f)
+    requests = json.loads(REQUESTS_FILE.read_text(encoding="utf-8"))
+
+    template = {}
+    for request_key, knowledge in dump.items():
+        if request_key not in requests or not isinstance(knowledge, dict):
+            continue
+        result = rebuild(knowledge.get("result")) or []
+        template[request_key] = [record for record in result if record is not None]
+    return template
+
+
+def stable_hash(value):
+    return zlib.crc32(value.encode())
+
+
+class TemplateScaler:
+    """Replicates the records of template results with synthetic objects.
+
+    Template objects (known from path nodes, and from the name fields of
+    the records for users and computers) are replaced, in copy c, by the
+    synthetic object of the same label at a position derived from (name, c)
+    in the mapped domain: the mapping is the same for every request.
+    In each copy, distinct template domains are mapped to distinct
+    synthetic domains (while there are enough of them), so that
+    cross-domain records stay cross-domain. Copies of paths whose domains
+    would be merged are skipped."""
+
+    def __init__(self, environment, template):
+        self.environment = environment
+        # Label and domain of each template object, by name
+        self.labels = {}
+        self.object_domains = {}
+        self.domains = set()
+
+        for result in template.values():
+            for record in result:
+                self._collect(record)
+
+        # Position of each template domain, shifted by the copy number
+        self.domain_index = {domain: i for i, domain in enumerate(sorted(self.domains))}
+
+        domains = sorted(self.domains, key=len, reverse=True)
+        names = sorted(self.labels, key=len, reverse=True)
+        self.pattern = re.compile("|".join(map(re.escape, names + domains)))
+        self.domain_pattern = re.compile("|".join(map(re.escape, domains)))
+
+        # Records are replicated as many times as there are synthetic
+        # objects per template object of the label of their first object
+        template_counts = {}
+        for label in self.labels.values():
+            template_counts[label] = template_counts.get(label, 0) + 1
+        self.nb_copies = {
+            label: max(
+                1,
+                round(
+                    sum(map(len, environment.by_label.get(label, {}).values())) / count
+                ),
+            )
+            for label, count in template_counts.items()
+        }
+        self.builtin_names = {name for _, name in BUILTIN_GROUPS}
+
+    def _collect(self, record):
+        if isinstance(record, Path):
+            for node in record.nodes:
+                self.labels[node.name] = node.labels
+                self.object_domains[node.name] = node.domain
+                self.domains.add(node.domain)
+        elif isinstance(record, dict):
+            domain = record.get("domain")
+            if isinstance(domain, str) and "<" not in domain:
+                self.domains.add(domain)
+            name = record.get("name")
+            if isinstance(name, str) and "<" not in name and name not in self.labels:
+                self.labels[name] = "User" if "@" in name else "Computer"
+                if isinstance(domain, str) and "<" not in domain:
+                    self.object_domains[name] = domain
+
+    def domain(self, template_domain, copy):
+        """Synthetic domain of a template domain in a copy: a rotation of
+        the template domains over the synthetic ones, distinct template
+        domains staying distinct when there are not more of them"""
+        domains = self.environment.domains
+        index = self.domain_index.get(template_domain)
+        if index is None:  # Domain only found in a name
+            index = self.domain_index[template_domain] = len(self.domain_index)
+        return domains[(index + copy) % len(domains)]
+
+    def synthetic_object(self, name, copy):
+        """Synthetic object replacing a template object, None if there is
+        no synthetic object of its label"""
+        template_domain = self.object_domains.get(name)
+        if template_domain is None:
+            template_domain = (
+                name.split("@")[-1] if "@" in name else name.partition(".")[2]
+            )
+        label = self.labels.get(name)
+        domain = self.domain(template_domain, copy)
+        account = name.split("@")[0]
+        if label == "Group" and account in self.builtin_names:
+            return self.environment.objects[self.environment.builtin[(domain, account)]]
+        pool = self.environment.by_label.get(label, {}).get(domain)
+        if not pool:
+            return None
+        position = stable_hash(name) + copy * 7919
+        return self.environment.objects[pool[position % len(pool)]]
+
+    def substitute_domains(self, value, copy):
+        return self.domain_pattern.sub(
+            lambda match: self.domain(match.group(0), copy), value
+        )
+
+    def substitute(self, value, copy):
+        """Replace the template objects and domains found in a string"""
+
+        def replace(match):
+            text = match.group(0)
+            if text not in self.labels:
+                return self.domain(text, copy)
+            synthetic = self.synthetic_object(text, copy)
+            if synthetic is None:
+                return self.substitute_domains(text, copy)
+            return synthetic[2]
+
+        return self.pattern.sub(replace, value)
+
+    def copy_record(self, record, copy):
+        """Copy c of a record, None for a path whose distinct domains would
+        be mapped to the same synthetic domain"""
+        if isinstance(record, Path):
+            template_domains = {node.domain for node in record.nodes if node.domain}
+            synthetic_domains = {self.domain(d, copy) for d in template_domains}
+            if len(synthetic_domains) < len(template_domains):
+                return None
+            nodes = []
+            for node in record.nodes:
+                synthetic = self.synthetic_object(node.name, copy)
+                if synthetic is None:
+                    nodes.append(
+                        Node(
+                            node.id + copy * COPY_ID_STRIDE,
+                            node.labels,
+                            self.substitute(node.name, copy),
+                            self.domain(node.domain, copy),
+                            node.tenant_id,
+                            node.relation_type,
+                        )
+                    )
+                else:
+                    object_id, _, name, domain, _ = synthetic
+                    nodes.append(
+                        Node(
+                            object_id,
+                            node.labels,
+                            name,
+                            domain,
+                            node.tenant_id,
+                            node.relation_type,
+                        )
+                    )
+            return Path(nodes)
+        if isinstance(record, dict):
+            return {k: self.copy_record(v, copy) for k, v in record.items()}
+        if isinstance(record, list):
+            return [self.copy_record(v, copy) for v in record]
+        if isinstance(record, str):
+            return self.substitute(record, copy)
+        return record
+
+    def record_label(self, record):
+        """Label of the first object of a record, None if the record is not
+        about an object (counts, configuration checks, domains...)"""
+        if isinstance(record, Path):
+            return record.nodes[0].labels if record.nodes else None
+        values = record.values() if isinstance(record, dict) else record
+        if isinstance(record, (dict, list)):
+            for value in values:
+                label = self.record_label(value)
+                if label is not None:
+                    return label
+        elif isinstance(record, str) and self.labels.get(record) != "Domain":
+            return self.labels.get(record)
+        return None
+
+    def scale(self, result):
+        scaled = []
+        seen = set()
+        for record in result:
+            label = self.record_label(record)
+            # One copy per synthetic domain for records about domains
+            nb_copies = (
+                self.nb_copies.get(label, 1)
+                if label is not None
+                else len(self.environment.domains)
+            )
+            for c in range(nb_copies):
+                copy = self.copy_record(record, c)
+                if copy is None:
+                    continue
+                if isinstance(copy, Path):
+                    scaled.append(copy)
+                    continue
+                # Records about the same object, e.g. builtin groups
+                key = repr(copy)
+                if key not in seen:
+                    seen.add(key)
+                    scaled.append(copy)
+        return scaled
+
+
+def synthetic_requests_results(environment, template):
+    """Results of every request of the template, scaled to the environment"""
+    scaler = TemplateScaler(environment, template)
+    requests_results = {
+        request_key: scaler.scale(result) for request_key, result in template.items()
+    }
+    # Direct memberships, read by the set_membership_closure post processing
+    requests_results["set_membership_closure"] = [
+        [member, group] for member, group, _ in environment.relations({"MemberOf"})
+    ]
+    return requests_results
+
+
+def write_cache(requests_results, cache_prefix):
+    """Write requests results as cache_neo4j entries of cache_prefix"""
+    cache = Cache(argparse.Namespace(cache_prefix=cache_prefix))
+    for request_key, result in requests_results.items():
+        cache.createCacheEntry(request_key, result)
+
+
+def args():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic Active Directory environment"
+    )
+    parser.add_argument(
+        "--size",
+        default="10k",
+        choices=PRESETS.keys(),
+        help="Number of objects of the environment, each count can be changed below",
+    )
+    for count in PRESETS["10k"]:
+        parser.add_argument("--" + count, type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--sharphound",
+        default=None,
+        help="Directory where SharpHound and AzureHound JSON files are written",
+    )
+    parser.add_argument(
+        "--cache_prefix",
+        default=None,
+        help="Write the requests results in cache_neo4j with this prefix",
+    )
+    parser.add_argument(
+        "--template",
+        default=str(DEFAULT_TEMPLATE),
+        help="requests_results.json of a real run, giving the shape of the results",
+    )
+    return parser.parse_args()
+
+
+def main():
+    arguments = args()
+    counts = dict(PRESETS[arguments.size])
+    for count in counts:
+        if getattr(arguments, count) is not None:
+            counts[count] = getattr(arguments, count)
+
+    environment = SyntheticEnvironment(arguments.seed, **counts)
+    print(
+        "%d objects and %d relations generated"
+        % (len(environment), environment.nb_relations)
+    )
+
+    if arguments.sharphound:
+        export_sharphound(environment, arguments.sharphound)
+        print("SharpHound files written in %s" % arguments.sharphound)
+
+    if arguments.cache_prefix:
+        template = load_template(arguments.template)
+        requests_results = synthetic_requests_results(environment, template)
+        write_cache(requests_results, arguments.cache_prefix)
+        print(
+            "%d requests results written in cache_neo4j/%s_*"
+            % (len(requests_results), arguments.cache_prefix)
+        )
+
+
+if __name__ == "__main__":
+    main()
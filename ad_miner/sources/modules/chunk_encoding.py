@@ -0,0 +1,137 @@
+from array import array
+
+
+def strings_size(strings):
+    """Size in bytes of the values of a string table"""
+    return sum(len(value.encode()) for value in strings if isinstance(value, str))
+
+
+class StringTable:
+    """Index of every distinct value (names, domains, labels...) of a chunk,
+    so that each occurrence is sent between processes as an integer"""
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+
+    def add(self, value):
+        position = self.index.get(value)
+        if position is None:
+            position = len(self.values)
+            self.index[value] = position
+            self.values.append(value)
+        return position
+
+
+class EncodedPaths:
+    """Path tuples (see Neo4j.pathTuple) of a chunk as integer arrays.
+
+    Each distinct node is stored once (node_ids and node_fields: label,
+    name, domain and tenant id indices in strings). A path is a range
+    of occurrences (path_offsets), each occurrence being a node index and
+    the index of its relation type in strings."""
+
+    def __init__(self, paths):
+        strings = StringTable()
+        node_index = {}
+        self.node_ids = array("q")
+        self.node_fields = array("i")
+        self.occurrences = array("i")
+        self.relations = array("i")
+        self.path_offsets = array("q", [0])
+
+        for path in paths:
+            for node_id, label, name, domain, tenant_id, relation_type in path:
+                node = node_index.get(node_id)
+                if node is None:
+                    node = len(self.node_ids)
+                    node_index[node_id] = node
+                    self.node_ids.append(node_id)
+                    for value in (label, name, domain, tenant_id):
+                        self.node_fields.append(strings.add(value))
+                self.occurrences.append(node)
+                self.relations.append(strings.add(relation_type))
+            self.path_offsets.append(len(self.occurrences))
+
+        self.strings = strings.values
+
+    def __len__(self):
+        return len(self.path_offsets) - 1
+
+    @property
+    def nbytes(self):
+        """Size of the integer arrays and of the string table"""
+        arrays = (
+            self.node_ids,
+            self.node_fields,
+            self.occurrences,
+            self.relations,
+            self.path_offsets,
+        )
+        return sum(len(a) * a.itemsize for a in arrays) + strings_size(self.strings)
+
+    def __iter__(self):
+        """Decode the path tuples, one at a time"""
+        strings = self.strings
+        fields = self.node_fields
+        nodes = [
+            (node_id,) + tuple(strings[f] for f in fields[4 * i : 4 * i + 4])
+            for i, node_id in enumerate(self.node_ids)
+        ]
+        occurrences = self.occurrences
+        relations = self.relations
+        offsets = self.path_offsets
+        for p in range(len(offsets) - 1):
+            yield tuple(
+                nodes[occurrences[k]] + (strings[relations[k]],)
+                for k in range(offsets[p], offsets[p + 1])
+            )
+
+
+class EncodedRecords:
+    """Records of a list or dict chunk in columns: the keys are sent once
+    and columns containing only strings are sent as indices in a table"""
+
+    def __init__(self, keys, rows):
+        self.keys = list(keys)
+        columns = [[] for _ in self.keys]
+        for row in rows:
+            for column, value in zip(columns, row):
+                column.append(value)
+        self.nb_rows = len(columns[0]) if columns else 0
+
+        self.columns = []
+        for column in columns:
+            if all(value is None or isinstance(value, str) for value in column):
+                strings = StringTable()
+                indices = array("i", [strings.add(value) for value in column])
+                self.columns.append((strings.values, indices))
+            else:
+                self.columns.append((None, column))
+
+    def __len__(self):
+        return self.nb_rows
+
+    @property
+    def nbytes(self):
+        """Size of the string columns (indices and string tables). Other
+        columns are kept as lists of values and are not counted."""
+        return sum(
+            len(values) * values.itemsize + strings_size(strings)
+            for strings, values in self.columns
+            if strings is not None
+        )
+
+    def rows(self):
+        """Decode the rows, as tuples of values in the order of keys"""
+        columns = [
+            values if strings is None else [strings[i] for i in values]
+            for strings, values in self.columns
+        ]
+        return zip(*columns)
+
+    def decode(self, output_type):
+        """Same result as .values() (list) or .data() (dict) of the records"""
+        if output_type is dict:
+            return [dict(zip(self.keys, row)) for row in self.rows()]
+        return [list(row) for row in self.rows()]
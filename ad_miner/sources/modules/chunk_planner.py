@@ -0,0 +1,66 @@
+import re
+from heapq import heapify, heapreplace
+
+# Scoped requests: sources selected, ordered and split with SKIP / LIMIT,
+# then the search done for each source of the chunk
+SCOPED_REQUEST = re.compile(
+    r"^(.*?)WITH (\w+) ORDER BY \S+ SKIP PARAM1 LIMIT PARAM2 (.*)$", re.DOTALL
+)
+
+# Request made of a CALL subquery
+SUBQUERY = re.compile(r"^\s*CALL\s*\{")
+
+# Estimated cost of the search from a source: its relations (out-degree,
+# memberships included) and the members of groups
+SOURCE_COST = "1 + size(({0})-->()) + coalesce({0}.members_count, 0)"
+
+
+def scoped_parts(request):
+    """(source selection, source variable, search from each source) of a
+    scoped request. None if the request does not split its sources with a
+    single SKIP / LIMIT, or if it does it inside a CALL subquery (e.g. a
+    UNION of several scoped searches): they cannot be split in two."""
+    if request.count("SKIP PARAM1") != 1 or SUBQUERY.match(request):
+        return None
+    match = SCOPED_REQUEST.match(request)
+    if match is None:
+        return None
+    return match.groups()
+
+
+def balanced_queries(request):
+    """Queries of the balanced version of a scoped request:
+    (query returning the id and estimated cost of each source,
+    request restricted to the sources of $source_ids).
+    None if the request cannot be split (see scoped_parts)."""
+    parts = scoped_parts(request)
+    if parts is None:
+        return None
+    selection, source, search = parts
+    cost_query = f"{selection}RETURN ID({source}), " + SOURCE_COST.format(source)
+    chunk_request = (
+        f"MATCH ({source}) WHERE ID({source}) IN $source_ids WITH {source} {search}"
+    )
+    return cost_query, chunk_request
+
+
+def balanced_chunks(costs, part_number):
+    """Split sources into part_number chunks of similar total cost.
+    costs are (source id, estimated cost) pairs. Sources are taken from
+    the most to the least expensive, each going to the chunk with the
+    lowest total so far (longest processing time first).
+    Returns (source ids, total cost) of every chunk, most expensive chunk
+    first so that it does not finish last."""
+    part_number = max(1, min(part_number, len(costs)))
+    chunks = [[] for _ in range(part_number)]
+    totals = [(0, i) for i in range(part_number)]
+    heapify(totals)
+    for source_id, cost in sorted(costs, key=lambda c: -c[1]):
+        total, i = totals[0]
+        chunks[i].append(source_id)
+        heapreplace(totals, (total + cost, i))
+
+    return sorted(
+        ((sorted(chunks[i]), total) for total, i in totals if chunks[i]),
+        key=lambda chunk: -chunk[1],
+    )
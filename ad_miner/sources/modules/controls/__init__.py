@@ -1,19 +1,84 @@
 import os
 import importlib
+import json
+from pathlib import Path
 
-control_list = []
+from ad_miner.sources.modules import logger
+
+CONTROLS_DIRECTORY = Path(__file__).parent
+
+# Control key, module, category and requests of every control, built by
+# ad_miner/scripts/control_manifest.py
+MANIFEST_PATH = CONTROLS_DIRECTORY / "manifest.json"
+
+# Control classes, as their module is imported
+registered_controls = []
 
 
 def register_control(cls):
     "Decorator to register every control that should be run by AD Miner"
-    control_list.append(cls)
+    registered_controls.append(cls)
     return cls
 
 
+class ControlEntry:
+    """A control of the manifest. Its module is only imported when the
+    control is created, an entry is called like the control class:
+    entry(arguments, requests_results)."""
+
+    def __init__(
+        self,
+        control_key,
+        module,
+        class_name,
+        category=None,
+        azure_or_onprem=None,
+        request_keys=(),
+    ):
+        self.control_key = control_key
+        self.module = module
+        self.class_name = class_name
+        self.category = category
+        self.azure_or_onprem = azure_or_onprem
+        self.request_keys = list(request_keys)
+
+    @classmethod
+    def from_class(cls, control_class):
+        return cls(
+            control_class.control_key,
+            control_class.__module__.rsplit(".", 1)[-1],
+            control_class.__name__,
+            request_keys=control_class.request_keys,
+        )
+
+    def load(self):
+        """Import the module of the control and return its class"""
+        module = importlib.import_module(f".{self.module}", package=__package__)
+        control_class = getattr(module, self.class_name)
+        if list(control_class.request_keys) != self.request_keys:
+            logger.print_warning(
+                f"The request_keys of {self.control_key} differ from manifest.json, "
+                "run python -m ad_miner.scripts.control_manifest"
+            )
+        return control_class
+
+    def __call__(self, arguments, requests_results):
+        return self.load()(arguments, requests_results)
+
+    def __repr__(self):
+        return f"<ControlEntry {self.control_key}>"
+
+
 class Control:
     """Every control should inheritate from this class.
     It contains requests results and define essential structure."""
 
+    # Uniq key of the control, used by the code and written to the data json
+    control_key = ""
+
+    # Requests of requests.json whose results are read by the control
+    request_keys = []
+
     def __init__(self, arguments, requests_results) -> None:
         self.arguments = arguments
         self.requests_results = requests_results
@@ -44,17 +109,54 @@ class Control:
         return self.dico_description
 
 
-__all__ = []
+def select_controls(arguments) -> list:
+    """Controls to run, from --only_controls and --skip_controls
+    (comma separated control keys). Every control is kept by default."""
+    only_controls = [k.strip() for k in arguments.only_controls.split(",") if k.strip()]
+    skip_controls = [k.strip() for k in arguments.skip_controls.split(",") if k.strip()]
 
+    known_keys = [control.control_key for control in control_list]
+    for control_key in only_controls + skip_controls:
+        if control_key not in known_keys:
+            logger.print_warning(f"Unknown control : {control_key}")
 
-dirname = os.path.dirname(os.path.abspath(__file__))
+    return [
+        control
+        for control in control_list
+        if (not only_controls or control.control_key in only_controls)
+        and control.control_key not in skip_controls
+    ]
 
-for filename in os.listdir(dirname):
-    if (
-        filename != "__init__.py"
-        and os.path.isfile(os.path.join(dirname, filename))
-        and filename.endswith(".py")
-    ):
+
+def load_manifest() -> list:
+    """Entries of every control, from manifest.json. Control modules
+    missing from the manifest are imported to find their controls."""
+    entries = []
+    if MANIFEST_PATH.exists():
+        entries = [
+            ControlEntry(**entry)
+            for entry in json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+        ]
+
+    known_modules = {entry.module for entry in entries}
+    for filename in sorted(os.listdir(CONTROLS_DIRECTORY)):
         module_name = filename[:-3]  # Remove ".py" extension
-        __all__.append(module_name)
-        module = importlib.import_module(f".{module_name}", package=__name__)
+        if (
+            filename == "__init__.py"
+            or not filename.endswith(".py")
+            or module_name in known_modules
+        ):
+            continue
+        logger.print_debug(f"Control module {module_name} is not in manifest.json")
+        first_new = len(registered_controls)
+        importlib.import_module(f".{module_name}", package=__name__)
+        entries.extend(
+            ControlEntry.from_class(control_class)
+            for control_class in registered_controls[first_new:]
+        )
+    return entries
+
+
+control_list = load_manifest()
+
+__all__ = sorted({entry.module for entry in control_list})
@@ -19,12 +19,20 @@ from tqdm import tqdm
 class my_control_class_name(Control):
     "Legacy control"
 
+    control_key = "anomaly_acl"
+    request_keys = [
+        "anomaly_acl_1",
+        "anomaly_acl_2",
+        "computers_admin_on_computers",
+        "objects_to_domain_admin",
+        "users_admin_on_computers",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "anomaly_acl"
 
         self.title = "ACL anomalies"
         self.description = "An ACL (Access Control List) is a security mechanism that defines permissions and access rights for objects within the Active Directory structure."
@@ -12,12 +12,14 @@ import json
 class as_rep(Control):
     "Legacy control"
 
+    control_key = "as_rep"
+    request_keys = ["nb_as-rep_roastable_accounts"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "kerberos"
-        self.control_key = "as_rep"
 
         self.title = "AS-REP Roastable accounts"
         self.description = "These accounts do not need to authenticate to receive a response from the KDC containing the hash of the password of the account."
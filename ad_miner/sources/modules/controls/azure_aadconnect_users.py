@@ -9,12 +9,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class azure_aadconnect_users(Control):
     "Legacy control"
 
+    control_key = "azure_aadconnect_users"
+    request_keys = ["azure_aadconnect_users"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "az_permissions"
-        self.control_key = "azure_aadconnect_users"
 
         self.title = "Users possibly related to AADConnect"
         self.description = "All Users and Azure Users possibly related to AADConnect"
@@ -10,12 +10,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class azure_accounts_disabled_on_prem(Control):  # TODO change the class name
     "Docstring of my control"  # TODO small documentation here
 
+    control_key = "azure_accounts_disabled_on_prem"
+    request_keys = ["azure_accounts_disabled_on_prem"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "ms_graph"
-        self.control_key = "azure_accounts_disabled_on_prem"
 
         self.title = "Synced accounts with disabled twin account"
         self.description = (
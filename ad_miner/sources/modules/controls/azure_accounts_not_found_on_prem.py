@@ -10,12 +10,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class azure_accounts_not_found_on_prem(Control):
     "Legacy control"
 
+    control_key = "azure_accounts_not_found_on_prem"
+    request_keys = ["azure_accounts_not_found_on_prem"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "ms_graph"
-        self.control_key = "azure_accounts_not_found_on_prem"
 
         self.title = "Entra ID accounts not synced on-prem"
         self.description = (
@@ -10,12 +10,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class azure_admin_on_prem(Control):
     "Legacy control"
 
+    control_key = "azure_admin_on_prem"
+    request_keys = ["azure_admin_on_prem"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "az_permissions"
-        self.control_key = "azure_admin_on_prem"
 
         self.title = "Privileged accounts on both on-prem and AZ"
         self.description = (
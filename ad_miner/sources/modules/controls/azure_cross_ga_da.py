@@ -11,12 +11,18 @@ from hashlib import md5
 class azure_cross_ga_da(Control):
     "Legacy control"
 
+    control_key = "azure_cross_ga_da"
+    request_keys = [
+        "azure_cross_ga_da",
+        "azure_tenants",
+        "nb_domain_collected",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "az_permissions"
-        self.control_key = "azure_cross_ga_da"
 
         self.title = "Cross on-prem/Entra ID path to tier-0"
         self.description = "Paths from Azure admins that leads to on premise admins compromission and vice-versa"
@@ -12,12 +12,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class azure_dormant_accounts(Control):
     "Legacy control"
 
+    control_key = "azure_dormant_accounts"
+    request_keys = ["azure_dormant_accounts"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "az_misc"
-        self.control_key = "azure_dormant_accounts"
 
         self.title = "Azure dormant accounts"
         self.description = "Users who did not login for 3 months"
@@ -11,12 +11,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class azure_last_passwd_change(Control):
     "Legacy control"
 
+    control_key = "azure_last_passwd_change"
+    request_keys = ["azure_last_passwd_change"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "az_passwords"
-        self.control_key = "azure_last_passwd_change"
 
         self.title = "Incoherent last password change"
         self.description = (
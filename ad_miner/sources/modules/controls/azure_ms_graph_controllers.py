@@ -8,12 +8,14 @@ from ad_miner.sources.modules.common_analysis import presence_of, createGraphPag
 class azure_ms_graph_controllers(Control):  # TODO change the class name
     "Legacy control"  # TODO small documentation here
 
+    control_key = "azure_ms_graph_controllers"
+    request_keys = ["azure_ms_graph_controllers"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "ms_graph"
-        self.control_key = "azure_ms_graph_controllers"
 
         self.title = "Direct Controllers of MS Graph"
         self.description = "Accounts with privileged access to Microsoft Graph"
@@ -12,12 +12,14 @@ from hashlib import md5
 class azure_reset_passwd(Control):
     "Legacy control"
 
+    control_key = "azure_reset_passwd"
+    request_keys = ["azure_reset_passwd"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "az_passwords"
-        self.control_key = "azure_reset_passwd"
 
         self.title = "Entra ID password reset privileges"
         self.description = "Users with the right to reset users' passwords"
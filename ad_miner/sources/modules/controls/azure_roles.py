@@ -13,12 +13,14 @@ from hashlib import md5
 class azure_roles(Control):  # TODO change the class name
     "Docstring of my control"  # TODO small documentation here
 
+    control_key = "azure_roles"
+    request_keys = ["azure_role_listing", "azure_role_paths"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "az_permissions"
-        self.control_key = "azure_roles"
 
         self.title = "Access to privileged Entra ID roles"
         self.description = "Paths to all builtin and custom Azure roles"
@@ -7,12 +7,14 @@ from ad_miner.sources.modules.common_analysis import presence_of, createGraphPag
 class azure_users_paths_high_target(Control):
     "Legacy control"
 
+    control_key = "azure_users_paths_high_target"
+    request_keys = ["azure_users_paths_high_target"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "azure"
         self.category = "az_permissions"
-        self.control_key = "azure_users_paths_high_target"
 
         self.title = "Entra ID users with path high value targets"
         self.description = "All Azure users that can compromise a high value target"
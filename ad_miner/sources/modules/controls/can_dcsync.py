@@ -14,12 +14,20 @@ from urllib.parse import quote
 class can_dcsync(Control):
     "Legacy control"
 
+    control_key = "can_dcsync"
+    request_keys = [
+        "dcsync_list",
+        "nb_domain_admins",
+        "objects_to_dcsync",
+        "set_dcsync1",
+        "set_dcsync2",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "can_dcsync"
 
         self.title = "Inadequate access to DCSync privileges"
         self.description = "All these domain objects are granted DCSync privileges and can, as such, dump all data from Active Directory"
@@ -14,6 +14,9 @@ from urllib.parse import quote
 class can_read_gmsapassword_of_adm(Control):
     "Legacy control"
 
+    control_key = "can_read_gmsapassword_of_adm"
+    request_keys = ["can_read_gmsapassword_of_adm"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
@@ -21,8 +24,6 @@ class can_read_gmsapassword_of_adm(Control):
 
         self.category = "passwords"
 
-        self.control_key = "can_read_gmsapassword_of_adm"
-
         self.title = "Objects can read GMSA passwords of administrators"
         self.description = "GMSA stands for Group Managed Service Account. GMSAs are a special type of service account that are designed to provide improved security and manageability for service applications. GMSAs have their own passwords that are managed by the Active Directory and automatically rotated, making them more secure than traditional service accounts."
         self.risk = "Being able to read GMSA passwords means that accounts can be fully compromised."
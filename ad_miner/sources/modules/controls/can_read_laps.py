@@ -9,12 +9,14 @@ from ad_miner.sources.modules.grid_class import Grid
 class can_read_laps(Control):
     "Legacy control"
 
+    control_key = "can_read_laps"
+    request_keys = ["can_read_laps", "nb_domain_admins"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "passwords"
-        self.control_key = "can_read_laps"
 
         self.title = "Access to LAPS passwords"
         self.description = "Accounts that can read LAPS local administrator passwords."
@@ -17,12 +17,14 @@ from urllib.parse import quote
 class computers_admin_of_computers(Control):
     "Legacy control"
 
+    control_key = "computers_admin_of_computers"
+    request_keys = ["computers_admin_on_computers", "objects_to_domain_admin"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "computers_admin_of_computers"
 
         self.title = "Computers admin of other computers"
         self.description = "Some machine accounts have administration privileges over other computers accounts."
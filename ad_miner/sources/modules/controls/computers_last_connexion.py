@@ -11,12 +11,14 @@ from ad_miner.sources.modules.common_analysis import percentage_superior
 class computers_last_connexion(Control):
     "Legacy control"
 
+    control_key = "computers_last_connexion"
+    request_keys = ["computers_not_connected_since", "nb_computers"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "computers_last_connexion"
 
         # TODO define the control page title and texts
         self.title = "Ghost computers"
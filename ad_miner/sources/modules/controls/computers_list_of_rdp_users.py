@@ -13,12 +13,14 @@ from urllib.parse import quote
 class computers_list_of_rdp_users(Control):
     "Legacy control"
 
+    control_key = "computers_list_of_rdp_users"
+    request_keys = ["nb_enabled_accounts", "rdp_access"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "computers_list_of_rdp_users"
 
         self.title = "RDP access (computers)"
         self.description = (
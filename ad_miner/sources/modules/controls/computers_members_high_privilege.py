@@ -10,12 +10,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class computers_members_high_privilege(Control):
     "Legacy control"
 
+    control_key = "computers_members_high_privilege"
+    request_keys = ["computers_members_high_privilege"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "computers_members_high_privilege"
 
         self.title = "Machine accounts with inadequate privileges"
         self.description = "List of computers with high privileges."
@@ -11,12 +11,14 @@ from ad_miner.sources.modules.common_analysis import manageComputersOs, presence
 class computers_os_obsolete(Control):
     "Legacy control"
 
+    control_key = "computers_os_obsolete"
+    request_keys = ["os"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "computers_os_obsolete"
 
         self.title = "Computers with obsolete OS"
         self.description = "List of computers with obsolete OS"
@@ -11,12 +11,14 @@ from ad_miner.sources.modules.utils import days_format
 class computers_without_laps(Control):
     "Legacy control"
 
+    control_key = "computers_without_laps"
+    request_keys = ["nb_computers", "nb_computers_laps"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "passwords"
-        self.control_key = "computers_without_laps"
 
         self.title = "Computers without LAPS"
         self.description = "Microsoft Local Administrator Password Solution (LAPS) allows local admnistrators to manage different passwords on local administrator accounts."
@@ -12,12 +12,14 @@ import copy
 class cross_domain_admin_privileges(Control):
     "Legacy control"
 
+    control_key = "cross_domain_admin_privileges"
+    request_keys = ["cross_domain_domain_admins", "cross_domain_local_admins"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "cross_domain_admin_privileges"
 
         self.title = "Users that have powerful cross-domain privileges"
         self.description = "Users privileges are not limited to their domains. Sometimes some users may have direct or non-direct local admin or even domain admin privilege on a foreign domain."
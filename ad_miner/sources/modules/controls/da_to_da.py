@@ -13,12 +13,14 @@ from urllib.parse import quote
 class da_to_da(Control):
     "Legacy control"
 
+    control_key = "da_to_da"
+    request_keys = ["da_to_da", "nb_domain_collected"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "da_to_da"
 
         self.title = "Cross-domain paths to Domain Admin"
         self.description = "From a domain admin group of a given domain, it shows the paths the domain admin groups of every other domains."
@@ -11,12 +11,18 @@ from ad_miner.sources.modules.utils import grid_data_stringify
 class dangerous_paths(Control):
     "Legacy control"
 
+    control_key = "dangerous_paths"
+    request_keys = [
+        "da_to_da",
+        "objects_to_dcsync",
+        "objects_to_domain_admin",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "dangerous_paths"
 
         self.title = "Attack paths choke points"
         self.description = "List of the main paths to become a domain administrator"
@@ -8,12 +8,14 @@ from ad_miner.sources.modules.common_analysis import createGraphPage, presence_o
 class dc_impersonation(Control):
     "Legacy control"
 
+    control_key = "dc_impersonation"
+    request_keys = ["dc_impersonation"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "dc_impersonation"
 
         self.title = "Shadow credentials on domain controllers"
         self.description = "Non-domain admins that can directly or indirectly impersonate a Domain Controller"
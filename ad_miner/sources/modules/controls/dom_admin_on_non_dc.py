@@ -13,12 +13,14 @@ from urllib.parse import quote
 class dom_admin_on_non_dc(Control):
     "Docstring of my control"
 
+    control_key = "dom_admin_on_non_dc"
+    request_keys = ["dom_admin_on_non_dc"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "dom_admin_on_non_dc"
 
         self.title = "Tier-0 violation (sessions)"
         self.description = "Domain admins connected to non DC computers. If an attacker compromises any of these computers, he will instantly obtain domain administration privileges."
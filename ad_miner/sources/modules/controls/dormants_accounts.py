@@ -11,12 +11,14 @@ from ad_miner.sources.modules.common_analysis import percentage_superior
 class dormants_accounts(Control):
     "Legacy control"
 
+    control_key = "dormants_accounts"
+    request_keys = ["dormant_accounts", "nb_enabled_accounts"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "dormants_accounts"
 
         self.title = "Dormant accounts"
         self.description = "List of all users who have their accounts unused for a long period of time."
@@ -9,12 +9,14 @@ from ad_miner.sources.modules.grid_class import Grid
 class empty_groups(Control):
     "Legacy control"
 
+    control_key = "empty_groups"
+    request_keys = ["get_empty_groups", "nb_groups"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "empty_groups"
 
         self.title = "Groups without any member"
         self.description = "These groups do not contain any user, computer or any other group, which probably means they are not used anymore."
@@ -9,12 +9,14 @@ from ad_miner.sources.modules.grid_class import Grid
 class empty_ous(Control):  # TODO change the class name
     "Docstring of my control"  # TODO small documentation here
 
+    control_key = "empty_ous"
+    request_keys = ["get_empty_ous", "nb_groups"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "empty_ous"
 
         self.title = "OUs without any member"
         self.description = "These OUs do not contain any user, computer or any other group, which probably means they are not used anymore."
@@ -9,12 +9,14 @@ from ad_miner.sources.modules.grid_class import Grid
 class fgpp(Control):
     "Legacy control"
 
+    control_key = "fgpp"
+    request_keys = ["get_fgpp"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "fgpp"
 
         self.title = "Users FGPP"
         self.description = "FGPP applied to a user, directly or via a group"
@@ -15,12 +15,14 @@ from tqdm import tqdm
 class graph_list_objects_rbcd(Control):  # TODO change the class name
     "Docstring of my control"  # TODO small documentation here
 
+    control_key = "graph_list_objects_rbcd"
+    request_keys = ["graph_rbcd", "graph_rbcd_to_da"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "kerberos"
-        self.control_key = "graph_list_objects_rbcd"
 
         self.title = "Kerberos RBCD against computers"
         self.description = (
@@ -14,12 +14,18 @@ from urllib.parse import quote
 class graph_path_objects_to_da(Control):
     "Legacy control"
 
+    control_key = "graph_path_objects_to_da"
+    request_keys = [
+        "domains",
+        "nb_domain_collected",
+        "objects_to_domain_admin",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "graph_path_objects_to_da"
 
         self.title = "Paths to Domain Admins"
         self.description = "Compromission paths from some Active Directory object to domain admin privileges."
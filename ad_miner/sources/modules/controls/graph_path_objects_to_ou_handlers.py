@@ -19,12 +19,20 @@ from tqdm import tqdm
 class graph_path_objects_to_ou_handlers(Control):
     "Legacy control"
 
+    control_key = "graph_path_objects_to_ou_handlers"
+    request_keys = [
+        "compromise_paths_of_OUs",
+        "objects_to_domain_admin",
+        "set_containsda",
+        "set_containsdc",
+        "vulnerable_OU_impact",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "graph_path_objects_to_ou_handlers"
 
         self.title = "Paths to Organizational Units (OU)"
         self.description = "Objects that have paths to compromise OU handlers."
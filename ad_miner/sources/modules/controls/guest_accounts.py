@@ -9,12 +9,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class guest_accounts(Control):
     "Legacy control"
 
+    control_key = "guest_accounts"
+    request_keys = ["guest_accounts"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "guest_accounts"
 
         self.title = "Guest accounts"
         self.description = "List of guest accounts"
@@ -13,12 +13,14 @@ from urllib.parse import quote
 class has_sid_history(Control):
     "Legacy control"
 
+    control_key = "has_sid_history"
+    request_keys = ["has_sid_history", "users_admin_on_computers"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "has_sid_history"
 
         self.title = "Objects with SID history"
         self.description = "SID History (Security Identifier History) is a feature that allows a user or group to retain access to resources that they had permissions for in a different domain. This feature is particularly useful in scenarios involving domain migrations, domain trust relationships, or domain reorganizations."
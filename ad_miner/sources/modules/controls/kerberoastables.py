@@ -13,12 +13,14 @@ from urllib.parse import quote
 class kerberoastables(Control):
     "Legacy control"
 
+    control_key = "kerberoastables"
+    request_keys = ["nb_kerberoastable_accounts"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "kerberos"
-        self.control_key = "kerberoastables"
 
         self.title = "Kerberoastable accounts"
         self.description = "Some accounts are vulnerable to a Kerberoasting attack. If their password is weak, it could be recovered in plaintext."
@@ -11,12 +11,14 @@ from ad_miner.sources.modules.common_analysis import time_since
 class krb_last_change(Control):  # TODO change the class name
     "Docstring of my control"  # TODO small documentation here
 
+    control_key = "krb_last_change"
+    request_keys = ["krb_pwd_last_change"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "kerberos"
-        self.control_key = "krb_last_change"
 
         self.title = "Old KRBTGT password"
         self.description = "Last change of password for KRBTGT account."
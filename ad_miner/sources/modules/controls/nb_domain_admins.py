@@ -11,12 +11,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class nb_domain_admins(Control):
     "Legacy control"
 
+    control_key = "nb_domain_admins"
+    request_keys = ["nb_domain_admins"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "nb_domain_admins"
 
         self.title = "Inadequate number of domain admins"
         self.description = "These accounts are the most privileged and have unlimited access to the AD infrastructure."
@@ -12,14 +12,19 @@ from ad_miner.sources.modules.common_analysis import percentage_superior
 class never_expires(Control):
     "Legacy control"
 
+    control_key = "never_expires"
+    request_keys = [
+        "nb_domain_admins",
+        "nb_enabled_accounts",
+        "user_password_never_expires",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "passwords"
 
-        self.control_key = "never_expires"
-
         self.title = "Users without password expiration"
         self.description = "These accounts have their passwords set to never expire."
         self.risk = "Ideally, this list should be empty. Non-expiring passwords are easier to exploit for an attacker."
@@ -16,15 +16,16 @@ from urllib.parse import quote
 class non_dc_with_unconstrained_delegations(Control):
     "Legacy control"
 
+    # Do NOT change existing control_key, as it will break evolution with older ad miner versions
+    control_key = "non-dc_with_unconstrained_delegations"
+    request_keys = ["kud"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "kerberos"
 
-        # Do NOT change existing control_key, as it will break evolution with older ad miner versions
-        self.control_key = "non-dc_with_unconstrained_delegations"
-
         self.title = "Kerberos unconstrained delegations"
         self.description = "These objects are allowed to connect to any service with the identity of another user who connected to them."
         self.interpretation = ""
@@ -15,15 +15,16 @@ from urllib.parse import quote
 class objects_to_adcs(Control):
     "Legacy control"
 
+    # Do NOT change existing control_key, as it will break evolution with older ad miner versions
+    control_key = "objects_to_adcs"
+    request_keys = ["objects_to_adcs"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
 
-        # Do NOT change existing control_key, as it will break evolution with older ad miner versions
-        self.control_key = "objects_to_adcs"
-
         self.title = "Non-tier 0 local admin privs on ADCS"
         self.description = "ADCS (Active Directory Certificate Services) is a Windows Server feature that provides a customizable certification authority (CA) for issuing and managing digital certificates. Digital certificates are used to authenticate and secure communication between devices, servers, and users on a network."
         self.interpretation = ""
@@ -14,12 +14,14 @@ from urllib.parse import quote
 class objects_to_operators_member(Control):
     "Legacy control"
 
+    control_key = "objects_to_operators_member"
+    request_keys = ["objects_to_operators_groups", "objects_to_operators_member"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "objects_to_operators_member"
 
         self.title = "Paths to Operators Groups"
         self.description = "Objects with a compromission path to an Operator Group."
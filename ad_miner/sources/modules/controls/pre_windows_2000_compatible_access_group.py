@@ -10,12 +10,14 @@ from ad_miner.sources.modules import generic_formating
 class pre_windows_2000_compatible_access_group(Control):
     "Docstring of my control"
 
+    control_key = "pre_windows_2000_compatible_access_group"
+    request_keys = ["pre_windows_2000_compatible_access_group"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "pre_windows_2000_compatible_access_group"
 
         self.title = '"Pre-Windows 2000 Compatible Access" group'
         self.description = (
@@ -12,12 +12,14 @@ import json
 class primaryGroupID_lower_than_1000(Control):
     "Legacy control"
 
+    control_key = "rid_singularities"
+    request_keys = ["primaryGroupID_lower_than_1000"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "rid_singularities"
 
         self.title = "Unexpected PrimaryGroupID"
         self.description = (
@@ -9,12 +9,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class privileged_accounts_outside_Protected_Users(Control):
     "Legacy control"
 
+    control_key = "privileged_accounts_outside_Protected_Users"
+    request_keys = ["nb_domain_admins"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "privileged_accounts_outside_Protected_Users"
 
         self.title = "Privileged account outside the protected users group"
         self.description = (
@@ -13,12 +13,14 @@ import json
 class server_users_could_be_admin(Control):
     "Legacy control"
 
+    control_key = "server_users_could_be_admin"
+    request_keys = []
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "server_users_could_be_admin"
 
         self.title = "Paths to servers"
         self.description = (
@@ -8,12 +8,14 @@ from ad_miner.sources.modules.common_analysis import presence_of, createGraphPag
 class unpriv_to_dnsadmins(Control):
     "Legacy control"
 
+    control_key = "unpriv_to_dnsadmins"
+    request_keys = ["unpriv_to_dnsadmins"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "unpriv_to_dnsadmins"
 
         self.title = "Paths to DNS Admins"
         self.description = (
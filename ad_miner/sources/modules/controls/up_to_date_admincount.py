@@ -8,12 +8,14 @@ from ad_miner.sources.modules.grid_class import Grid
 class up_to_date_admincount(Control):
     "Docstring of my control"
 
+    control_key = "up_to_date_admincount"
+    request_keys = ["nb_domain_admins", "unpriviledged_users_with_admincount"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "up_to_date_admincount"
 
         self.title = "Inadequate AdminCount settings"
         self.description = "Discrepancies in 'adminCount' attribute for accounts"
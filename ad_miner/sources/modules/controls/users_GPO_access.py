@@ -18,11 +18,20 @@ import json
 class users_GPO_access(Control):
     "Legacy control"
 
+    control_key = "users_GPO_access"
+    request_keys = [
+        "unpriv_users_to_GPO",
+        "unpriv_users_to_GPO_computer_not_enforced",
+        "unpriv_users_to_GPO_init",
+        "unpriv_users_to_GPO_user_enforced",
+        "unpriv_users_to_GPO_user_not_enforced",
+        "users_admin_on_computers",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "users_GPO_access"
 
         self.title = "Inadequate GPO modifications privileges"
         self.description = "GPOs that can be edited by unprivileged users."
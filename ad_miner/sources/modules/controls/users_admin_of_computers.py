@@ -25,12 +25,24 @@ from tqdm import tqdm
 class users_admin_of_computers(Control):
     "Legacy control"
 
+    control_key = "users_admin_of_computers"
+    request_keys = [
+        "get_computers_linked_admin_group",
+        "get_groups_linked_admin_group",
+        "get_users_direct_admin",
+        "get_users_linked_admin_group",
+        "nb_enabled_accounts",
+        "nb_kerberoastable_accounts",
+        "objects_to_domain_admin",
+        "password_last_change",
+        "users_admin_on_computers",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "users_admin_of_computers"
 
         self.title = "Users with local admin privileges"
         self.description = "Users have administration rights over machines, creating potential compromission paths."
@@ -13,12 +13,14 @@ import json
 class users_constrained_delegations(Control):
     "Legacy control"
 
+    control_key = "users_constrained_delegations"
+    request_keys = ["users_constrained_delegations"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "kerberos"
-        self.control_key = "users_constrained_delegations"
 
         self.title = "Kerberos constrained delegation"
         self.description = "These accounts have constrained delegations privileges."
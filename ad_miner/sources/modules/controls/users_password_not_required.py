@@ -12,12 +12,14 @@ from ad_miner.sources.modules.common_analysis import presence_of
 class users_password_not_required(Control):
     "Legacy control"
 
+    control_key = "users_password_not_required"
+    request_keys = ["get_users_password_not_required"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "passwords"
-        self.control_key = "users_password_not_required"
 
         self.title = "Password requirement bypass"
         self.description = "Those users have the attribute 'Password not required'. This attribute technically allows the account to accept blank password to be set and even override the password policy of the company."
@@ -12,14 +12,15 @@ import json
 class users_pwd_cleartext(Control):
     "Legacy control"
 
+    control_key = "users_pwd_cleartext"
+    request_keys = ["nb_user_password_cleartext"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "passwords"
 
-        self.control_key = "users_pwd_cleartext"
-
         self.title = "Users with cleartext passwords"
         self.description = (
             "These users have their passwords stored somewhere in plaintext."
@@ -12,14 +12,19 @@ from ad_miner.sources.modules.common_analysis import percentage_superior
 class users_pwd_not_changed_since(Control):
     "Legacy control"
 
+    control_key = "users_pwd_not_changed_since"
+    request_keys = [
+        "nb_domain_admins",
+        "nb_enabled_accounts",
+        "password_last_change",
+    ]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "passwords"
 
-        self.control_key = "users_pwd_not_changed_since"
-
         self.title = "Users with old passwords"
         self.description = (
             "These accounts have not changed their password for a long period of time."
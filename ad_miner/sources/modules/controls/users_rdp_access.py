@@ -13,12 +13,14 @@ from urllib.parse import quote
 class users_rdp_access(Control):
     "Legacy control"
 
+    control_key = "users_rdp_access"
+    request_keys = ["nb_enabled_accounts", "rdp_access"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "users_rdp_access"
 
         self.title = "RDP access (users)"
         self.description = "Users who are allowed to access computers through Remote Desktop Protocol (RDP)."
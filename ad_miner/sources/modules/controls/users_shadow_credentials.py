@@ -15,12 +15,14 @@ from urllib.parse import quote
 class users_shadow_credentials(Control):  # TODO change the class name
     "Legacy control"  # TODO small documentation here
 
+    control_key = "users_shadow_credentials"
+    request_keys = ["users_shadow_credentials"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "kerberos"
-        self.control_key = "users_shadow_credentials"
 
         self.title = "Shadow Credentials on privileged accounts"
         self.description = "The following list shows users having sufficient privileges to perform shadow credentials on target privileged users."
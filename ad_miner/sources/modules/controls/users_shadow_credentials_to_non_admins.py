@@ -15,10 +15,12 @@ from urllib.parse import quote
 class TestControle1(Control):
     "This is my control"
 
+    control_key = "users_shadow_credentials_to_non_admins"
+    request_keys = ["users_shadow_credentials_to_non_admins"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
         self.azure_or_onprem = "on_premise"
-        self.control_key = "users_shadow_credentials_to_non_admins"
         self.category = "kerberos"
 
         self.title = "Shadow Credentials on regular accounts"
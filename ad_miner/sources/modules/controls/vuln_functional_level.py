@@ -9,12 +9,14 @@ from ad_miner.sources.modules.grid_class import Grid
 class vuln_functional_level(Control):
     "Legacy control"
 
+    control_key = "vuln_functional_level"
+    request_keys = ["vuln_functional_level"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "misc"
-        self.control_key = "vuln_functional_level"
 
         self.title = "Functional level of the domain"
         self.description = "The functional level of an Active Directory domain refers to the level of compatibility and functionality that the domain supports. It determines which features and capabilities are available for the domain controllers within that domain."
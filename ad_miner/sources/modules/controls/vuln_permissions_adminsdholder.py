@@ -8,12 +8,14 @@ from ad_miner.sources.modules.common_analysis import presence_of, createGraphPag
 class vuln_permissions_adminsdholder(Control):
     "Legacy control"
 
+    control_key = "vuln_permissions_adminsdholder"
+    request_keys = ["vuln_permissions_adminsdholder"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
         self.azure_or_onprem = "on_premise"
         self.category = "permissions"
-        self.control_key = "vuln_permissions_adminsdholder"
 
         self.title = "Paths to the AdminSDHolder container"
         self.description = "Paths to the AdminSDHolder container"
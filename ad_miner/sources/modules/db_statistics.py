@@ -0,0 +1,101 @@
+import json
+import re
+from hashlib import md5
+
+# Scope queries that only count the nodes of a label (or every node)
+LABEL_COUNT_QUERY = re.compile(
+    r"^\s*MATCH \((\w+)(?::(\w+))?\) RETURN count\(\1\)\s*$", re.IGNORECASE
+)
+
+
+def escape(name):
+    """Label or relation type quoted for a cypher pattern"""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def counts_query(labels, relation_types):
+    """Single query counting the nodes of every label and the relations
+    of every type. Each count is a subquery of its own so that neo4j
+    answers it from its count store, without scanning the graph."""
+    subqueries = ["CALL { MATCH (n) RETURN count(n) AS nodes }"]
+    for i, label in enumerate(labels):
+        subqueries.append(
+            "CALL { MATCH (n:%s) RETURN count(n) AS label_%d }" % (escape(label), i)
+        )
+    for i, relation_type in enumerate(relation_types):
+        subqueries.append(
+            "CALL { MATCH ()-[r:%s]->() RETURN count(r) AS relation_%d }"
+            % (escape(relation_type), i)
+        )
+    return " ".join(subqueries) + " RETURN *"
+
+
+class DatabaseStatistics:
+    """Number of nodes of each label and of relations of each type.
+
+    They are read in constant time from the count store of neo4j, once
+    and then again only when a write request may have changed them
+    (invalidate). They give the size of the database, the size of scope
+    queries that only count a label (no need to run them), and a
+    fingerprint of the database for the cache.
+
+    Relations of ignored_relation_types (written by AD Miner itself) are
+    left out of every count."""
+
+    def __init__(self, ignored_relation_types=()):
+        self.ignored_relation_types = set(ignored_relation_types)
+        self.total_nodes = 0
+        self.total_relations = 0
+        self.labels = {}
+        self.relation_types = {}
+        self.stale = True
+
+    def refresh(self, driver):
+        with driver.session() as session:
+            labels = session.run("CALL db.labels() YIELD label RETURN label").value()
+            relation_types = [
+                relation_type
+                for relation_type in session.run(
+                    "CALL db.relationshipTypes() YIELD relationshipType "
+                    "RETURN relationshipType"
+                ).value()
+                if relation_type not in self.ignored_relation_types
+            ]
+            counts = session.run(counts_query(labels, relation_types)).single()
+
+        self.total_nodes = counts["nodes"]
+        self.labels = {label: counts["label_%d" % i] for i, label in enumerate(labels)}
+        self.relation_types = {
+            relation_type: counts["relation_%d" % i]
+            for i, relation_type in enumerate(relation_types)
+        }
+        self.total_relations = sum(self.relation_types.values())
+        self.stale = False
+        return self
+
+    def invalidate(self):
+        """Counts are read again the next time they are needed"""
+        self.stale = True
+
+    def node_count(self, driver, label=None):
+        """Number of nodes of a label, of every node if label is None"""
+        if self.stale:
+            self.refresh(driver)
+        if label is None:
+            return self.total_nodes
+        return self.labels.get(label, 0)
+
+    def scope_size(self, driver, scope_query):
+        """Result of a scope query that only counts the nodes of a label,
+        None for other scope queries"""
+        match = LABEL_COUNT_QUERY.match(scope_query)
+        if match is None:
+            return None
+        return self.node_count(driver, match.group(2))
+
+    def fingerprint(self):
+        """Hash of every count, changes when the database does"""
+        counts = json.dumps(
+            [self.total_nodes, self.labels, self.relation_types], sort_keys=True
+        )
+        return md5(counts.encode(), usedforsecurity=False).hexdigest()
@@ -0,0 +1,213 @@
+from heapq import heapify, heappop, heappush
+
+import numpy as np
+
+# Cost of relations missing from exploitability_ratings.json,
+# same value as the set_default_exploitability_rating request
+DEFAULT_EXPLOITABILITY_RATING = 100
+
+
+class GraphSnapshot:
+    """In-memory copy of the relations of the neo4j database used by path
+    requests. Incoming relations are stored in CSR form (in_ptr, in_src,
+    in_type) over dense node indices so that searches can start from the
+    targets and walk the relations backward."""
+
+    def __init__(self, edges):
+        sources = []
+        targets = []
+        types = []
+        self.relation_types = []
+        type_index = {}
+        for source, target, relation_type in edges:
+            if relation_type not in type_index:
+                type_index[relation_type] = len(self.relation_types)
+                self.relation_types.append(relation_type)
+            sources.append(source)
+            targets.append(target)
+            types.append(type_index[relation_type])
+
+        self.type_index = type_index
+
+        neo4j_ids = np.array(sources + targets, dtype=np.int64)
+        self.node_ids, dense = np.unique(neo4j_ids, return_inverse=True)
+        self.index_of = {int(i): index for index, i in enumerate(self.node_ids)}
+        nb_nodes = len(self.node_ids)
+        nb_edges = len(sources)
+
+        dense_sources = dense[:nb_edges]
+        dense_targets = dense[nb_edges:]
+        edge_types = np.array(types, dtype=np.int32)
+
+        order = np.argsort(dense_targets, kind="stable")
+        self.in_src = dense_sources[order]
+        self.in_type = edge_types[order]
+        self.in_ptr = np.zeros(nb_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dense_targets, minlength=nb_nodes), out=self.in_ptr[1:])
+
+        # Filled on demand with node properties needed to build Path objects
+        self.nodes = {}
+
+        # Python lists of the CSR arrays, built on demand for weighted searches
+        self._lists = None
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def relation_mask(self, relation_types):
+        """Boolean array telling which relation type indices are allowed"""
+        mask = np.zeros(len(self.relation_types), dtype=bool)
+        for relation_type in relation_types:
+            if relation_type in self.type_index:
+                mask[self.type_index[relation_type]] = True
+        return mask
+
+    def relation_weights(self, ratings, default=DEFAULT_EXPLOITABILITY_RATING):
+        """Cost of each relation type index, from exploitability ratings"""
+        return [ratings.get(t, default) for t in self.relation_types]
+
+    def as_lists(self):
+        """(in_ptr, in_src, in_type) as python lists, faster than numpy
+        arrays when accessed element by element"""
+        if self._lists is None:
+            self._lists = (
+                self.in_ptr.tolist(),
+                self.in_src.tolist(),
+                self.in_type.tolist(),
+            )
+        return self._lists
+
+    def dense_indices(self, neo4j_ids):
+        """Dense indices of the given neo4j ids, ids without relations are dropped"""
+        return np.array(
+            [self.index_of[i] for i in neo4j_ids if i in self.index_of],
+            dtype=np.int64,
+        )
+
+    def relations(self):
+        """Generator of (neo4j source id, neo4j target id, relation type)"""
+        heads = np.repeat(np.arange(len(self)), np.diff(self.in_ptr))
+        for source, target, relation_type in zip(
+            self.node_ids[self.in_src].tolist(),
+            self.node_ids[heads].tolist(),
+            self.in_type.tolist(),
+        ):
+            yield source, target, self.relation_types[relation_type]
+
+    def incoming(self, frontier):
+        """All relations ending in the frontier nodes as
+        (relation head, relation tail, relation type) arrays"""
+        starts = self.in_ptr[frontier]
+        counts = self.in_ptr[frontier + 1] - starts
+        # Position of the first relation of each node, repeated for each of
+        # its relations, minus the relations of the previous nodes
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        positions = offsets + np.arange(int(counts.sum()))
+        heads = np.repeat(frontier, counts)
+        return heads, self.in_src[positions], self.in_type[positions]
+
+
+def reverse_bfs(snapshot, targets, relation_mask, max_depth):
+    """Breadth-first search from all targets at once, following relations
+    backward. Returns, for every node, its distance to the closest target
+    (-1 if unreachable) and the next node and relation type toward it."""
+    nb_nodes = len(snapshot)
+    distance = np.full(nb_nodes, -1, dtype=np.int32)
+    next_hop = np.full(nb_nodes, -1, dtype=np.int64)
+    next_type = np.full(nb_nodes, -1, dtype=np.int32)
+
+    frontier = np.unique(targets)
+    distance[frontier] = 0
+    depth = 0
+    while frontier.size and depth < max_depth:
+        depth += 1
+        heads, tails, types = snapshot.incoming(frontier)
+        keep = relation_mask[types] & (distance[tails] == -1)
+        tails, first = np.unique(tails[keep], return_index=True)
+        distance[tails] = depth
+        next_hop[tails] = heads[keep][first]
+        next_type[tails] = types[keep][first]
+        frontier = tails
+
+    return distance, next_hop, next_type
+
+
+def reverse_dijkstra(snapshot, targets, relation_mask, weights):
+    """Multi-source Dijkstra (binary heap) from all targets at once,
+    following relations backward with exploitability ratings as costs.
+    Same paths as gds.allShortestPaths.dijkstra.stream on the reversed
+    projection used by GDS requests. Returns the cost to the closest
+    target (None if unreachable) and the next node and relation type."""
+    in_ptr, in_src, in_type = snapshot.as_lists()
+    nb_nodes = len(snapshot)
+    cost = [None] * nb_nodes
+    next_hop = [-1] * nb_nodes
+    next_type = [-1] * nb_nodes
+    done = bytearray(nb_nodes)
+
+    heap = [(0, target) for target in set(targets.tolist())]
+    for _, target in heap:
+        cost[target] = 0
+    heapify(heap)
+
+    while heap:
+        node_cost, node = heappop(heap)
+        if done[node]:
+            continue
+        done[node] = 1
+        for position in range(in_ptr[node], in_ptr[node + 1]):
+            relation_type = in_type[position]
+            if not relation_mask[relation_type]:
+                continue
+            tail = in_src[position]
+            tail_cost = node_cost + weights[relation_type]
+            if cost[tail] is None or tail_cost < cost[tail]:
+                cost[tail] = tail_cost
+                next_hop[tail] = node
+                next_type[tail] = relation_type
+                heappush(heap, (tail_cost, tail))
+
+    return cost, next_hop, next_type
+
+
+def follow(snapshot, source, next_hop, next_type):
+    """Path from source to its target as ([neo4j ids], [relation types])"""
+    node_ids = []
+    relation_types = []
+    node = source
+    while next_hop[node] != -1:
+        node_ids.append(int(snapshot.node_ids[node]))
+        relation_types.append(snapshot.relation_types[next_type[node]])
+        node = next_hop[node]
+    node_ids.append(int(snapshot.node_ids[node]))
+    relation_types.append("")
+    return node_ids, relation_types
+
+
+def shortest_paths_to_targets(
+    snapshot, sources, target_partitions, relation_types, max_depth, weights=None
+):
+    """One shortest path per reachable source and per partition of targets.
+    Each partition is explored with a single reverse search, whatever its
+    number of targets: breadth-first (at most max_depth relations long)
+    or, when weights are given, Dijkstra on the exploitability ratings.
+    Yields ([neo4j ids], [relation types]) from the source to the target."""
+    relation_mask = snapshot.relation_mask(relation_types)
+    sources = snapshot.dense_indices(sources)
+
+    for targets in target_partitions.values():
+        targets = snapshot.dense_indices(targets)
+        if targets.size == 0:
+            continue
+        if weights is None:
+            _, next_hop, next_type = reverse_bfs(
+                snapshot, targets, relation_mask, max_depth
+            )
+            reached = sources[next_hop[sources] != -1]
+        else:
+            _, next_hop, next_type = reverse_dijkstra(
+                snapshot, targets, relation_mask, weights
+            )
+            reached = [source for source in sources.tolist() if next_hop[source] != -1]
+        for source in reached:
+            yield follow(snapshot, source, next_hop, next_type)
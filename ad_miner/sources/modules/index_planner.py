@@ -0,0 +1,110 @@
+import re
+
+# Fields of requests.json containing cypher run by AD Miner
+QUERY_FIELDS = [
+    "request",
+    "scope_query",
+    "gds_request",
+    "gds_scope_query",
+    "native_sources",
+    "native_targets",
+    "progressive_request",
+]
+
+# (n:Label:Other {prop: value, ...})
+LABELED_NODE = re.compile(r"\((\w*)((?::\w+)+)\s*(\{[^}]*\})?")
+# (n {prop: value, ...}), no label so no index can be used
+UNLABELED_NODE = re.compile(r"\((\w*)\s*\{([^}]*)\}")
+MAP_KEY = re.compile(r"(\w+)\s*:")
+# n.prop = ..., n.prop IN ..., n.prop > ..., n.prop STARTS WITH ..., n.prop IS NOT NULL
+PREDICATE = re.compile(
+    r"\b(\w+)\.(\w+)(?:\s*(?:=(?!~)|<=|>=|<(?!>)|>)|\s+(?:IN|STARTS WITH|IS NOT NULL)\b)",
+    re.IGNORECASE,
+)
+
+# SET, ON CREATE SET and ON MATCH SET clauses: assigned properties are not
+# filtered on. A clause ends at the next clause keyword, or at the bracket
+# closing the subquery or FOREACH it is in.
+SET_CLAUSE = re.compile(r"(?<![.\w])(?:ON\s+(?:CREATE|MATCH)\s+)?SET\b", re.IGNORECASE)
+CLAUSE_TOKEN = re.compile(
+    # Strings and STARTS WITH / ENDS WITH, skipped
+    r"""(?P<skipped>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`|"""
+    r"(?<![.\w])(?:STARTS|ENDS)\s+WITH\b)"
+    r"|(?P<opening>[(\[{])|(?P<closing>[)\]}])"
+    r"|(?<![.\w])(?:MATCH|OPTIONAL|WITH|RETURN|MERGE|CREATE|DELETE|DETACH|REMOVE|"
+    r"CALL|UNWIND|FOREACH|UNION|ON|SET|WHERE|LIMIT|SKIP|ORDER|YIELD)\b",
+    re.IGNORECASE,
+)
+
+
+def remove_assignments(query):
+    """Query without its SET clauses"""
+    parts = []
+    position = 0
+    for clause in SET_CLAUSE.finditer(query):
+        if clause.start() < position:
+            continue
+        parts.append(query[position : clause.start()])
+        depth = 0
+        end = len(query)
+        for token in CLAUSE_TOKEN.finditer(query, clause.end()):
+            if token.group("skipped"):
+                continue
+            if token.group("opening"):
+                depth += 1
+            elif token.group("closing"):
+                depth -= 1
+                if depth < 0:
+                    end = token.start()
+                    break
+            elif depth == 0:
+                end = token.start()
+                break
+        position = end
+    parts.append(query[position:])
+    return " ".join(parts)
+
+
+def query_predicates(query):
+    """(label, property) pairs a query filters on, and properties filtered
+    on nodes without label. Properties only assigned (SET) are ignored."""
+    query = remove_assignments(query)
+    indexable = set()
+    unlabeled = set()
+    labels_of = {}
+
+    for variable, labels, properties in LABELED_NODE.findall(query):
+        labels = labels.split(":")[1:]
+        if variable:
+            labels_of.setdefault(variable, labels)
+        for key in MAP_KEY.findall(properties):
+            for label in labels:
+                indexable.add((label, key))
+
+    for _, properties in UNLABELED_NODE.findall(query):
+        unlabeled.update(MAP_KEY.findall(properties))
+
+    for variable, key in PREDICATE.findall(query):
+        for label in labels_of.get(variable, []):
+            indexable.add((label, key))
+
+    return indexable, unlabeled
+
+
+def plan_indexes(requests):
+    """Requests using each (label, property) pair, and requests filtering
+    unlabeled nodes on each property. Flags set by AD Miner on a label
+    (e.g. Group{is_dag:true}) are kept: few nodes have them."""
+    indexable = {}
+    unlabeled = {}
+    for request_key, request in requests.items():
+        for field in QUERY_FIELDS:
+            if not isinstance(request.get(field), str):
+                continue
+            pairs, properties = query_predicates(request[field])
+            for pair in pairs:
+                indexable.setdefault(pair, set()).add(request_key)
+            for key in properties:
+                unlabeled.setdefault(key, set()).add(request_key)
+
+    return indexable, unlabeled
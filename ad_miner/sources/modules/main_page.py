@@ -3,7 +3,7 @@ import os
 from datetime import datetime
 from operator import add
 from urllib.parse import quote
-from numpy import pi, cos, sin, linspace
+from math import pi, cos, sin
 from random import randint
 
 from ad_miner.sources.modules import common_analysis
@@ -0,0 +1,148 @@
+from array import array
+from bisect import bisect_left
+
+# Relationship type written to the database for every (member, group) pair
+# of the closure. It is an AD Miner artifact and is ignored by path finding.
+CLOSURE_RELATION = "TransitiveMemberOf"
+
+
+def strongly_connected_components(adjacency):
+    """Iterative Tarjan algorithm.
+    Yields the components in reverse topological order (sinks first),
+    which is the order needed to compute a closure in one pass."""
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    counter = 0
+
+    for root in adjacency:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adjacency.get(root, ())))]
+
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(adjacency.get(child, ()))))
+                    break
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    yield component
+
+
+class MembershipClosure:
+    """Effective (transitive) group membership of every principal.
+
+    Built once from the direct MemberOf edges, it replaces the
+    MemberOf*1..X expansions that used to be re-walked by many requests.
+    Each principal maps to a sorted array of group ids. Principals of the
+    same nesting cycle, or with the same direct groups, share one array."""
+
+    def __init__(self, edges):
+        adjacency = {}
+        for member, group in edges:
+            adjacency.setdefault(member, []).append(group)
+
+        self._closure = {}
+        self._members = None
+        self.nb_pairs = 0
+
+        component_of = {}
+        component_closure = {}
+        interned = {}
+
+        for component_id, component in enumerate(
+            strongly_connected_components(adjacency)
+        ):
+            for node in component:
+                component_of[node] = component_id
+
+            if len(component) == 1:
+                direct_groups = tuple(sorted(set(adjacency.get(component[0], ()))))
+                if not direct_groups:
+                    continue
+                groups = interned.get(direct_groups)
+                if groups is None:
+                    groups = self._compute(
+                        direct_groups, component_id, component_of, component_closure
+                    )
+                    interned[direct_groups] = groups
+            else:
+                # Nesting cycle: every group of the cycle is a member of all
+                # the others (and of itself), they share the same closure
+                direct_groups = set()
+                for node in component:
+                    direct_groups.update(adjacency.get(node, ()))
+                groups = self._compute(
+                    direct_groups, component_id, component_of, component_closure
+                )
+
+            component_closure[component_id] = groups
+            for node in component:
+                self._closure[node] = groups
+                self.nb_pairs += len(groups)
+
+    @staticmethod
+    def _compute(direct_groups, component_id, component_of, component_closure):
+        reachable = set(direct_groups)
+        for group in direct_groups:
+            group_component = component_of[group]
+            if group_component != component_id:
+                reachable.update(component_closure.get(group_component, ()))
+        return array("q", sorted(reachable))
+
+    def __len__(self):
+        return len(self._closure)
+
+    def __contains__(self, node_id):
+        return node_id in self._closure
+
+    def groups_of(self, node_id):
+        """Sorted ids of every group node_id is (directly or not) a member of"""
+        return self._closure.get(node_id, array("q"))
+
+    def is_member(self, node_id, group_id):
+        groups = self._closure.get(node_id)
+        if not groups:
+            return False
+        position = bisect_left(groups, group_id)
+        return position < len(groups) and groups[position] == group_id
+
+    def members_of(self, group_id):
+        """Sorted ids of every principal (directly or not) member of group_id"""
+        if self._members is None:
+            members = {}
+            for node, groups in self._closure.items():
+                for group in groups:
+                    members.setdefault(group, []).append(node)
+            self._members = {
+                group: array("q", sorted(nodes)) for group, nodes in members.items()
+            }
+        return self._members.get(group_id, array("q"))
+
+    def items(self):
+        """(member, groups) for every principal member of at least one group"""
+        return self._closure.items()
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from ad_miner.sources.modules import logger
+
+# Number of allocation sites reported for each step
+TOP_ALLOCATIONS = 5
+
+# Interval (in seconds) between two RSS samples during a step
+RSS_SAMPLING_INTERVAL = 0.05
+
+
+def rss():
+    """Resident memory of the current process in bytes (None if
+    /proc is not available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class RSSSampler(threading.Thread):
+    """Highest resident memory of the process while it runs"""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = rss()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(RSS_SAMPLING_INTERVAL):
+            current = rss()
+            if current is not None and current > (self.peak or 0):
+                self.peak = current
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.peak
+
+
+class MemoryTracker:
+    """Memory used by each step of a run (--memory_profile): requests,
+    compute_common_cache and controls.
+
+    For each step, tracemalloc gives the peak and retained (still
+    allocated at the end of the step) python memory and the allocation
+    sites that retained the most. The RSS of the process is sampled in
+    a thread, it also counts memory not allocated by python (neo4j
+    driver buffers, numpy...)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.steps = []
+
+    def start(self):
+        self.enabled = True
+        tracemalloc.start()
+
+    @contextmanager
+    def step(self, kind, name):
+        """Measure the memory used by the body of the with statement.
+        Yields the record of the step, filled at the end of the step."""
+        record = {}
+        if not self.enabled:
+            yield record
+            return
+
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        start_snapshot = tracemalloc.take_snapshot()
+        sampler = RSSSampler()
+        start_rss = sampler.peak
+        sampler.start()
+        try:
+            yield record
+        finally:
+            peak_rss = sampler.stop()
+            current, peak = tracemalloc.get_traced_memory()
+            statistics = tracemalloc.take_snapshot().compare_to(
+                start_snapshot, "lineno"
+            )
+            record.update(
+                kind=kind,
+                name=name,
+                peak=peak - start_memory,
+                retained=current - start_memory,
+                rss_start=start_rss,
+                rss_peak=peak_rss,
+                top_allocations=[
+                    {"site": str(stat.traceback), "size": stat.size_diff}
+                    for stat in statistics[:TOP_ALLOCATIONS]
+                    if stat.size_diff > 0
+                ],
+            )
+            self.steps.append(record)
+            logger.print_debug(
+                "Memory : peak %.1f MB, retained %.1f MB"
+                % (record["peak"] / 2**20, record["retained"] / 2**20)
+            )
+
+    def add_steps(self, records):
+        """Steps measured in worker processes (parallel controls)"""
+        self.steps.extend(record for record in records if record)
+
+    def report(self, file_path):
+        """Print the steps using the most memory and write every step
+        in file_path"""
+        if not self.enabled:
+            return
+        logger.print_magenta("Steps with the highest memory peak")
+        for record in sorted(self.steps, key=lambda r: -r["peak"])[:10]:
+            print(
+                "    %9.1f MB peak %9.1f MB retained  %s %s"
+                % (
+                    record["peak"] / 2**20,
+                    record["retained"] / 2**20,
+                    record["kind"],
+                    record["name"],
+                )
+            )
+        with open(file_path, "w") as f:
+            json.dump(self.steps, f, indent=4)
+        logger.print_success("Memory profile written in %s" % file_path)
+
+
+# Shared by the main process and the forked control workers
+tracker = MemoryTracker()
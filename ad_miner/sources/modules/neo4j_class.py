@@ -1,5 +1,8 @@
+import asyncio
 import datetime
 import multiprocessing as mp
+import os
+import shutil
 import sys
 import time
 import json
@@ -17,11 +20,55 @@ from ad_miner.sources.modules import cache_class, logger, generic_computing
 from ad_miner.sources.modules.graph_class import Graph
 from ad_miner.sources.modules.node_neo4j import Node
 from ad_miner.sources.modules.path_neo4j import Path
+from ad_miner.sources.modules.membership_closure import (
+    MembershipClosure,
+    CLOSURE_RELATION,
+)
+from ad_miner.sources.modules.graph_engine import (
+    DEFAULT_EXPLOITABILITY_RATING,
+    GraphSnapshot,
+    shortest_paths_to_targets,
+)
+from ad_miner.sources.modules.path_store import PathStore, write_shard
+from ad_miner.sources.modules.chunk_encoding import EncodedPaths, EncodedRecords
+from ad_miner.sources.modules.index_planner import plan_indexes
+from ad_miner.sources.modules.telemetry import Telemetry, chunk_bounds, chunk_stats
+from ad_miner.sources.modules.db_statistics import DatabaseStatistics
+from ad_miner.sources.modules.chunk_planner import (
+    balanced_chunks,
+    balanced_queries,
+    scoped_parts,
+)
+from ad_miner.sources.modules.scan_fusion import (
+    FUSED_REQUESTS,
+    ScannedNode,
+    scan_query,
+)
+from ad_miner.sources.modules.query_audit import (
+    AUDITED_FIELDS,
+    PARAMETERS,
+    audit_plan,
+    explainable_query,
+    summarize_profile,
+)
 from ad_miner.sources.modules.utils import timer_format, grid_data_stringify
 from ad_miner.sources.modules.common_analysis import createGraphPage
 
 MODULES_DIRECTORY = pathlib(__file__).parent
 
+# Maximum number of rows (or relations) written in a single transaction
+BULK_WRITE_BATCH_SIZE = 10000
+
+# Maximum number of node ids sent as parameter of a single query
+NATIVE_PATHS_BATCH_SIZE = 10000
+
+# Maximum number of reverse searches (target partitions) of a native path
+# request, each one walking the graph: with more, the cypher request is run
+NATIVE_PATHS_MAX_SEARCHES = 100
+
+# Maximum time (in seconds) to wait for the indexes created by AD Miner
+INDEX_TIMEOUT = 600
+
 # 🥒 This is a quick import of a fix from @Sopalinge
 # 🥒 Following code should be removed when neo4j implements
 # 🥒 serialization of neo4j datetime objects
@@ -61,8 +108,6 @@ def pre_request(arguments):
                     "MATCH (a) WHERE a.lastlogon IS NOT NULL return toInteger(a.lastlogon) as last order by last desc LIMIT 1"
                 ):
                     date_lastlogon = record.data()
-
-        driver.close()
     except Exception as e:
         logger.print_error("Connection to neo4j database impossible.")
         logger.print_error("The default Bloodhound CE neo4j password is bloodhoundcommunityedition.")
@@ -78,8 +123,6 @@ def pre_request(arguments):
                     "CALL dbms.components() YIELD versions RETURN versions[0] AS version"
                 ):
                     neo4j_version = record.data()
-
-        driver.close()
     except Exception as e:
         logger.print_error("Neo4J could not be found.")
         logger.print_error(e)
@@ -97,30 +140,27 @@ def pre_request(arguments):
         extract_date_timestamp = datetime.date.today()
         extract_date = extract_date_timestamp.strftime("%Y%m%d")
 
-    with driver.session() as session:
-        with session.begin_transaction() as tx:
-            total_objects = []
-            boolean_azure = False
-            for record in tx.run(
-                "MATCH (x) return labels(x), count(labels(x)) AS number_type"
-            ):
-                total_objects.append(record.data())
+    # Counts of every label and relation type, from the count store.
+    # TransitiveMemberOf relations are written by AD Miner, not collected.
+    statistics = DatabaseStatistics([CLOSURE_RELATION]).refresh(driver)
 
-            for record in tx.run("MATCH ()-[r]->() RETURN count(r) AS total_relations"):
-                number_relations = record.data()["total_relations"]
-
-            for record in tx.run(
-                "MATCH (n) WHERE n.tenantid IS NOT NULL return n LIMIT 1"
-            ):
-                boolean_azure = bool(record.data()["n"])
+    boolean_azure = False
+    # Without any Azure label, looking for a tenantid would scan every node
+    if any(label.startswith("AZ") and n for label, n in statistics.labels.items()):
+        with driver.session() as session:
+            with session.begin_transaction() as tx:
+                for record in tx.run(
+                    "MATCH (n) WHERE n.tenantid IS NOT NULL return n LIMIT 1"
+                ):
+                    boolean_azure = bool(record.data()["n"])
 
     driver.close()
 
-    return neo4j_version, extract_date, total_objects, number_relations, boolean_azure
+    return neo4j_version, extract_date, statistics, boolean_azure
 
 
 class Neo4j:
-    def __init__(self, arguments, extract_date_int, boolean_azure):
+    def __init__(self, arguments, extract_date_int, boolean_azure, statistics=None):
         # remote computers that run requests with their number of core
         if len(arguments.cluster) > 0:
             arguments.nb_chunks = 0
@@ -147,6 +187,11 @@ class Neo4j:
                 self.writeRequest = self.simpleRequest
                 self.parallelWriteRequest = self.parallelRequestCluster
 
+        elif arguments.async_requests:
+            self.parallelRequest = self.parallelRequestAsync
+            self.parallelWriteRequest = self.parallelRequestAsync
+            self.writeRequest = self.simpleRequest
+
         else:
             self.parallelRequest = self.parallelRequestLegacy
             self.parallelWriteRequest = self.parallelRequestLegacy
@@ -158,6 +203,22 @@ class Neo4j:
 
         self.gds_cost_type_table = {}
 
+        self.membership_closure = None
+
+        # Counts of labels and relation types (DatabaseStatistics of pre_request)
+        self.statistics = statistics
+
+        # Relations loaded once for requests computed by the native engine
+        self.graph_snapshot = None
+
+        # Number of sources resolved at each depth by progressive requests
+        self.progressive_statistics = {}
+
+        # Read requests computed from a single scan of their label
+        # (--fuse_scans), and the nodes of the labels already scanned
+        self.fused_requests = {}
+        self.fused_scans = {}
+
         recursive_level = arguments.level
         self.password_renewal = int(arguments.renewal_password)
 
@@ -209,8 +270,38 @@ class Neo4j:
                     "gds_request",
                     "gds_scope_query",
                     "drop_gds_graph",
+                    "native_sources",
+                    "native_targets",
+                    "native_relations",
+                    "progressive_request",
                 ]
 
+                # Progressive version of path requests: same path search
+                # restricted to a list of source ids, at a given depth
+                request = self.all_requests[request_key]
+                if "native_sources" in request and "$recursive_level$" in request.get(
+                    "request", ""
+                ):
+                    parts = scoped_parts(request["request"])
+                    if parts:
+                        _, source, path_search = parts
+                        request["progressive_request"] = (
+                            f"MATCH ({source}) WHERE ID({source}) IN $source_ids "
+                            f"WITH {source} "
+                            + path_search.replace("$recursive_level$", "PARAM_DEPTH")
+                        )
+
+                # Python version of read requests scanning a single label,
+                # only used while it matches the cypher of requests.json
+                fused = FUSED_REQUESTS.get(request_key)
+                if (
+                    fused is not None
+                    and request.get("request") == fused.request
+                    and "scope_query" not in request
+                    and "is_a_write_request" not in request
+                ):
+                    self.fused_requests[request_key] = fused
+
                 for variable in variables_to_replace.keys():
                     for field in fields_to_replace:
                         if field in self.all_requests[request_key]:
@@ -221,6 +312,15 @@ class Neo4j:
                                 variable, str(variables_to_replace[variable])
                             )
 
+                # Balanced version of scoped requests: sources split by
+                # estimated cost instead of SKIP / LIMIT (--balanced_chunks)
+                if "scope_query" in request:
+                    queries = balanced_queries(request["request"])
+                    if queries:
+                        request["balanced_sources"], request["balanced_request"] = (
+                            queries
+                        )
+
                 # Replace postprocessing with python method
                 if "postProcessing" in self.all_requests[request_key]:
                     self.all_requests[request_key]["postProcessing"] = {
@@ -229,6 +329,7 @@ class Neo4j:
                         "Neo4j.check_unkown_relations": self.check_unkown_relations,
                         "Neo4j.check_all_domain_objects_exist": self.check_all_domain_objects_exist,
                         "Neo4j.check_relation_type": self.check_relation_type,
+                        "Neo4j.set_membership_closure": self.set_membership_closure,
                     }.get(self.all_requests[request_key]["postProcessing"])
         except json.JSONDecodeError as error:
             logger.print_error(
@@ -277,6 +378,11 @@ class Neo4j:
             self.arguments = arguments
             self.cache_enabled = arguments.cache
             self.cache = cache_class.Cache(arguments)
+            self.telemetry = Telemetry(
+                f"telemetry_{arguments.cache_prefix}.jsonl"
+                if arguments.telemetry
+                else None
+            )
 
         except Exception as e:
             logger.print_error("Connection to neo4j database impossible.")
@@ -286,65 +392,105 @@ class Neo4j:
     def close(self):
         self.driver.close()
 
+    @staticmethod
+    def chunkQuery(value, identifier, query):
+        """Query and parameters of a part of a parallelized request"""
+        parameters = {}
+        if isinstance(value, list):  # Query part defined by a list of node ids
+            parameters["source_ids"] = value
+            q = query.replace("PARAM2", str(identifier))
+        else:
+            q = query.replace("PARAM1", str(value)).replace("PARAM2", str(identifier))
+        return q, parameters
+
     @staticmethod
     def executeParallelRequest(
         value, identifier, query, arguments, output_type, server, gds_cost_type_table
     ):
         """This function is used in multiprocessing pools
         to execute multiple query parts in parallel"""
-        q = query.replace("PARAM1", str(value)).replace("PARAM2", str(identifier))
-        result = []
+        wall_start = time.time()
+        cpu_start = time.process_time()
+        q, parameters = Neo4j.chunkQuery(value, identifier, query)
         bolt = server if server.startswith("bolt://") else "bolt://" + server
         driver = GraphDatabase.driver(
             bolt,
             auth=(arguments.username, arguments.password),
             encrypted=False,
         )
+
+        def path_tuples(records):
+            for path in Neo4j.recordPaths(records):
+                if path is None:
+                    continue
+                try:
+                    yield Neo4j.pathTuple(path, gds_cost_type_table)
+                except Exception as e:
+                    logger.print_error(
+                        "An error while computing path object of this query:\n" + q
+                    )
+                    logger.print_error(e)
+
+        # The chunk is sent back encoded (chunk_encoding), see buildChunkResult
         with driver.session() as session:
             with session.begin_transaction() as tx:
+                records = tx.run(q, parameters)
                 if output_type is Graph:
-                    for record in tx.run(q):
-                        result.append(record["p"])
-                        # Quick way to handle multiple records
-                        # (e.g., RETURN p, p2)
-                        if "p2" in record:
-                            result.append(record["p2"])
-                    try:
-                        result = Neo4j.computePathObject(result, gds_cost_type_table)
-                    except Exception as e:
-                        logger.print_error(
-                            "An error while computing path object of this query:\n" + q
-                        )
-                        logger.print_error(e)
+                    result = EncodedPaths(path_tuples(records))
+                elif output_type is list:
+                    result = EncodedRecords(
+                        records.keys(), (record.values() for record in records)
+                    )
+                else:  # then it should be dict ?
+                    result = EncodedRecords(
+                        records.keys(), (record.data().values() for record in records)
+                    )
 
-                else:
-                    result = tx.run(q)
-                    if output_type is list:
-                        result = result.values()
-                    else:  # then it should be dict ?
-                        result = result.data()
+        if arguments.telemetry:
+            result.stats = chunk_stats(
+                result, value, identifier, server, wall_start, cpu_start
+            )
+        return result
 
+    @staticmethod
+    def cachedRequest(self, request_key):
+        """Result of a request read from the cache (with --cache), False if
+        the request has to be run"""
+        if not self.cache_enabled:
+            return False
+        start = time.time()
+        cpu_start = time.process_time()
+        result = self.cache.retrieveCacheEntry(request_key)
+        if result is None:
+            result = []
+        if result is not False:  # Sometimes result = []
+            logger.print_debug(
+                "From cache : %s - %d objects"
+                % (self.all_requests[request_key]["name"], len(result))
+            )
+            self.all_requests[request_key]["result"] = result
+            if "postProcessing" in self.all_requests[request_key]:
+                self.all_requests[request_key]["postProcessing"](self, result)
+            self.telemetry.request(
+                request_key,
+                "hit",
+                len(result),
+                time.time() - start,
+                time.process_time() - cpu_start,
+            )
         return result
 
     @staticmethod
     def process_request(self, request_key):
-        if self.cache_enabled:  # If cache enable, try to retrieve from cache
-            result = self.cache.retrieveCacheEntry(request_key)
-            if result is None:
-                result = []
-            if result is not False:  # Sometimes result = []
-                logger.print_debug(
-                    "From cache : %s - %d objects"
-                    % (self.all_requests[request_key]["name"], len(result))
-                )
-                self.all_requests[request_key]["result"] = result
-                if "postProcessing" in self.all_requests[request_key]:
-                    self.all_requests[request_key]["postProcessing"](self, result)
-                return result
+        self.telemetry.request_key = request_key
+        start = time.time()
+        cpu_start = time.process_time()
+        result = self.cachedRequest(self, request_key)
+        if result is not False:
+            return result
 
         request = self.all_requests[request_key]
         logger.print_debug("Requesting : %s" % request["name"])
-        start = time.time()
         result = []
 
         # Create neo4j GDS graph if plugin installed and request adapted
@@ -362,37 +508,66 @@ class Neo4j:
             elif "scope_query" in request:
                 del request["scope_query"]
 
-        if "scope_query" in request:
-            with self.driver.session() as session:
-                with session.begin_transaction() as tx:
-                    scopeQuery = request["scope_query"]
-                    if tx.run(scopeQuery).value() != []:
-                        scopeSize = tx.run(scopeQuery).value()[0]
-                    else:
-                        scopeSize = 0
+        native = (
+            self.arguments.native_paths
+            and "native_targets" in request
+            and not ("is_a_gds_request" in request and self.gds)
+        )
 
-            part_number = int(self.arguments.nb_chunks)
-            part_number = min(scopeSize, part_number)
+        progressive = (
+            self.arguments.progressive_paths
+            and "progressive_request" in request
+            and not ("is_a_gds_request" in request and self.gds)
+        )
 
-            print(f"scope size : {str(scopeSize)} | nb chunks : {part_number}")
-            items = []
-            space = np.linspace(0, scopeSize, part_number + 1, dtype=int)
-            output_type = self.all_requests[request_key]["output_type"]
+        fused = self.arguments.fuse_scans and request_key in self.fused_requests
 
-            # Divide the request with SKIP & LIMIT
-            for i in range(len(space) - 1):
-                items.append(
-                    [
-                        space[i],
-                        space[i + 1] - space[i],
-                        request["request"],
-                        self.arguments,
-                        output_type,
-                        self.gds_cost_type_table,
-                    ]
+        if native:
+            sources, target_partitions = self.nativeEndpoints(self, request_key)
+            nb_targets = sum(len(targets) for targets in target_partitions.values())
+            print(
+                f"sources : {len(sources)} | targets : {nb_targets} | "
+                f"target partitions : {len(target_partitions)}"
+            )
+            if len(target_partitions) > NATIVE_PATHS_MAX_SEARCHES:
+                logger.print_warning(
+                    "More than %d target partitions, running the cypher request"
+                    % NATIVE_PATHS_MAX_SEARCHES
                 )
+                native = False
 
-            if "is_a_write_request" in request:
+        if native:  # Paths computed by AD Miner from the graph snapshot
+            result = self.nativePathRequest(
+                self, request_key, sources, target_partitions
+            )
+        elif progressive:  # Path request repeated at increasing depths
+            result = self.progressiveRequest(self, request_key)
+        elif fused:  # Rows of the scan of a label shared by several requests
+            result = self.fusedRequest(self, request_key)
+        elif "scope_query" in request:
+            output_type = self.all_requests[request_key]["output_type"]
+            balanced = (
+                self.arguments.balanced_chunks
+                and "balanced_request" in request
+                and not ("is_a_gds_request" in request and self.gds)
+            )
+
+            if balanced:  # Divide the sources by estimated cost
+                items = self.balancedItems(self, request_key)
+            else:
+                items = self.scopedItems(self, request_key)
+
+            path_store = (
+                self.arguments.path_store
+                and "path_store" in request
+                and output_type is Graph
+                and not self.arguments.cluster
+                and not ("is_a_gds_request" in request and self.gds)
+            )
+
+            if path_store:  # Paths written on disk by the workers
+                result = self.parallelRequestToStore(self, request_key, items)
+            elif "is_a_write_request" in request:
                 result = self.parallelWriteRequest(self, items)
             else:
                 result = self.parallelRequest(self, items)
@@ -402,9 +577,22 @@ class Neo4j:
         else:  # Simple not parallelized read request
             result = self.simpleRequest(self, request_key)
 
+        return self.storeResult(self, request_key, result, start, cpu_start)
+
+    @staticmethod
+    def storeResult(self, request_key, result, start, cpu_start):
+        """Post-process, cache and record the result of a request run
+        since start"""
+        request = self.all_requests[request_key]
         if result is None:
             result = []
 
+        # Nodes, relations and properties may have been created or deleted
+        if "is_a_write_request" in request:
+            if self.statistics is not None:
+                self.statistics.invalidate()
+            self.fused_scans = {}
+
         if (
             "is_a_gds_request" in request
             and self.gds
@@ -428,9 +616,211 @@ class Neo4j:
         logger.print_warning(
             timer_format(time.time() - start) + " - %d objects" % len(result)
         )
+        self.telemetry.request(
+            request_key,
+            "miss" if self.cache_enabled else "disabled",
+            len(result),
+            time.time() - start,
+            time.process_time() - cpu_start,
+        )
         request["result"] = result
         return result
 
+    @staticmethod
+    def concurrentRead(self, request_key):
+        """True if a request can run at the same time as the other read
+        requests between two write requests (--async_requests): it neither
+        writes nor has a postProcessing, and it runs plain cypher chunks"""
+        request = self.all_requests[request_key]
+        return not (
+            "is_a_write_request" in request
+            or "postProcessing" in request
+            # Creates and drops its GDS projection
+            or ("is_a_gds_request" in request and self.gds)
+            or (self.arguments.native_paths and "native_targets" in request)
+            or (self.arguments.progressive_paths and "progressive_request" in request)
+            or (self.arguments.fuse_scans and request_key in self.fused_requests)
+            or (self.arguments.path_store and "path_store" in request)
+        )
+
+    @staticmethod
+    def process_concurrent_requests(self, request_keys):
+        """Run independent read requests (see concurrentRead) together:
+        the chunks of scoped requests and the unscoped requests are
+        coroutines sharing one async driver and --nb_cores sessions.
+        The wall and CPU times recorded for each request are those of
+        the whole batch. A failing request is reported and left without
+        result, like with process_request."""
+        start = time.time()
+        cpu_start = time.process_time()
+        requests = {}
+        for request_key in request_keys:
+            if self.cachedRequest(self, request_key) is not False:
+                continue
+            request = self.all_requests[request_key]
+            if "scope_query" not in request:
+                requests[request_key] = [
+                    [
+                        0,
+                        -1,
+                        request["request"],
+                        self.arguments,
+                        request["output_type"],
+                        self.gds_cost_type_table,
+                    ]
+                ]
+            elif self.arguments.balanced_chunks and "balanced_request" in request:
+                requests[request_key] = self.balancedItems(self, request_key)
+            else:
+                requests[request_key] = self.scopedItems(self, request_key)
+        if not requests:
+            return
+
+        logger.print_debug("Running %d read requests concurrently" % len(requests))
+        chunks = asyncio.run(self.runChunksAsync(self, requests))
+        for request_key, request_chunks in chunks.items():
+            request = self.all_requests[request_key]
+            if isinstance(request_chunks, Exception):
+                logger.print_error("%s failed" % request["name"])
+                logger.print_error(request_chunks)
+                continue
+            logger.print_debug("Done : %s" % request["name"])
+            result = self.joinChunksAsync(self, request_chunks, request["output_type"])
+            self.storeResult(self, request_key, result, start, cpu_start)
+
+    @staticmethod
+    def scopedItems(self, request_key):
+        """Chunks of a scoped request as SKIP / LIMIT ranges of its scope"""
+        request = self.all_requests[request_key]
+        scopeSize = self.scopeSize(self, request["scope_query"])
+
+        part_number = int(self.arguments.nb_chunks)
+        part_number = min(scopeSize, part_number)
+
+        print(f"scope size : {str(scopeSize)} | nb chunks : {part_number}")
+        items = []
+        space = np.linspace(0, scopeSize, part_number + 1, dtype=int)
+
+        # Divide the request with SKIP & LIMIT
+        for i in range(len(space) - 1):
+            items.append(
+                [
+                    space[i],
+                    space[i + 1] - space[i],
+                    request["request"],
+                    self.arguments,
+                    request["output_type"],
+                    self.gds_cost_type_table,
+                ]
+            )
+        return items
+
+    @staticmethod
+    def scopeSize(self, scope_query):
+        """Number of elements of a scope query. Scope queries that only
+        count the nodes of a label are answered by the database statistics."""
+        if self.statistics is not None:
+            scope_size = self.statistics.scope_size(self.driver, scope_query)
+            if scope_size is not None:
+                return scope_size
+        with self.driver.session() as session:
+            record = session.run(scope_query).single()
+        return record[0] if record else 0
+
+    @staticmethod
+    def balancedItems(self, request_key):
+        """Chunks of a scoped request as lists of source ids of similar
+        estimated cost (see chunk_planner), instead of equal SKIP / LIMIT
+        ranges: sources with many relations no longer make one chunk
+        much longer than the others"""
+        request = self.all_requests[request_key]
+        with self.driver.session() as session:
+            with session.begin_transaction() as tx:
+                costs = tx.run(request["balanced_sources"]).values()
+
+        chunks = balanced_chunks(costs, int(self.arguments.nb_chunks))
+        print(
+            f"sources : {len(costs)} | nb chunks : {len(chunks)} | "
+            f"estimated cost per chunk : {chunks[-1][1] if chunks else 0}"
+            f"-{chunks[0][1] if chunks else 0}"
+        )
+        return [
+            [
+                source_ids,
+                -1,
+                request["balanced_request"],
+                self.arguments,
+                request["output_type"],
+                self.gds_cost_type_table,
+            ]
+            for source_ids, _ in chunks
+        ]
+
+    @staticmethod
+    def progressiveDepths(level):
+        """Depths of the successive rounds of a progressive request"""
+        depth = 2
+        while depth < level:
+            yield depth
+            depth *= 2
+        yield level
+
+    @staticmethod
+    def progressiveRequest(self, request_key):
+        """Iterative deepening of a path request: the request is first run
+        at a shallow depth, then only for the sources still without path at
+        increasing depths up to --level. Sources without any path no longer
+        explore their whole neighbourhood for each depth up to --level.
+        Once an object has a path, farther targets are not searched."""
+        request = self.all_requests[request_key]
+        output_type = request["output_type"]
+
+        with self.driver.session() as session:
+            with session.begin_transaction() as tx:
+                unresolved = set(tx.run(request["native_sources"]).value())
+
+        result = []
+        statistics = {}
+        for depth in self.progressiveDepths(int(self.arguments.level)):
+            if len(unresolved) == 0:
+                break
+            sources = sorted(unresolved)
+            part_number = min(len(sources), int(self.arguments.nb_chunks))
+            print(
+                f"depth : {depth} | unresolved sources : {len(sources)} | nb chunks : {part_number}"
+            )
+
+            query = request["progressive_request"].replace("PARAM_DEPTH", str(depth))
+            space = np.linspace(0, len(sources), part_number + 1, dtype=int)
+            items = [
+                [
+                    sources[space[i] : space[i + 1]],
+                    -1,
+                    query,
+                    self.arguments,
+                    output_type,
+                    self.gds_cost_type_table,
+                ]
+                for i in range(len(space) - 1)
+            ]
+
+            if "is_a_write_request" in request:
+                paths = self.parallelWriteRequest(self, items)
+            else:
+                paths = self.parallelRequest(self, items)
+
+            resolved = {path.nodes[0].id for path in paths} & unresolved
+            unresolved -= resolved
+            statistics[depth] = len(resolved)
+            result += paths
+
+        for depth, nb_resolved in statistics.items():
+            logger.print_debug("Depth %d : %d sources resolved" % (depth, nb_resolved))
+        logger.print_debug("Without path : %d sources" % len(unresolved))
+        self.progressive_statistics[request_key] = statistics
+
+        return result
+
     @staticmethod
     def simpleRequest(self, request_key):
         request = self.all_requests[request_key]
@@ -439,13 +829,10 @@ class Neo4j:
         with self.driver.session() as session:
             with session.begin_transaction() as tx:
                 if output_type is Graph:
-                    for record in tx.run(request["request"]):
-                        result.append(record["p"])
-                        # Quick way to handle multiple records
-                        # (e.g., RETURN p, p2)
-                        if "p2" in record:
-                            result.append(record["p2"])
-                    result = self.computePathObject(result, self.gds_cost_type_table)
+                    result = self.computePathObject(
+                        self.recordPaths(tx.run(request["request"])),
+                        self.gds_cost_type_table,
+                    )
                 else:
                     result = tx.run(request["request"])
                     if output_type is list:
@@ -454,6 +841,213 @@ class Neo4j:
                         result = result.data()
         return result
 
+    @staticmethod
+    def labelScan(self, label):
+        """Nodes of a label with every property read by its fused requests.
+        The label is scanned once, then again only after a write request."""
+        if label not in self.fused_scans:
+            properties = set()
+            for fused in self.fused_requests.values():
+                if fused.label == label:
+                    properties.update(fused.properties)
+
+            start = time.time()
+            with self.driver.session() as session:
+                with session.begin_transaction() as tx:
+                    rows = tx.run(scan_query(label, properties)).value()
+            extract_date = int(self.extract_date)
+            self.fused_scans[label] = [
+                ScannedNode(row, extract_date, self.password_renewal) for row in rows
+            ]
+            logger.print_debug(
+                "Scan of %s : %d nodes, %d properties in %s"
+                % (label, len(rows), len(properties), timer_format(time.time() - start))
+            )
+        return self.fused_scans[label]
+
+    @staticmethod
+    def fusedRequest(self, request_key):
+        """Read request computed in python from the scan of its label,
+        shared by every fused request of the label (see scan_fusion).
+        The cypher request is run instead if a property does not have the
+        type the request expects."""
+        fused = self.fused_requests[request_key]
+        nodes = self.labelScan(self, fused.label)
+        try:
+            return fused.evaluate(nodes, self.all_requests[request_key]["output_type"])
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            logger.print_debug(
+                "Scan of %s not usable for %s (%s), running the request"
+                % (fused.label, request_key, error)
+            )
+            return self.simpleRequest(self, request_key)
+
+    @staticmethod
+    def loadGraphSnapshot(self):
+        """Load once every relation used by native path requests"""
+        relation_types = set()
+        for request in self.all_requests.values():
+            if "native_relations" in request:
+                relation_types.update(request["native_relations"].split("|"))
+
+        start = time.time()
+        q = "MATCH (a)-[r:" + "|".join(sorted(relation_types)) + "]->(b) "
+        q += "RETURN ID(a), ID(b), type(r)"
+        with self.driver.session() as session:
+            with session.begin_transaction() as tx:
+                snapshot = GraphSnapshot(tuple(record.values()) for record in tx.run(q))
+
+        logger.print_debug(
+            "Graph snapshot : %d nodes - %d relations (%s)"
+            % (len(snapshot), len(snapshot.in_src), timer_format(time.time() - start))
+        )
+        return snapshot
+
+    @staticmethod
+    def nativeEndpoints(self, request_key):
+        """Source ids of a native path request and its targets by partition"""
+        request = self.all_requests[request_key]
+        with self.driver.session() as session:
+            with session.begin_transaction() as tx:
+                sources = tx.run(request["native_sources"]).value()
+                target_partitions = {}
+                for record in tx.run(request["native_targets"]):
+                    values = record.values()
+                    partition = values[1] if len(values) > 1 else values[0]
+                    target_partitions.setdefault(partition, []).append(values[0])
+        return sources, target_partitions
+
+    @staticmethod
+    def nativePathRequest(self, request_key, sources, target_partitions):
+        """Compute the paths of a request with one reverse breadth-first
+        search per partition of targets instead of one shortestPath
+        per source. The request defines native_sources, native_targets
+        (optionally returning a partition as second column, each target
+        is its own partition otherwise) and native_relations. Its sources
+        and target partitions are given by nativeEndpoints.
+        GDS requests use a Dijkstra search on exploitability ratings, like
+        their GDS version, even without the GDS plugin. Other requests use
+        a breadth-first search at most --level relations long."""
+        request = self.all_requests[request_key]
+        if self.graph_snapshot is None:
+            self.graph_snapshot = self.loadGraphSnapshot(self)
+
+        max_depth = int(request.get("native_max_depth", self.arguments.level))
+
+        # GDS requests are weighted by exploitability, like the GDS projection
+        weights = None
+        if "is_a_gds_request" in request:
+            weights = self.graph_snapshot.relation_weights(self.edges_rating)
+
+        raw_paths = list(
+            shortest_paths_to_targets(
+                self.graph_snapshot,
+                sources,
+                target_partitions,
+                request["native_relations"].split("|"),
+                max_depth,
+                weights,
+            )
+        )
+        result = self.buildNativePaths(self, raw_paths)
+
+        if "native_write" in request:
+            # Same side effect as the SET clause of the cypher request
+            q = "UNWIND $rows AS id MATCH (n) WHERE ID(n) = id "
+            q += request["native_write"]
+            self.bulkWrite(self, q, {node_ids[0] for node_ids, _ in raw_paths})
+
+        return result
+
+    @staticmethod
+    def buildNativePaths(self, raw_paths):
+        """Turn ([neo4j ids], [relation types]) into Path objects,
+        retrieving the properties of nodes not seen yet"""
+        nodes = self.graph_snapshot.nodes
+        missing = list(
+            {i for node_ids, _ in raw_paths for i in node_ids} - nodes.keys()
+        )
+        q = "UNWIND $ids AS id MATCH (n) WHERE ID(n) = id "
+        q += "RETURN ID(n), labels(n), n.name, n.domain, n.tenantid"
+        with self.driver.session() as session:
+            for i in range(0, len(missing), NATIVE_PATHS_BATCH_SIZE):
+                with session.begin_transaction() as tx:
+                    for node_id, labels, name, domain, tenantid in tx.run(
+                        q, ids=missing[i : i + NATIVE_PATHS_BATCH_SIZE]
+                    ).values():
+                        label = [x for x in labels if "Base" not in x][0]
+                        nodes[node_id] = (label, name, domain, tenantid)
+
+        final_paths = []
+        for node_ids, relation_types in raw_paths:
+            final_paths.append(
+                Path(
+                    [
+                        Node(node_id, *nodes[node_id], relation_type)
+                        for node_id, relation_type in zip(node_ids, relation_types)
+                    ]
+                )
+            )
+        return final_paths
+
+    @staticmethod
+    def getWriteServers(self):
+        """Bolt addresses of every database a write must be applied to"""
+        if len(self.arguments.cluster) > 0:
+            return ["bolt://" + server for server in self.cluster.keys()]
+        return [self.arguments.bolt]
+
+    @staticmethod
+    def writeSessions(self):
+        """One session on every database a write must be applied to"""
+        for server in self.getWriteServers(self):
+            driver = GraphDatabase.driver(
+                server,
+                auth=(self.arguments.username, self.arguments.password),
+                encrypted=False,
+            )
+            try:
+                with driver.session() as session:
+                    yield session
+            finally:
+                driver.close()
+
+    @staticmethod
+    def bulkWrite(self, query, rows, row_size=None):
+        """Write-back helper of postProcessing functions.
+        query should start with UNWIND $rows AS row. rows are sent as
+        parameter in batches of BULK_WRITE_BATCH_SIZE rows (or of
+        row_size(row) units), each batch committed in its own transaction,
+        on every write server."""
+        batches = []
+        batch = []
+        size = 0
+        for row in rows:
+            batch.append(row)
+            size += row_size(row) if row_size else 1
+            if size >= BULK_WRITE_BATCH_SIZE:
+                batches.append(batch)
+                batch = []
+                size = 0
+        if batch:
+            batches.append(batch)
+
+        for session in self.writeSessions(self):
+            for batch in batches:
+                with session.begin_transaction() as tx:
+                    tx.run(query, rows=batch)
+
+    @staticmethod
+    def periodicWrite(self, match, update, **parameters):
+        """Write-back helper for updates of every element matched by a
+        pattern (no rows to send): update is applied to the rows of match
+        with a commit every BULK_WRITE_BATCH_SIZE rows, on every write server.
+        e.g. match: MATCH ()-[r:X]->(), update: WITH r SET r.cost=$cost"""
+        q = f"{match} CALL {{ {update} }} IN TRANSACTIONS OF {BULK_WRITE_BATCH_SIZE} ROWS"
+        for session in self.writeSessions(self):
+            # CALL {} IN TRANSACTIONS needs an auto-commit transaction
+            session.run(q, parameters).consume()
+
     @staticmethod
     def ClusterWriteRequest(self, request_key):
         """This function ensure that simple write
@@ -492,7 +1086,11 @@ class Neo4j:
                             + "s."
                         )
             temp_results = [task.get() for task in tasks.values()]
-            result = temp_results[0]
+            for chunk in temp_results:
+                self.telemetry.chunk(getattr(chunk, "stats", None))
+            result = self.buildChunkResult(
+                temp_results[0], self.all_requests[request_key]["output_type"]
+            )
             # Same request executed on every node, we only need the result once
         return result
 
@@ -518,12 +1116,7 @@ class Neo4j:
         ):
             temporary_result = task.get()
             # Update displayed number of retrieved objects
-            if output_type == list:
-                if len(temporary_result) > 0:
-                    for sublist in temporary_result:
-                        number_of_retrieved_objects += len(sublist)
-            elif output_type == dict or output_type == Graph:
-                number_of_retrieved_objects += len(temporary_result)
+            number_of_retrieved_objects += len(temporary_result)
 
             temporary_result = None
 
@@ -623,8 +1216,11 @@ class Neo4j:
                                 jobs_done,
                                 pbar,
                             )
+            seen_paths = set()
             for r in temp_results:
-                result += r.get()
+                chunk = r.get()
+                self.telemetry.chunk(getattr(chunk, "stats", None))
+                result += self.buildChunkResult(chunk, output_type, seen_paths)
         pbar.close()
         return result
 
@@ -647,23 +1243,218 @@ class Neo4j:
 
         with mp.Pool(mp.cpu_count()) as pool:
             result = []
-            for _ in tqdm.tqdm(
+            seen_paths = set()
+            for chunk in tqdm.tqdm(
                 pool.istarmap(self.executeParallelRequest, items),
                 total=len(items),
             ):
-                result += _
+                self.telemetry.chunk(getattr(chunk, "stats", None))
+                result += self.buildChunkResult(chunk, items[0][4], seen_paths)
+        return result
+
+    @staticmethod
+    async def executeRequestAsync(
+        driver,
+        semaphore,
+        pbar,
+        telemetry,
+        request_key,
+        value,
+        identifier,
+        query,
+        output_type,
+        gds_cost_type_table,
+    ):
+        """Coroutine version of executeParallelRequest, used by
+        parallelRequestAsync. Paths are returned as path tuples."""
+        q, parameters = Neo4j.chunkQuery(value, identifier, query)
+        async with semaphore:
+            wall_start = time.time()
+            async with driver.session() as session:
+                async with await session.begin_transaction() as tx:
+                    records = await tx.run(q, parameters)
+                    if output_type is Graph:
+                        result = []
+                        async for record in records:
+                            for path in Neo4j.recordPaths([record]):
+                                if path is not None:
+                                    result.append(
+                                        Neo4j.pathTuple(path, gds_cost_type_table)
+                                    )
+                    elif output_type is list:
+                        result = await records.values()
+                    else:
+                        result = await records.data()
+        pbar.update(1)
+        # No CPU time nor transfer per chunk: chunks share the main process
+        telemetry.emit(
+            "chunk",
+            request=request_key,
+            **chunk_bounds(value, identifier),
+            server="async",
+            rows=len(result),
+            wall=round(time.time() - wall_start, 3),
+        )
+        return result
+
+    @staticmethod
+    async def runChunksAsync(self, requests):
+        """Chunks of several requests ({request key: items}) as coroutines
+        sharing one async driver. Returns, for each request, the list of
+        its chunk results, or the exception raised by one of its chunks."""
+        driver = neo4j.AsyncGraphDatabase.driver(
+            self.arguments.bolt,
+            auth=(self.arguments.username, self.arguments.password),
+            encrypted=False,
+        )
+        # Bounded number of concurrent sessions, whatever the request
+        semaphore = asyncio.Semaphore(self.arguments.nb_cores)
+
+        async def run_request(request_key, items, pbar):
+            return await asyncio.gather(
+                *(
+                    self.executeRequestAsync(
+                        driver,
+                        semaphore,
+                        pbar,
+                        self.telemetry,
+                        request_key,
+                        value,
+                        identifier,
+                        query,
+                        output_type,
+                        gds_cost_type_table,
+                    )
+                    for value, identifier, query, arguments, output_type, gds_cost_type_table in items
+                )
+            )
+
+        try:
+            with tqdm.tqdm(
+                total=sum(len(items) for items in requests.values())
+            ) as pbar:
+                results = await asyncio.gather(
+                    *(
+                        run_request(request_key, items, pbar)
+                        for request_key, items in requests.items()
+                    ),
+                    return_exceptions=True,
+                )
+        finally:
+            await driver.close()
+        return dict(zip(requests, results))
+
+    @staticmethod
+    def joinChunksAsync(self, chunks, output_type):
+        """Result of a request from the results of its async chunks"""
+        result = []
+        if output_type is not Graph:
+            for chunk in chunks:
+                result += chunk
+            return result
+
+        seen_paths = set()
+        for chunk in chunks:
+            result += self.buildChunkResult(chunk, output_type, seen_paths)
         return result
 
+    @staticmethod
+    def parallelRequestAsync(self, items):
+        """Same slicing as parallelRequestLegacy, but the chunks are
+        coroutines sharing one async driver in the main process
+        (--async_requests) instead of processes with one driver each"""
+        if len(items) == 0:
+            return []
+        request_key = self.telemetry.request_key
+        chunks = asyncio.run(self.runChunksAsync(self, {request_key: items}))
+        if isinstance(chunks[request_key], Exception):
+            raise chunks[request_key]
+        return self.joinChunksAsync(self, chunks[request_key], items[0][4])
+
+    @staticmethod
+    def executeParallelRequestToStore(directory, shard, *request_args):
+        """Same as executeParallelRequest, but the paths are written
+        as a shard of a PathStore and only their number (and the chunk
+        statistics) is returned"""
+        paths = Neo4j.executeParallelRequest(*request_args)
+        return write_shard(directory, shard, paths), getattr(paths, "stats", None)
+
+    @staticmethod
+    def parallelRequestToStore(self, request_key, items):
+        """Same slicing as parallelRequestLegacy, but the paths of each
+        chunk are streamed to disk by the worker (--path_store) instead
+        of being accumulated in memory"""
+        directory = self.cache.cache_prefix + "_" + request_key + "_paths"
+        shutil.rmtree(directory, ignore_errors=True)
+        os.mkdir(directory)
+
+        items = [
+            (
+                directory,
+                shard,
+                value,
+                identifier,
+                query,
+                arguments,
+                output_type,
+                self.arguments.bolt,
+                gds_cost_type_table,
+            )
+            for shard, (
+                value,
+                identifier,
+                query,
+                arguments,
+                output_type,
+                gds_cost_type_table,
+            ) in enumerate(items)
+        ]
+
+        store = PathStore(directory)
+        with mp.Pool(mp.cpu_count()) as pool:
+            for size, stats in tqdm.tqdm(
+                pool.istarmap(self.executeParallelRequestToStore, items),
+                total=len(items),
+            ):
+                store.add_shard(size)
+                self.telemetry.chunk(stats)
+        return store
+
     @staticmethod
     def setDangerousInboundOnGPOs(self, data):
         print("Entering Post processing")
-        ids = []
-        for d in data:
-            ids.append(d.nodes[-1].id)
-        q = "MATCH (g) WHERE ID(g) in " + str(ids) + " SET g.dangerous_inbound=TRUE"
-        with self.driver.session() as session:
-            with session.begin_transaction() as tx:
-                tx.run(q)
+        ids = {d.nodes[-1].id for d in data}
+        q = "UNWIND $rows AS id MATCH (g) WHERE ID(g) = id SET g.dangerous_inbound=TRUE"
+        self.bulkWrite(self, q, ids)
+
+    @staticmethod
+    def set_membership_closure(self, result):
+        """Compute the transitive group membership once and materialize it
+        as TransitiveMemberOf relations so that later requests do not have
+        to expand MemberOf*1..X again"""
+        self.membership_closure = MembershipClosure(result)
+        logger.print_debug(
+            "Membership closure : %d principals - %d relations"
+            % (len(self.membership_closure), self.membership_closure.nb_pairs)
+        )
+
+        # Remove the closure computed by a previous run
+        self.periodicWrite(
+            self, f"MATCH ()-[r:{CLOSURE_RELATION}]->()", "WITH r DELETE r"
+        )
+
+        # Every node of a cluster needs the relations for the following requests
+        self.bulkWrite(
+            self,
+            "UNWIND $rows AS row MATCH (m) WHERE ID(m) = row.member "
+            "UNWIND row.groups AS group_id MATCH (g) WHERE ID(g) = group_id "
+            f"CREATE (m)-[:{CLOSURE_RELATION}]->(g)",
+            (
+                {"member": member, "groups": groups.tolist()}
+                for member, groups in self.membership_closure.items()
+            ),
+            row_size=lambda row: len(row["groups"]),
+        )
 
     @staticmethod
     def set_extract_date(date):
@@ -698,6 +1489,190 @@ class Neo4j:
         logger.print_debug("Hash for " + server + " is " + hash)
         return hash
 
+    @staticmethod
+    def check_cache_fingerprint(self):
+        """Warn if the database changed since the cache was written: the
+        fingerprint of the database statistics saved at the end of the
+        previous run differs"""
+        fingerprint = self.cache.retrieveCacheEntry("database_fingerprint")
+        if fingerprint is False or self.statistics is None:
+            return
+        if fingerprint != self.statistics.fingerprint():
+            logger.print_warning(
+                "The database changed since the cache was written "
+                "(different node or relation counts), cached results may be outdated."
+            )
+
+    @staticmethod
+    def save_cache_fingerprint(self):
+        """Fingerprint of the database once every request has run, to be
+        compared with the database at the start of the next run"""
+        if self.statistics is None:
+            return
+        self.statistics.node_count(self.driver)  # Refreshed if stale
+        self.cache.createCacheEntry(
+            "database_fingerprint", self.statistics.fingerprint()
+        )
+
+    @staticmethod
+    def create_indexes(self):
+        """Create the missing label/property indexes on the properties
+        the requests filter on, and wait for them to be online"""
+        indexable, unlabeled = plan_indexes(self.all_requests)
+
+        # Servers on which each index was created
+        created = {}
+        servers = self.getWriteServers(self)
+        # Sessions first: zip then closes the last one before stopping
+        for session, server in zip(self.writeSessions(self), servers):
+            existing = set()
+            for labels, properties in session.run(
+                "SHOW INDEXES YIELD labelsOrTypes, properties, entityType "
+                "WHERE entityType = 'NODE' RETURN labelsOrTypes, properties"
+            ).values():
+                if labels and properties and len(properties) == 1:
+                    existing.update((label, properties[0]) for label in labels)
+
+            missing = sorted(indexable.keys() - existing)
+            for label, key in missing:
+                session.run(
+                    f"CREATE INDEX ad_miner_{label}_{key} IF NOT EXISTS "
+                    f"FOR (n:{label}) ON (n.{key})"
+                ).consume()
+                created.setdefault((label, key), []).append(server)
+
+            if missing:
+                logger.print_debug(
+                    "Creating %d indexes on %s, waiting for them to be online"
+                    % (len(missing), server)
+                )
+                session.run(
+                    "CALL db.awaitIndexes($timeout)", timeout=INDEX_TIMEOUT
+                ).consume()
+
+        # Report which requests benefit from each index
+        for (label, key), request_keys in sorted(
+            indexable.items(), key=lambda item: -len(item[1])
+        ):
+            if (label, key) in created:
+                state = "created on %s" % ", ".join(created[(label, key)])
+            else:
+                state = "existing"
+            logger.print_debug(
+                "Index %s.%s (%s) used by %d requests : %s"
+                % (
+                    label,
+                    key,
+                    state,
+                    len(request_keys),
+                    ", ".join(sorted(request_keys)),
+                )
+            )
+        for key, request_keys in sorted(unlabeled.items()):
+            logger.print_warning(
+                "No index can help %s on nodes without label, in : %s"
+                % (key, ", ".join(sorted(request_keys)))
+            )
+        logger.print_success(
+            "%d indexes created on %d servers"
+            % (sum(len(s) for s in created.values()), len(servers))
+        )
+
+    @staticmethod
+    def audit_queries(self, file_path):
+        """EXPLAIN every request and scope query (nothing is run nor
+        written) and report plans with risky operators.
+        The plans of all queries are written in file_path."""
+        report = {}
+        nb_issues = 0
+        with self.driver.session() as session:
+            for request_key, request in self.all_requests.items():
+                is_write = "is_a_write_request" in request
+                for field in AUDITED_FIELDS:
+                    if field not in request:
+                        continue
+                    query = explainable_query(request[field])
+                    try:
+                        summary = session.run(query, PARAMETERS).consume()
+                    except Exception as e:
+                        logger.print_error(
+                            "Could not explain %s of %s : %s" % (field, request_key, e)
+                        )
+                        continue
+                    audit = audit_plan(summary.plan, is_write)
+                    report.setdefault(request_key, {})[field] = audit
+                    for issue in audit["issues"]:
+                        logger.print_warning(
+                            "%s (%s) : %s" % (request_key, field, issue)
+                        )
+                        nb_issues += 1
+
+        with open(file_path, "w") as f:
+            json.dump(report, f, indent=4)
+        logger.print_success(
+            "%d risky operators found, query plans written in %s"
+            % (nb_issues, file_path)
+        )
+
+    @staticmethod
+    def profile_queries(self, request_keys, file_path):
+        """Run requests with PROFILE in a transaction rolled back
+        afterwards, and write their db hits, page cache hits/misses and
+        rows per operator in file_path. Only one chunk, in the middle of
+        the scope, is profiled for parallelized requests.
+        Called once the requests have run, so that the flags set by write
+        requests are in the database. GDS projections are dropped by then:
+        GDS requests are not profiled when the plugin is installed."""
+        report = {}
+        for request_key in request_keys:
+            request = self.all_requests[request_key]
+            if "is_a_gds_request" in request and self.gds:
+                logger.print_warning(
+                    "Not profiling %s : its GDS graph has been dropped" % request_key
+                )
+                continue
+            query = request["request"]
+            entry = {}
+
+            if "scope_query" in request:
+                scope_size = self.scopeSize(self, request["scope_query"])
+                part_number = max(1, min(scope_size, int(self.arguments.nb_chunks)))
+                chunk_size = -(-scope_size // part_number)
+                skip = (part_number // 2) * chunk_size
+                query, _ = self.chunkQuery(skip, chunk_size, query)
+                entry["chunk"] = {
+                    "scope_size": scope_size,
+                    "skip": skip,
+                    "limit": chunk_size,
+                }
+
+            logger.print_debug("Profiling : %s" % request["name"])
+            try:
+                with self.driver.session() as session:
+                    with session.begin_transaction() as tx:
+                        summary = tx.run(
+                            "PROFILE " + query.replace("PARAM_DEPTH", "1"), PARAMETERS
+                        ).consume()
+                        # Never committed: write requests do not modify the database
+                        tx.rollback()
+            except Exception as e:
+                logger.print_error("Could not profile %s : %s" % (request_key, e))
+                continue
+
+            entry.update(summarize_profile(summary.profile))
+            entry["query"] = query
+            report[request_key] = entry
+            logger.print_warning(
+                "%d db hits, %d page cache misses - %d rows"
+                % (entry["dbHits"], entry["pageCacheMisses"], entry["rows"])
+            )
+
+        with open(file_path, "w") as f:
+            json.dump(report, f, indent=4)
+        logger.print_success(
+            "%d requests profiled, written in %s" % (len(report), file_path)
+        )
+
     @staticmethod
     def verify_integrity(self):
         """
@@ -855,57 +1830,109 @@ class Neo4j:
                             + str(round(time.time() - starting_time, 2))
                             + "s."
                         )
+            seen_paths = set()
             for r in temp_results:
-                result += r.get()
+                chunk = r.get()
+                self.telemetry.chunk(getattr(chunk, "stats", None))
+                result += self.buildChunkResult(chunk, output_type, seen_paths)
         pbar.close()
         return result
 
-    @classmethod
-    def computePathObject(self, Paths, gds_cost_type_table):
-        """computePathObject allows object to be serialized and should
-        be used when output_type == Graph"""
-        final_paths = []
-        for path in Paths:
-            if path is not None:
-                nodes = []
-                for relation in path.relationships:
-                    rtype = relation.type
-                    if "PATH_" in rtype:
-                        gds_identifier = round(float(relation.get("cost")), 3)
-                        gds_identifier = round(1000 * (gds_identifier % 1))
-
-                        rtype = gds_cost_type_table[gds_identifier]
-
-                    for node in relation.nodes:
-                        label = [i for i in node.labels if "Base" not in i][
-                            0
-                        ]  # e.g. : {"User","Base"} -> "User" or {"User","AZBase"} -> "User"
-                        nodes.append(
-                            Node(
-                                node.id,
-                                label,
-                                node["name"],
-                                node["domain"],
-                                node["tenantid"],
-                                rtype,
-                            )
-                        )
-                        break
+    @staticmethod
+    def recordPaths(records):
+        """Paths of the records of a Graph request, one at a time,
+        so that records are converted as they are fetched"""
+        for record in records:
+            yield record["p"]
+            # Quick way to handle multiple records
+            # (e.g., RETURN p, p2)
+            if "p2" in record:
+                yield record["p2"]
 
+    @staticmethod
+    def pathTuple(path, gds_cost_type_table):
+        """Compact form of a neo4j driver path, cheap to send between
+        processes: a tuple of (id, label, name, domain, tenant_id,
+        relation_type) per node, the arguments of Node"""
+        nodes = []
+        for relation in path.relationships:
+            rtype = relation.type
+            if "PATH_" in rtype:
+                gds_identifier = round(float(relation.get("cost")), 3)
+                gds_identifier = round(1000 * (gds_identifier % 1))
+
+                rtype = gds_cost_type_table[gds_identifier]
+
+            for node in relation.nodes:
+                label = [i for i in node.labels if "Base" not in i][
+                    0
+                ]  # e.g. : {"User","Base"} -> "User" or {"User","AZBase"} -> "User"
                 nodes.append(
-                    Node(
-                        path.end_node.id,
-                        [i for i in path.end_node.labels if "Base" not in i][0],
-                        path.end_node["name"],
-                        path.end_node["domain"],
-                        path.end_node["tenantid"],
-                        "",
+                    (
+                        node.id,
+                        label,
+                        node["name"],
+                        node["domain"],
+                        node["tenantid"],
+                        rtype,
                     )
                 )
+                break
+
+        nodes.append(
+            (
+                path.end_node.id,
+                [i for i in path.end_node.labels if "Base" not in i][0],
+                path.end_node["name"],
+                path.end_node["domain"],
+                path.end_node["tenantid"],
+                "",
+            )
+        )
+        return tuple(nodes)
 
-                final_paths.append(Path(nodes))
+    @staticmethod
+    def buildPath(path_tuple):
+        """Path object of a path tuple (see pathTuple)"""
+        return Path([Node(*node) for node in path_tuple])
 
-        return final_paths
+    @staticmethod
+    def pathFingerprint(path_tuple):
+        """Hash of the node ids and relation types of a path tuple"""
+        return hash(tuple((node[0], node[5]) for node in path_tuple))
+
+    @staticmethod
+    def buildChunkResult(chunk, output_type, seen_paths=None):
+        """Decode a chunk sent back by executeParallelRequest, as it
+        should be stored in all_requests[request_key]["result"].
+        seen_paths holds the fingerprints of the paths of the previous
+        chunks of the request: paths already seen are dropped."""
+        if output_type is not Graph:
+            return chunk.decode(output_type)
+
+        if seen_paths is None:
+            seen_paths = set()
+        paths = []
+        for path_tuple in chunk:
+            fingerprint = Neo4j.pathFingerprint(path_tuple)
+            if fingerprint in seen_paths:
+                continue
+            seen_paths.add(fingerprint)
+            paths.append(Neo4j.buildPath(path_tuple))
+        return paths
+
+    @classmethod
+    def computePathObject(self, Paths, gds_cost_type_table):
+        """computePathObject allows object to be serialized and should
+        be used when output_type == Graph"""
+        return self.buildChunkResult(
+            (
+                self.pathTuple(path, gds_cost_type_table)
+                for path in Paths
+                if path is not None
+            ),
+            Graph,
+        )
 
     @staticmethod
     def check_gds_plugin(self, result):
@@ -929,6 +1956,14 @@ class Neo4j:
                     with session.begin_transaction() as tx:
                         tx.run(q)
 
+        elif self.arguments.native_paths:
+            logger.print_magenta("GDS plugin not installed.")
+            logger.print_magenta(
+                "Using exploitability for the GDS path requests computed by the AD Miner native engine."
+            )
+            logger.print_magenta(
+                "Not using exploitability for the other paths computation."
+            )
         else:
             logger.print_magenta("GDS plugin not installed.")
             logger.print_magenta("Not using exploitability for paths computation.")
@@ -937,34 +1972,22 @@ class Neo4j:
     def check_unkown_relations(self, result):
         if self.gds:
             logger.print_warning("Setting exploitability ratings to edges.")
-            with self.driver.session() as session:
-                with session.begin_transaction() as tx:
-                    for r in self.edges_rating.keys():
-                        cost = self.edges_rating[r]
-                        q = "MATCH ()-[r:"
-                        q += str(r)
-                        q += "]->() SET r.cost="
-                        q += str(cost)
-
-                        tx.run(q)
-
             relation_list = [r[0] for r in result]
 
-            with self.driver.session() as session:
-                with session.begin_transaction() as tx:
-                    for i in range(len(relation_list)):
-                        r = relation_list[i]
-                        if r not in self.edges_rating.keys():
-                            logger.print_warning(
-                                r
-                                + " relation type is unknown and will use default exploitability rating."
-                            )
-                        q = "MATCH ()-[r:"
-                        q += str(r)
-                        q += "]->() SET r.cost=r.cost + "
-                        q += str(round(i / 1000, 3))
-                        tx.run(q)
-                        self.gds_cost_type_table[i] = r
+            for i in range(len(relation_list)):
+                r = relation_list[i]
+                if r not in self.edges_rating.keys():
+                    logger.print_warning(
+                        r
+                        + " relation type is unknown and will use default exploitability rating."
+                    )
+                # The decimals identify the relation type in GDS paths
+                cost = self.edges_rating.get(r, DEFAULT_EXPLOITABILITY_RATING)
+                cost += round(i / 1000, 3)
+                self.periodicWrite(
+                    self, f"MATCH ()-[r:{r}]->()", "WITH r SET r.cost=$cost", cost=cost
+                )
+                self.gds_cost_type_table[i] = r
 
     def compute_common_cache(self, requests_results):
         """
@@ -1031,6 +2054,9 @@ class Neo4j:
         requests_results["admin_list"] = admin_list
 
         objects_to_domain_admin = requests_results["objects_to_domain_admin"]
+        # With --path_store, paths are indexed by their position in the
+        # store instead of being loaded in memory
+        stored = isinstance(objects_to_domain_admin, PathStore)
         users_to_domain_admin = {}
         groups_to_domain_admin = {}
         computers_to_domain_admin = {}
@@ -1048,19 +2074,30 @@ class Neo4j:
             gpo_to_domain_admin[domain[0]] = []
 
         logger.print_debug("Split objects into types...")
-        for path in objects_to_domain_admin:
+        for index, path in enumerate(objects_to_domain_admin):
+            entry = index if stored else path
             if "User" in path.nodes[0].labels:
-                users_to_domain_admin[path.nodes[-1].domain].append(path)
+                users_to_domain_admin[path.nodes[-1].domain].append(entry)
             elif "Computer" in path.nodes[0].labels:
-                computers_to_domain_admin[path.nodes[-1].domain].append(path)
+                computers_to_domain_admin[path.nodes[-1].domain].append(entry)
             elif "Group" in path.nodes[0].labels:
-                groups_to_domain_admin[path.nodes[-1].domain].append(path)
+                groups_to_domain_admin[path.nodes[-1].domain].append(entry)
             elif "OU" in path.nodes[0].labels:
-                ou_to_domain_admin[path.nodes[-1].domain].append(path)
+                ou_to_domain_admin[path.nodes[-1].domain].append(entry)
             elif "GPO" in path.nodes[0].labels:
-                gpo_to_domain_admin[path.nodes[-1].domain].append(path)
+                gpo_to_domain_admin[path.nodes[-1].domain].append(entry)
             elif "Domain" in path.nodes[0].labels:
-                domains_to_domain_admin.append(path)
+                domains_to_domain_admin.append(entry)
+        if stored:
+            for paths_by_domain in (
+                users_to_domain_admin,
+                groups_to_domain_admin,
+                computers_to_domain_admin,
+                ou_to_domain_admin,
+                gpo_to_domain_admin,
+            ):
+                for domain, indexes in paths_by_domain.items():
+                    paths_by_domain[domain] = objects_to_domain_admin.select(indexes)
         logger.print_debug("[Done]")
 
         requests_results["users_to_domain_admin"] = users_to_domain_admin
@@ -1078,32 +2115,44 @@ class Neo4j:
         dico_ou_to_da = {}
         dico_gpo_to_da = {}
 
-        for path in objects_to_domain_admin:
+        for index, path in enumerate(objects_to_domain_admin):
+            entry = index if stored else path
 
             if "User" in path.nodes[0].labels:
                 if path.nodes[0].name not in dico_users_to_da:
                     dico_users_to_da[path.nodes[0].name] = []
-                dico_users_to_da[path.nodes[0].name].append(path)
+                dico_users_to_da[path.nodes[0].name].append(entry)
 
             elif "Computer" in path.nodes[0].labels:
                 if path.nodes[0].name not in dico_computers_to_da:
                     dico_computers_to_da[path.nodes[0].name] = []
-                dico_computers_to_da[path.nodes[0].name].append(path)
+                dico_computers_to_da[path.nodes[0].name].append(entry)
 
             elif "Group" in path.nodes[0].labels:
                 if path.nodes[0].name not in dico_groups_to_da:
                     dico_groups_to_da[path.nodes[0].name] = []
-                dico_groups_to_da[path.nodes[0].name].append(path)
+                dico_groups_to_da[path.nodes[0].name].append(entry)
 
             elif "OU" in path.nodes[0].labels:
                 if path.nodes[0].name not in dico_ou_to_da:
                     dico_ou_to_da[path.nodes[0].name] = []
-                dico_ou_to_da[path.nodes[0].name].append(path)
+                dico_ou_to_da[path.nodes[0].name].append(entry)
 
             elif "GPO" in path.nodes[0].labels:
                 if path.nodes[0].name not in dico_gpo_to_da:
                     dico_gpo_to_da[path.nodes[0].name] = []
-                dico_gpo_to_da[path.nodes[0].name].append(path)
+                dico_gpo_to_da[path.nodes[0].name].append(entry)
+
+        if stored:
+            for paths_by_name in (
+                dico_users_to_da,
+                dico_computers_to_da,
+                dico_groups_to_da,
+                dico_ou_to_da,
+                dico_gpo_to_da,
+            ):
+                for name, indexes in paths_by_name.items():
+                    paths_by_name[name] = objects_to_domain_admin.select(indexes)
 
         requests_results["dico_users_to_da"] = dico_users_to_da
         requests_results["dico_computers_to_da"] = dico_computers_to_da
@@ -1151,10 +2200,17 @@ class Neo4j:
         # Dico for ACL anomaly and futur other controls to retrieve paths to DA on computer ID
         dico_paths_computers_to_DA = {}
         for domain in computers_to_domain_admin:
-            for path in computers_to_domain_admin[domain]:
+            paths = computers_to_domain_admin[domain]
+            entries = paths.indexes if stored else paths
+            for entry, path in zip(entries, paths):
                 if path.nodes[0].name not in dico_paths_computers_to_DA:
                     dico_paths_computers_to_DA[path.nodes[0].name] = []
-                dico_paths_computers_to_DA[path.nodes[0].name].append(path)
+                dico_paths_computers_to_DA[path.nodes[0].name].append(entry)
+        if stored:
+            for name, indexes in dico_paths_computers_to_DA.items():
+                dico_paths_computers_to_DA[name] = objects_to_domain_admin.select(
+                    indexes
+                )
         requests_results["dico_paths_computers_to_DA"] = dico_paths_computers_to_DA
 
         users_admin_on_computers = requests_results["users_admin_on_computers"]
@@ -1180,6 +2236,9 @@ class Neo4j:
         )
         requests_results["computers_admin_to_count"] = computers_admin_to_count
 
+        # Transitive group membership, see set_membership_closure()
+        requests_results["membership_closure"] = self.membership_closure
+
     @staticmethod
     def check_all_domain_objects_exist(self, result):
         objects_with_unexisting_domains = result[0][0]
@@ -1221,6 +2280,7 @@ class Neo4j:
             "RemoteInteractiveLogonPrivilege",
             "EnrollOnBehalfOf",
             "ManageCA",
+            CLOSURE_RELATION,
         ]
 
         if not self.arguments.rdp:
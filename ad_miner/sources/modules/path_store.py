@@ -0,0 +1,166 @@
+import os
+import pickle
+from array import array
+from bisect import bisect_right
+
+from ad_miner.sources.modules.node_neo4j import Node
+from ad_miner.sources.modules.path_neo4j import Path
+
+
+def write_shard(directory, shard, paths):
+    """Write a list of path tuples (see Neo4j.pathTuple) as one shard
+    of a PathStore.
+
+    A shard is made of four files:
+    - <shard>.ids: neo4j ids of the nodes of every path, one after another
+    - <shard>.relations: relation type index of each of these nodes
+    - <shard>.offsets: index of the first node of each path (index)
+    - <shard>.table: node properties and relation types (node table)
+
+    Returns the number of paths written."""
+    node_table = {}
+    relation_types = {}
+    node_ids = array("q")
+    relations = array("i")
+    offsets = array("q", [0])
+
+    for path in paths:
+        for node_id, labels, name, domain, tenant_id, relation_type in path:
+            if node_id not in node_table:
+                node_table[node_id] = (labels, name, domain, tenant_id)
+            if relation_type not in relation_types:
+                relation_types[relation_type] = len(relation_types)
+            node_ids.append(node_id)
+            relations.append(relation_types[relation_type])
+        offsets.append(len(node_ids))
+
+    base = os.path.join(directory, "%05d" % shard)
+    with open(base + ".ids", "wb") as f:
+        node_ids.tofile(f)
+    with open(base + ".relations", "wb") as f:
+        relations.tofile(f)
+    with open(base + ".offsets", "wb") as f:
+        offsets.tofile(f)
+    with open(base + ".table", "wb") as f:
+        pickle.dump((node_table, list(relation_types)), f)
+
+    return len(offsets) - 1
+
+
+class PathStore:
+    """Paths of a Graph request kept on disk instead of in memory.
+
+    Shards are written by the worker processes (write_shard), in the order
+    of the request chunks. Iterating the store yields Path objects built
+    from one shard at a time, so memory only depends on the shard size.
+    The last shard read is kept, so that indexing the paths in order reads
+    each shard once. A PathStore pickles as its directory and shard sizes
+    only."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.shard_sizes = []
+        self._cached_shard = None
+
+    def __getstate__(self):
+        return {"directory": self.directory, "shard_sizes": self.shard_sizes}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"])
+        self.shard_sizes = state["shard_sizes"]
+
+    def add_shard(self, size):
+        self.shard_sizes.append(size)
+
+    def __len__(self):
+        return sum(self.shard_sizes)
+
+    def __iter__(self):
+        for shard, size in enumerate(self.shard_sizes):
+            if size:
+                yield from self.read_shard(shard)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PathStore index out of range")
+        starts = [0]
+        for size in self.shard_sizes:
+            starts.append(starts[-1] + size)
+        shard = bisect_right(starts, index) - 1
+        return self._path(self._shard(shard), index - starts[shard])
+
+    def select(self, indexes):
+        """PathSelection of the paths at these indexes"""
+        return PathSelection(self, indexes)
+
+    def _load(self, shard, name, typecode):
+        values = array(typecode)
+        file_name = os.path.join(self.directory, "%05d.%s" % (shard, name))
+        with open(file_name, "rb") as f:
+            values.frombytes(f.read())
+        return values
+
+    def _shard(self, shard):
+        """Content of a shard, read from disk unless it is the last one"""
+        if self._cached_shard is None or self._cached_shard[0] != shard:
+            with open(os.path.join(self.directory, "%05d.table" % shard), "rb") as f:
+                node_table, relation_types = pickle.load(f)
+            content = (
+                self._load(shard, "ids", "q"),
+                self._load(shard, "relations", "i"),
+                self._load(shard, "offsets", "q"),
+                node_table,
+                relation_types,
+            )
+            self._cached_shard = (shard, content)
+        return self._cached_shard[1]
+
+    @staticmethod
+    def _path(content, i):
+        """i-th path of the content of a shard"""
+        node_ids, relations, offsets, node_table, relation_types = content
+        nodes = []
+        for position in range(offsets[i], offsets[i + 1]):
+            node_id = node_ids[position]
+            labels, name, domain, tenant_id = node_table[node_id]
+            nodes.append(
+                Node(
+                    node_id,
+                    labels,
+                    name,
+                    domain,
+                    tenant_id,
+                    relation_types[relations[position]],
+                )
+            )
+        return Path(nodes)
+
+    def read_shard(self, shard, start=0):
+        """Generator of the paths of a shard, from its start-th path"""
+        content = self._shard(shard)
+        for i in range(start, len(content[2]) - 1):
+            yield self._path(content, i)
+
+
+class PathSelection:
+    """Some paths of a PathStore, referenced by their index in the store.
+
+    Used for the indexes built on a stored result (paths by domain or by
+    source name), so that they do not keep a second copy of the paths in
+    memory. Like the store, it can be iterated, indexed and measured."""
+
+    def __init__(self, store, indexes):
+        self.store = store
+        self.indexes = array("q", indexes)
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __iter__(self):
+        for index in self.indexes:
+            yield self.store[index]
+
+    def __getitem__(self, index):
+        return self.store[self.indexes[index]]
@@ -0,0 +1,96 @@
+import re
+
+# Fields of requests.json that can be explained without the GDS plugin
+AUDITED_FIELDS = [
+    "request",
+    "scope_query",
+    "native_sources",
+    "native_targets",
+    "progressive_request",
+]
+
+# Operators of a plan making a request slow on large databases
+RISKY_OPERATORS = {
+    "CartesianProduct": "cartesian product between unconnected patterns",
+    "AllNodesScan": "scan of every node of the database (pattern without label)",
+}
+
+# Operators only risky in write requests
+RISKY_WRITE_OPERATORS = {
+    "Eager": "eager operator, every row is materialized before writing",
+}
+
+# Placeholders replaced by AD Miner when running the request
+PLACEHOLDERS = {"PARAM1": "0", "PARAM2": "1", "PARAM_DEPTH": "1"}
+
+# Parameters sent by AD Miner with some requests
+PARAMETERS = {"source_ids": []}
+
+# Counters of each operator of a PROFILE plan
+PROFILE_COUNTERS = ["rows", "dbHits", "pageCacheHits", "pageCacheMisses", "time"]
+
+
+def explainable_query(query):
+    """Query with the chunk and depth placeholders replaced, prefixed
+    with EXPLAIN"""
+    for placeholder, value in PLACEHOLDERS.items():
+        query = re.sub(r"\b%s\b" % placeholder, value, query)
+    return "EXPLAIN " + query
+
+
+def operator_name(plan):
+    """Operator of a plan, without its runtime suffix (e.g. @neo4j)"""
+    return plan["operatorType"].split("@")[0]
+
+
+def plan_operators(plan):
+    """Generator of (operator, estimated rows) of a plan, root first"""
+    # Raw bolt plan: the arguments of the operator are under "args"
+    yield operator_name(plan), plan.get("args", {}).get("EstimatedRows", 0)
+    for child in plan.get("children", []):
+        yield from plan_operators(child)
+
+
+def audit_plan(plan, is_write):
+    """Summary of a plan: operators, estimated rows at its root and the
+    risky operators found in it"""
+    operators = list(plan_operators(plan))
+    risky = dict(RISKY_OPERATORS)
+    if is_write:
+        risky.update(RISKY_WRITE_OPERATORS)
+
+    issues = []
+    for operator, estimated_rows in operators:
+        if operator in risky:
+            issues.append(
+                "%s (%d estimated rows) : %s"
+                % (operator, estimated_rows, risky[operator])
+            )
+
+    return {
+        "estimated_rows": int(operators[0][1]),
+        "operators": sorted(set(operator for operator, _ in operators)),
+        "issues": issues,
+    }
+
+
+def profile_operators(profile):
+    """Generator of the counters of each operator of a profile, root first"""
+    operator = {"operator": operator_name(profile)}
+    for counter in PROFILE_COUNTERS:
+        if counter in profile:
+            operator[counter] = profile[counter]
+    yield operator
+    for child in profile.get("children", []):
+        yield from profile_operators(child)
+
+
+def summarize_profile(profile):
+    """Total db hits and page cache hits/misses of a profile, rows
+    returned and the counters of each of its operators"""
+    operators = list(profile_operators(profile))
+    summary = {"rows": operators[0].get("rows", 0)}
+    for counter in ["dbHits", "pageCacheHits", "pageCacheMisses"]:
+        summary[counter] = sum(operator.get(counter, 0) for operator in operators)
+    summary["operators"] = operators
+    return summary
@@ -0,0 +1,92 @@
+from ad_miner.sources.modules import logger
+
+# Data computed from a request result by Neo4j.compute_common_cache. It
+# references the paths of the result and is released with it. Controls
+# reading it declare the request in their request_keys.
+DERIVED_RESULTS = {
+    "objects_to_domain_admin": [
+        "users_to_domain_admin",
+        "groups_to_domain_admin",
+        "computers_to_domain_admin",
+        "ou_to_domain_admin",
+        "gpo_to_domain_admin",
+        "domains_to_domain_admin",
+        "dico_users_to_da",
+        "dico_computers_to_da",
+        "dico_groups_to_da",
+        "dico_ou_to_da",
+        "dico_gpo_to_da",
+        "dico_paths_computers_to_DA",
+    ],
+}
+
+
+class ResultLifetime:
+    """Frees requests results once the last control reading them has run.
+
+    Controls declare the requests they read in request_keys, which gives
+    the position of the last consumer of each result. Every result is
+    also pickled in cache_neo4j by Neo4j.process_request: a released
+    result is read back from there if it is needed again (get). Derived
+    data (DERIVED_RESULTS) is pickled there when it is released."""
+
+    def __init__(self, neo4j, requests_results, selected_controls, kept_requests):
+        self.neo4j = neo4j
+        self.requests_results = requests_results
+        self.kept_requests = set(kept_requests)
+        self.released = set()
+
+        # Position, in selected_controls, of the last control reading each request
+        self.last_consumer = {}
+        for position, control in enumerate(selected_controls):
+            for request_key in control.request_keys:
+                self.last_consumer[request_key] = position
+
+    def release(self, request_key):
+        """Drop a result, and the data derived from it, from requests_results
+        and from the Neo4j instance"""
+        if request_key in self.kept_requests or request_key in self.released:
+            return
+        request = self.neo4j.all_requests.get(request_key)
+        if request is None or self.requests_results.get(request_key) is None:
+            return
+        self.requests_results[request_key] = None
+        request["result"] = None
+        self.released.add(request_key)
+
+        for derived_key in DERIVED_RESULTS.get(request_key, ()):
+            if self.requests_results.get(derived_key) is None:
+                continue
+            self.neo4j.cache.createCacheEntry(
+                derived_key, self.requests_results[derived_key]
+            )
+            self.requests_results[derived_key] = None
+            self.released.add(derived_key)
+
+    def release_unused(self):
+        """Release results read by no selected control (they were only
+        needed by compute_common_cache and the general pages)"""
+        for request_key in self.neo4j.all_requests:
+            if request_key not in self.last_consumer:
+                self.release(request_key)
+        logger.print_debug(
+            "%d requests results released before controls" % len(self.released)
+        )
+
+    def control_done(self, position):
+        """Release results whose last consumer is the control at position"""
+        for request_key, last_position in self.last_consumer.items():
+            if last_position == position:
+                self.release(request_key)
+
+    def get(self, request_key):
+        """Result of a request, or derived data, read back from cache_neo4j
+        if released"""
+        if request_key not in self.released:
+            if request_key not in self.neo4j.all_requests:
+                return self.requests_results.get(request_key)
+            return self.neo4j.all_requests[request_key].get("result")
+        result = self.neo4j.cache.retrieveCacheEntry(request_key)
+        if result is False:
+            return None
+        return result
@@ -0,0 +1,409 @@
+import re
+
+# MATCH p=(n:Label {prop: value, ...}): the single node a request scans
+SCANNED_NODE = re.compile(
+    r"^\s*MATCH\s*(?:\w+\s*=\s*)?\((\w+):(\w+)\s*(\{[^}]*\})?\s*\)"
+)
+MAP_KEY = re.compile(r"(\w+)\s*:")
+
+# Returned in place of the clear text password by nb_user_password_cleartext
+REDACTED_PASSWORD = "[redacted for security purposes]"
+
+# Properties whose value never leaves the database: the scan only returns
+# whether they are set, as has_<property>
+PRESENCE_ONLY_PROPERTIES = {"userpassword"}
+
+
+def days_since(extract_date, timestamp):
+    """toInteger(($extract_date$ - timestamp)/86400) of the requests:
+    integer division rounded toward zero, null for a null timestamp"""
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)):
+        raise TypeError("Cannot subtract %r from the extract date" % (timestamp,))
+    elapsed = extract_date - timestamp
+    if isinstance(elapsed, float):
+        return int(elapsed / 86400)
+    days = abs(elapsed) // 86400
+    return days if elapsed >= 0 else -days
+
+
+def to_string(value):
+    """toString() of cypher"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    raise TypeError("Cannot convert %r to a string" % (value,))
+
+
+def hashable(value):
+    """Value usable in a set, to remove duplicate rows (DISTINCT)"""
+    if isinstance(value, list):
+        return tuple(hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple((key, hashable(item)) for key, item in value.items())
+    return value
+
+
+class ScannedNode:
+    """Properties of a node returned by the scan of its label, with the
+    expressions used by the fused requests"""
+
+    __slots__ = ("properties", "extract_date", "password_renewal")
+
+    def __init__(self, properties, extract_date, password_renewal):
+        self.properties = properties
+        self.extract_date = extract_date
+        self.password_renewal = password_renewal
+
+    def __getitem__(self, name):
+        # KeyError if the property was not scanned: the fused version of the
+        # request reads a property that its cypher version does not
+        return self.properties[name]
+
+    def is_true(self, name):
+        return self.properties[name] is True
+
+    def is_false(self, name):
+        return self.properties[name] is False
+
+    def is_set(self, name):
+        """NOT n.name IS NULL, for properties of PRESENCE_ONLY_PROPERTIES"""
+        return self.properties["has_" + name]
+
+    def days(self, name):
+        return days_since(self.extract_date, self.properties[name])
+
+    def starts_with(self, name, prefix):
+        value = self.properties[name]
+        return isinstance(value, str) and value.startswith(prefix)
+
+    def ends_with(self, name, suffix):
+        value = self.properties[name]
+        return isinstance(value, str) and value.endswith(suffix)
+
+
+class FusedRequest:
+    """Python version of a read request that only scans one label.
+
+    request is the cypher of requests.json it reproduces (before its
+    variables are replaced): the request is only fused while both are the
+    same. where filters the scanned nodes, columns are the (name, value)
+    pairs of the RETURN clause, then rows are made distinct and ordered
+    like cypher does (null last, first when descending)."""
+
+    def __init__(
+        self, request, where, columns, distinct=False, order_by=None, descending=False
+    ):
+        match = SCANNED_NODE.match(request)
+        if match is None:
+            raise ValueError("Not a request scanning one label : %s" % request)
+        self.request = request
+        self.variable, self.label, properties = match.groups()
+        self.where = where
+        self.columns = columns
+        self.distinct = distinct
+        self.order_by = order_by
+        self.descending = descending
+
+        # Properties of the inline map and of variable.property expressions
+        self.properties = set(MAP_KEY.findall(properties or ""))
+        self.properties.update(re.findall(r"\b%s\.(\w+)" % self.variable, request))
+
+    def evaluate(self, nodes, output_type):
+        rows = []
+        seen = set()
+        for node in nodes:
+            if not self.where(node):
+                continue
+            row = {name: value(node) for name, value in self.columns}
+            if self.distinct:
+                key = hashable(list(row.values()))
+                if key in seen:
+                    continue
+                seen.add(key)
+            rows.append(row)
+
+        if self.order_by is not None:
+            rows.sort(
+                key=lambda row: (row[self.order_by] is None, row[self.order_by]),
+                reverse=self.descending,
+            )
+
+        if output_type is list:
+            return [list(row.values()) for row in rows]
+        return rows
+
+
+def scan_query(label, properties):
+    """Single scan of a label returning the properties of every node"""
+    projection = ", ".join(
+        (
+            "has_%s: n.%s IS NOT NULL" % (name, name)
+            if name in PRESENCE_ONLY_PROPERTIES
+            else "." + name
+        )
+        for name in sorted(properties)
+    )
+    return "MATCH (n:%s) RETURN n{%s}" % (label, projection)
+
+
+FUSED_REQUESTS = {
+    "nb_domain_controllers": FusedRequest(
+        "MATCH (c1:Computer{is_dc:TRUE}) RETURN DISTINCT(c1.domain) AS domain, c1.name AS name, COALESCE(c1.operatingsystem, 'Unknown') AS os, COALESCE(c1.ghost_computer, False) AS ghost, toInteger(($extract_date$ - c1.lastlogontimestamp)/86400) as lastLogon",
+        where=lambda c: c.is_true("is_dc"),
+        columns=[
+            ("domain", lambda c: c["domain"]),
+            ("name", lambda c: c["name"]),
+            (
+                "os",
+                lambda c: (
+                    "Unknown" if c["operatingsystem"] is None else c["operatingsystem"]
+                ),
+            ),
+            (
+                "ghost",
+                lambda c: False if c["ghost_computer"] is None else c["ghost_computer"],
+            ),
+            ("lastLogon", lambda c: c.days("lastlogontimestamp")),
+        ],
+        distinct=True,
+    ),
+    "nb_enabled_accounts": FusedRequest(
+        "MATCH p=(u:User{enabled:true} ) RETURN DISTINCT(u.domain) AS domain, u.name AS name, toInteger(($extract_date$ - u.lastlogontimestamp)/86400) AS logon ORDER BY u.domain",
+        where=lambda u: u.is_true("enabled"),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("name", lambda u: u["name"]),
+            ("logon", lambda u: u.days("lastlogontimestamp")),
+        ],
+        distinct=True,
+        order_by="domain",
+    ),
+    "nb_disabled_accounts": FusedRequest(
+        "MATCH p=(u:User{enabled:false} ) RETURN DISTINCT(u.domain) AS domain, u.name AS name, toInteger(($extract_date$ - u.lastlogontimestamp)/86400) AS logon ORDER BY u.domain",
+        where=lambda u: u.is_false("enabled"),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("name", lambda u: u["name"]),
+            ("logon", lambda u: u.days("lastlogontimestamp")),
+        ],
+        distinct=True,
+        order_by="domain",
+    ),
+    "nb_computers": FusedRequest(
+        "MATCH (c:Computer) WHERE NOT c.name IS NULL RETURN DISTINCT(c.domain) AS domain, c.name AS name, c.operatingsystem AS os, c.ghost_computer AS ghost ORDER BY c.domain",
+        where=lambda c: c["name"] is not None,
+        columns=[
+            ("domain", lambda c: c["domain"]),
+            ("name", lambda c: c["name"]),
+            ("os", lambda c: c["operatingsystem"]),
+            ("ghost", lambda c: c["ghost_computer"]),
+        ],
+        distinct=True,
+        order_by="domain",
+    ),
+    "computers_not_connected_since": FusedRequest(
+        "MATCH (c:Computer) WHERE NOT c.lastlogontimestamp IS NULL AND c.name IS NOT NULL RETURN c.name AS name, toInteger(($extract_date$ - c.lastlogontimestamp)/86400) as days, toInteger(($extract_date$ - c.pwdlastset)/86400) as pwdlastset, c.enabled as enabled ORDER BY days DESC ",
+        where=lambda c: c["lastlogontimestamp"] is not None and c["name"] is not None,
+        columns=[
+            ("name", lambda c: c["name"]),
+            ("days", lambda c: c.days("lastlogontimestamp")),
+            ("pwdlastset", lambda c: c.days("pwdlastset")),
+            ("enabled", lambda c: c["enabled"]),
+        ],
+        order_by="days",
+        descending=True,
+    ),
+    "os": FusedRequest(
+        "MATCH (c:Computer{enabled:true}) WHERE  NOT c.enabled IS NULL AND NOT c.operatingsystem IS NULL RETURN DISTINCT(c.operatingsystem) AS os, toInteger(($extract_date$ - c.lastlogontimestamp)/86400) as lastLogon, c.name AS name, c.domain AS domain ORDER BY c.operatingsystem",
+        where=lambda c: c.is_true("enabled") and c["operatingsystem"] is not None,
+        columns=[
+            ("os", lambda c: c["operatingsystem"]),
+            ("lastLogon", lambda c: c.days("lastlogontimestamp")),
+            ("name", lambda c: c["name"]),
+            ("domain", lambda c: c["domain"]),
+        ],
+        distinct=True,
+        order_by="os",
+    ),
+    "krb_pwd_last_change": FusedRequest(
+        'MATCH(u:User) WHERE u.name STARTS WITH "KRBTGT@" RETURN u.domain as domain, u.name as name, toInteger(($extract_date$ - u.pwdlastset)/86400) as pass_last_change, toInteger(($extract_date$ - u.whencreated)/86400) AS accountCreationDate',
+        where=lambda u: u.starts_with("name", "KRBTGT@"),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("name", lambda u: u["name"]),
+            ("pass_last_change", lambda u: u.days("pwdlastset")),
+            ("accountCreationDate", lambda u: u.days("whencreated")),
+        ],
+    ),
+    "nb_kerberoastable_accounts": FusedRequest(
+        "MATCH (u:User{hasspn:true,enabled:true}) WHERE u.gmsa IS NULL AND u.name IS NOT NULL RETURN u.domain AS domain, u.name AS name, toInteger(($extract_date$ - u.pwdlastset)/86400) AS pass_last_change, u.is_da AS is_Domain_Admin, u.serviceprincipalnames AS SPN, toInteger(($extract_date$ - u.whencreated)/86400) AS accountCreationDate ORDER BY pass_last_change DESC",
+        where=lambda u: (
+            u.is_true("hasspn")
+            and u.is_true("enabled")
+            and u["gmsa"] is None
+            and u["name"] is not None
+        ),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("name", lambda u: u["name"]),
+            ("pass_last_change", lambda u: u.days("pwdlastset")),
+            ("is_Domain_Admin", lambda u: u["is_da"]),
+            ("SPN", lambda u: u["serviceprincipalnames"]),
+            ("accountCreationDate", lambda u: u.days("whencreated")),
+        ],
+        order_by="pass_last_change",
+        descending=True,
+    ),
+    "nb_as-rep_roastable_accounts": FusedRequest(
+        "MATCH (u:User{enabled:true,dontreqpreauth: true}) RETURN u.domain AS domain,u.name AS name, u.is_da AS is_Domain_Admin",
+        where=lambda u: u.is_true("enabled") and u.is_true("dontreqpreauth"),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("name", lambda u: u["name"]),
+            ("is_Domain_Admin", lambda u: u["is_da"]),
+        ],
+    ),
+    "nb_computer_unconstrained_delegations": FusedRequest(
+        "MATCH (c2:Computer{unconstraineddelegation:true,is_dc:FALSE}) RETURN DISTINCT(c2.domain) AS domain,c2.name AS name",
+        where=lambda c: c.is_true("unconstraineddelegation") and c.is_false("is_dc"),
+        columns=[
+            ("domain", lambda c: c["domain"]),
+            ("name", lambda c: c["name"]),
+        ],
+        distinct=True,
+    ),
+    "nb_users_unconstrained_delegations": FusedRequest(
+        "MATCH (c2:User{enabled:true,unconstraineddelegation:true,is_da:FALSE}) RETURN DISTINCT(c2.domain) AS domain,c2.name AS name",
+        where=lambda u: (
+            u.is_true("enabled")
+            and u.is_true("unconstraineddelegation")
+            and u.is_false("is_da")
+        ),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("name", lambda u: u["name"]),
+        ],
+        distinct=True,
+    ),
+    "dormant_accounts": FusedRequest(
+        "MATCH (n:User{enabled:true}) WHERE toInteger(($extract_date$ - n.lastlogontimestamp)/86400)>$password_renewal$ RETURN n.domain as domain, n.name as name,toInteger(($extract_date$ - n.lastlogontimestamp)/86400) AS days, toInteger(($extract_date$ - n.whencreated)/86400) AS accountCreationDate ORDER BY days DESC",
+        where=lambda u: (
+            u.is_true("enabled")
+            and u.days("lastlogontimestamp") is not None
+            and u.days("lastlogontimestamp") > u.password_renewal
+        ),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("name", lambda u: u["name"]),
+            ("days", lambda u: u.days("lastlogontimestamp")),
+            ("accountCreationDate", lambda u: u.days("whencreated")),
+        ],
+        order_by="days",
+        descending=True,
+    ),
+    "password_last_change": FusedRequest(
+        "MATCH (c:User {enabled:TRUE}) RETURN DISTINCT(c.name) AS user,toInteger(($extract_date$ - c.pwdlastset )/ 86400) AS days, toInteger(($extract_date$ - c.whencreated)/86400) AS accountCreationDate ORDER BY days DESC",
+        where=lambda u: u.is_true("enabled"),
+        columns=[
+            ("user", lambda u: u["name"]),
+            ("days", lambda u: u.days("pwdlastset")),
+            ("accountCreationDate", lambda u: u.days("whencreated")),
+        ],
+        distinct=True,
+        order_by="days",
+        descending=True,
+    ),
+    "nb_user_password_cleartext": FusedRequest(
+        'MATCH (u:User) WHERE NOT u.userpassword IS null RETURN u.name AS user,"[redacted for security purposes]" AS password, u.is_da as `is Domain Admin`',
+        where=lambda u: u.is_set("userpassword"),
+        columns=[
+            ("user", lambda u: u["name"]),
+            ("password", lambda u: REDACTED_PASSWORD),
+            ("is Domain Admin", lambda u: u["is_da"]),
+        ],
+    ),
+    "get_users_password_not_required": FusedRequest(
+        "MATCH (u:User{enabled:true,passwordnotreqd:true}) RETURN DISTINCT (u.domain) as domain, (u.name) AS user,toInteger(($extract_date$ - u.pwdlastset )/ 86400) AS pwdlastset,toInteger(($extract_date$ - u.lastlogontimestamp)/86400) AS lastlogon",
+        where=lambda u: u.is_true("enabled") and u.is_true("passwordnotreqd"),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("user", lambda u: u["name"]),
+            ("pwdlastset", lambda u: u.days("pwdlastset")),
+            ("lastlogon", lambda u: u.days("lastlogontimestamp")),
+        ],
+        distinct=True,
+    ),
+    "user_password_never_expires": FusedRequest(
+        "MATCH (u:User{enabled:true})WHERE u.pwdneverexpires = true RETURN DISTINCT(u.domain) AS domain, u.name AS name, toInteger(($extract_date$ - u.lastlogontimestamp)/86400) AS LastLogin, toInteger(($extract_date$ - u.pwdlastset )/ 86400) AS LastPasswChange,toInteger(($extract_date$ - u.whencreated)/86400) AS accountCreationDate",
+        where=lambda u: u.is_true("enabled") and u.is_true("pwdneverexpires"),
+        columns=[
+            ("domain", lambda u: u["domain"]),
+            ("name", lambda u: u["name"]),
+            ("LastLogin", lambda u: u.days("lastlogontimestamp")),
+            ("LastPasswChange", lambda u: u.days("pwdlastset")),
+            ("accountCreationDate", lambda u: u.days("whencreated")),
+        ],
+        distinct=True,
+    ),
+    "nb_computers_laps": FusedRequest(
+        "MATCH (c:Computer) WHERE NOT c.name is NULL and NOT c.haslaps IS NULL AND toUpper(c.operatingsystem) CONTAINS 'WINDOWS' RETURN DISTINCT(c.domain) AS domain, toInteger(($extract_date$ - c.lastlogontimestamp)/86400) as lastLogon, c.name AS name, toString(c.haslaps) AS LAPS",
+        where=lambda c: (
+            c["name"] is not None
+            and c["haslaps"] is not None
+            and c["operatingsystem"] is not None
+            and "WINDOWS" in c["operatingsystem"].upper()
+        ),
+        columns=[
+            ("domain", lambda c: c["domain"]),
+            ("lastLogon", lambda c: c.days("lastlogontimestamp")),
+            ("name", lambda c: c["name"]),
+            ("LAPS", lambda c: to_string(c["haslaps"])),
+        ],
+        distinct=True,
+    ),
+    "guest_accounts": FusedRequest(
+        'MATCH (n:User) WHERE n.objectid ENDS WITH "-501" RETURN n.name, n.domain, n.enabled',
+        where=lambda u: u.ends_with("objectid", "-501"),
+        columns=[
+            ("n.name", lambda u: u["name"]),
+            ("n.domain", lambda u: u["domain"]),
+            ("n.enabled", lambda u: u["enabled"]),
+        ],
+    ),
+    "unpriviledged_users_with_admincount": FusedRequest(
+        "MATCH (u:User{enabled:true}) WHERE u.is_da=false AND u.admincount=true RETURN u.name, u.domain, u.da_type",
+        where=lambda u: (
+            u.is_true("enabled") and u.is_false("is_da") and u.is_true("admincount")
+        ),
+        columns=[
+            ("u.name", lambda u: u["name"]),
+            ("u.domain", lambda u: u["domain"]),
+            ("u.da_type", lambda u: u["da_type"]),
+        ],
+    ),
+    "get_fgpp": FusedRequest(
+        "MATCH (u:User) WHERE u.fgpp_name IS NOT NULL RETURN u.fgpp_msds_psoappliesto, u.fgpp_name, u.fgpp_msds_minimumpasswordlength, u.fgpp_msds_minimumpasswordage, u.fgpp_msds_maximumpasswordage, u.fgpp_msds_passwordreversibleencryptionenabled, u.fgpp_msds_passwordhistorylength, u.fgpp_msds_passwordcomplexityenabled, u.fgpp_msds_lockoutduration, u.fgpp_msds_lockoutthreshold, u.fgpp_msds_lockoutobservationwindow",
+        where=lambda u: u["fgpp_name"] is not None,
+        columns=[
+            ("u." + name, lambda u, name=name: u[name])
+            for name in [
+                "fgpp_msds_psoappliesto",
+                "fgpp_name",
+                "fgpp_msds_minimumpasswordlength",
+                "fgpp_msds_minimumpasswordage",
+                "fgpp_msds_maximumpasswordage",
+                "fgpp_msds_passwordreversibleencryptionenabled",
+                "fgpp_msds_passwordhistorylength",
+                "fgpp_msds_passwordcomplexityenabled",
+                "fgpp_msds_lockoutduration",
+                "fgpp_msds_lockoutthreshold",
+                "fgpp_msds_lockoutobservationwindow",
+            ]
+        ],
+    ),
+}
@@ -0,0 +1,113 @@
+import json
+import time
+
+from ad_miner.sources.modules import logger
+
+# Number of lines of each table of the summary
+SUMMARY_SIZE = 10
+
+
+def chunk_bounds(value, identifier):
+    """Part of the request a chunk covers (see Neo4j.chunkQuery)"""
+    if isinstance(value, list):
+        return {"nb_source_ids": len(value)}
+    return {"skip": int(value), "limit": int(identifier)}
+
+
+def chunk_stats(chunk, value, identifier, server, wall_start, cpu_start):
+    """Statistics of a chunk computed by a worker, sent back with it
+    in chunk.stats. bytes is the size of the encoded chunk (see the
+    nbytes of chunk_encoding), measured without serializing it again."""
+    return dict(
+        chunk_bounds(value, identifier),
+        server=server,
+        rows=len(chunk),
+        bytes=chunk.nbytes,
+        wall=round(time.time() - wall_start, 3),
+        cpu=round(time.process_time() - cpu_start, 3),
+    )
+
+
+class Telemetry:
+    """Structured log of a run (--telemetry): one JSON object per line
+    for each request, chunk of a parallel request and control, and a
+    summary of the slowest ones at the end. Does nothing if file_path
+    is None."""
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.file = open(file_path, "w") if file_path else None
+        # Request being processed, chunks events are attached to it
+        self.request_key = None
+        self.events = {"request": [], "chunk": [], "control": []}
+
+    @property
+    def enabled(self):
+        return self.file is not None
+
+    def emit(self, event, **fields):
+        if self.file is None:
+            return
+        fields = dict(event=event, time=round(time.time(), 3), **fields)
+        self.file.write(json.dumps(fields) + "\n")
+        self.file.flush()
+        self.events.setdefault(event, []).append(fields)
+
+    def request(self, request_key, cache, rows, wall, cpu):
+        self.emit(
+            "request",
+            request=request_key,
+            cache=cache,
+            rows=rows,
+            wall=round(wall, 3),
+            cpu=round(cpu, 3),
+        )
+
+    def chunk(self, stats):
+        """Event of a chunk of the current request, stats being the
+        chunk_stats sent back by the worker (None without --telemetry)"""
+        if stats is not None:
+            self.emit("chunk", request=self.request_key, **stats)
+
+    def control(self, control_key, failed, wall, cpu):
+        self.emit(
+            "control",
+            control=control_key,
+            failed=failed,
+            wall=round(wall, 3),
+            cpu=round(cpu, 3),
+        )
+
+    def summary(self):
+        """Print the slowest requests, chunks and controls of the run"""
+        if self.file is None:
+            return
+
+        def table(event, describe):
+            events = sorted(self.events[event], key=lambda e: -e["wall"])
+            logger.print_magenta(
+                "Slowest %ss (%d in total)" % (event, len(self.events[event]))
+            )
+            for e in events[:SUMMARY_SIZE]:
+                print("    %9.2fs  %s" % (e["wall"], describe(e)))
+
+        table(
+            "request",
+            lambda e: "%s - %d objects (cache %s)"
+            % (e["request"], e["rows"], e["cache"]),
+        )
+        table(
+            "chunk",
+            lambda e: "%s - %s - %d rows, %s bytes"
+            % (e["request"], e.get("server"), e["rows"], e.get("bytes")),
+        )
+        table(
+            "control",
+            lambda e: e["control"] + (" (failed)" if e["failed"] else ""),
+        )
+        logger.print_success("Telemetry written in %s" % self.file_path)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
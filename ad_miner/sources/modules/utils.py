@@ -20,7 +20,7 @@ JS_DIRECTORY = Path(__file__).parent.parent / "js"
 TEMPLATES_DIRECTORY = HTML_DIRECTORY / "templates"
 
 
-def args():
+def args(argv=None):
     parser = argparse.ArgumentParser(
         prog="AD-miner",
         description="Active Directory audit tool that leverages cypher queries to crunch data from the Bloodhound graph database to uncover security weaknesses.",
@@ -119,7 +119,91 @@ def args():
         default="",
         help="Nodes of the cluster to run parallel neo4j queries. ex : host1:port1:nCore1,host2:port2:nCore2,...",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--native_paths",
+        default=False,
+        help="Compute path requests in AD Miner (one reverse search per target, or per partition of targets, for requests with at most 100 of them) instead of one neo4j shortestPath per object, when the GDS plugin is not installed",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--progressive_paths",
+        default=False,
+        help="Run path requests at increasing depths up to --level, each time only for objects that have no path yet",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--balanced_chunks",
+        default=False,
+        help="Split parallel requests into chunks of sources of similar estimated cost (number of relations, group members) instead of chunks of the same number of sources",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--fuse_scans",
+        default=False,
+        help="Compute the read requests that only scan User or Computer nodes from a single scan of each label instead of one scan per request",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--parallel_controls",
+        default=False,
+        help="Run controls and generate their pages in parallel (one process per core, see --nb_cores)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--async_requests",
+        default=False,
+        help="Run the parts of parallel neo4j requests, and the read requests between two write requests, as coroutines of a single process (at most --nb_cores at a time) instead of a pool of processes",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--path_store",
+        default=False,
+        help="Write the paths of the largest path requests to disk (cache_neo4j) from the worker processes instead of keeping them in memory",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--create_indexes",
+        default=False,
+        help="Create the missing neo4j indexes on the properties filtered by the requests before running them",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--audit_queries",
+        default=False,
+        help="Explain every request before running them and write their query plans in query_plans_<cache_prefix>.json, with warnings for risky plans (cartesian products, scans of all nodes, eager writes)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile_queries",
+        type=str,
+        default="",
+        help="Run these requests (one chunk for parallel requests) with PROFILE once every request has run, without writing anything, and write their db hits and page cache hits/misses per operator in query_profiles_<cache_prefix>.json. ex : objects_to_domain_admin,dcsync_list,... or all",
+    )
+    parser.add_argument(
+        "--telemetry",
+        default=False,
+        help="Log every request, parallel request chunk and control (time, rows, bytes, cache) in telemetry_<cache_prefix>.jsonl, and print the slowest ones at the end",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--memory_profile",
+        default=False,
+        help="Measure the peak and retained memory of each request, of the common cache and of each control, with the top allocation sites, in memory_profile_<cache_prefix>.json (slower)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--only_controls",
+        type=str,
+        default="",
+        help="Only run these controls, and the requests they need. ex : kerberoastables,as_rep,...",
+    )
+    parser.add_argument(
+        "--skip_controls",
+        type=str,
+        default="",
+        help="Do not run these controls, nor the requests only they need. ex : anomaly_acl,users_GPO_access,...",
+    )
+    return parser.parse_args(argv)
 
 
 def timer_format(delta_time):
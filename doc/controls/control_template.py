@@ -16,6 +16,18 @@ from urllib.parse import quote
 class my_control_class_name(Control):  # TODO change the class name
     "Docstring of my control"  # TODO small documentation here
 
+    # TODO add the control key. This string should be uniq and will be used
+    # by the code and written to the data json.
+    # Do NOT change existing control_key, as it will break evolution with older ad miner versions
+    control_key = "control_key_to_change"
+
+    # TODO list every request of requests.json read by the control.
+    # Requests not listed by any selected control are skipped
+    # when using --only_controls or --skip_controls.
+    # Run python -m ad_miner.scripts.control_manifest after adding the
+    # control or changing its request_keys.
+    request_keys = ["request_key_to_change"]
+
     def __init__(self, arguments, requests_results) -> None:
         super().__init__(arguments, requests_results)
 
@@ -27,11 +39,6 @@ class my_control_class_name(Control):  # TODO change the class name
         # az_passwords, az_misc, ms_graph)
         self.category = ""
 
-        # TODO add the control key. This string should be uniq and will be used
-        # by the code and written to the data json.
-        # Do NOT change existing control_key, as it will break evolution with older ad miner versions
-        self.control_key = "control_key_to_change"
-
         # TODO define the control page title and texts
         self.title = ""
         self.description = ""
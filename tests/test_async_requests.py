@@ -0,0 +1,120 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+from ad_miner.sources.modules import neo4j_class
+from ad_miner.sources.modules.neo4j_class import Neo4j
+from ad_miner.sources.modules.telemetry import Telemetry
+
+REQUESTS_PATH = (
+    Path(__file__).parents[1] / "ad_miner" / "sources" / "modules" / "requests.json"
+)
+
+
+class Records:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def values(self):
+        return self.rows
+
+
+class Transaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def run(self, query, parameters):
+        self.driver.running += 1
+        self.driver.max_running = max(self.driver.max_running, self.driver.running)
+        self.driver.queries.append(query)
+        await asyncio.sleep(0.01)
+        self.driver.running -= 1
+        return Records([[query]])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class Session:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def begin_transaction(self):
+        return Transaction(self.driver)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class AsyncDriver:
+    """In-memory driver counting the transactions running at once"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.queries = []
+
+    def session(self):
+        return Session(self)
+
+    async def close(self):
+        pass
+
+
+def fake_neo4j(all_requests, nb_cores=4, **arguments):
+    defaults = dict(
+        native_paths=False,
+        progressive_paths=False,
+        fuse_scans=False,
+        path_store=False,
+        bolt="bolt://localhost:7687",
+        username="neo4j",
+        password="neo4j",
+        nb_cores=nb_cores,
+    )
+    defaults.update(arguments)
+    return SimpleNamespace(
+        all_requests=all_requests,
+        arguments=SimpleNamespace(**defaults),
+        gds=False,
+        fused_requests={},
+        telemetry=Telemetry(None),
+        executeRequestAsync=Neo4j.executeRequestAsync,
+    )
+
+
+def test_write_and_post_processing_requests_are_barriers():
+    with open(REQUESTS_PATH, encoding="utf-8") as f:
+        requests = json.load(f)
+    del requests["template"]
+    neo4j = fake_neo4j(requests)
+    for request_key, request in requests.items():
+        if "is_a_write_request" in request or "postProcessing" in request:
+            assert not Neo4j.concurrentRead(neo4j, request_key), request_key
+    assert Neo4j.concurrentRead(neo4j, "nb_domain_admins")
+
+
+def test_chunks_of_several_requests_run_together(monkeypatch):
+    driver = AsyncDriver()
+    monkeypatch.setattr(
+        neo4j_class.neo4j.AsyncGraphDatabase, "driver", lambda *a, **k: driver
+    )
+    neo4j = fake_neo4j({}, nb_cores=3)
+    requests = {
+        "first": [[i, 1, "RETURN PARAM1", None, list, {}] for i in range(2)],
+        "second": [[0, -1, "RETURN 2", None, list, {}]],
+    }
+    chunks = asyncio.run(Neo4j.runChunksAsync(neo4j, requests))
+
+    assert chunks == {
+        "first": [[["RETURN 0"]], [["RETURN 1"]]],
+        "second": [[["RETURN 2"]]],
+    }
+    assert driver.max_running == 3
@@ -0,0 +1,97 @@
+import pickle
+import random
+
+from ad_miner.sources.modules.chunk_encoding import EncodedPaths, EncodedRecords
+from ad_miner.sources.modules.graph_class import Graph
+from ad_miner.sources.modules.neo4j_class import Neo4j
+
+LABELS = ["User", "Group", "Computer", "Domain"]
+
+
+def random_paths(generator, nb_paths, nb_nodes):
+    """Path tuples (see Neo4j.pathTuple) sharing nodes between paths"""
+    nodes = [
+        (
+            node_id,
+            generator.choice(LABELS),
+            generator.choice(["N%d@A.LOCAL" % node_id, None]),
+            generator.choice(["A.LOCAL", "B.LOCAL", None]),
+            generator.choice([None, "tenant"]),
+        )
+        for node_id in range(nb_nodes)
+    ]
+    paths = []
+    for _ in range(nb_paths):
+        path = [
+            generator.choice(nodes) + (generator.choice(["MemberOf", "AdminTo"]),)
+            for _ in range(generator.randint(0, 5))
+        ]
+        paths.append(tuple(path) + (generator.choice(nodes) + ("",),))
+    return paths
+
+
+def test_paths_round_trip():
+    generator = random.Random(0)
+    paths = random_paths(generator, 200, 30)
+    encoded = pickle.loads(pickle.dumps(EncodedPaths(paths)))
+
+    assert len(encoded) == len(paths)
+    assert list(encoded) == paths
+    # Each node is stored once, whatever the number of paths it is in
+    assert len(encoded.node_ids) == len({node[0] for path in paths for node in path})
+    assert len(encoded.occurrences) == sum(len(path) for path in paths)
+
+
+def test_empty_chunk_of_paths():
+    encoded = EncodedPaths([])
+    assert len(encoded) == 0
+    assert list(encoded) == []
+
+
+def test_paths_are_decoded_once():
+    generator = random.Random(1)
+    paths = random_paths(generator, 50, 10)
+    chunk = EncodedPaths(paths + paths[:10])
+
+    seen_paths = set()
+    decoded = Neo4j.buildChunkResult(chunk, Graph, seen_paths)
+    assert [
+        tuple(
+            (n.id, n.labels, n.name, n.domain, n.tenant_id, n.relation_type)
+            for n in path.nodes
+        )
+        for path in decoded
+    ] == [
+        tuple(node[:3] + (str(node[3]),) + node[4:] for node in path)
+        for path in dict.fromkeys(paths)
+    ]
+    assert Neo4j.buildChunkResult(EncodedPaths(paths[:5]), Graph, seen_paths) == []
+
+
+def test_records_round_trip():
+    keys = ["domain", "name", "days", "SPN", "enabled"]
+    rows = [
+        ("A.LOCAL", "BOB@A.LOCAL", 12, ["HTTP/a"], True),
+        (None, "ALICE@A.LOCAL", None, None, False),
+        ("A.LOCAL", None, 3.5, [], None),
+    ]
+    encoded = pickle.loads(pickle.dumps(EncodedRecords(keys, iter(rows))))
+
+    assert len(encoded) == 3
+    assert encoded.decode(list) == [list(row) for row in rows]
+    assert encoded.decode(dict) == [dict(zip(keys, row)) for row in rows]
+    # Only the columns of strings are stored as indices
+    assert [strings is not None for strings, _ in encoded.columns] == [
+        True,
+        True,
+        False,
+        False,
+        False,
+    ]
+
+
+def test_empty_chunk_of_records():
+    encoded = EncodedRecords(["name"], [])
+    assert len(encoded) == 0
+    assert encoded.decode(list) == []
+    assert encoded.decode(dict) == []
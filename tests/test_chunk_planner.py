@@ -0,0 +1,67 @@
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from ad_miner.sources.modules.chunk_planner import (
+    balanced_chunks,
+    balanced_queries,
+    scoped_parts,
+)
+
+REQUESTS_PATH = (
+    Path(__file__).parents[1] / "ad_miner" / "sources" / "modules" / "requests.json"
+)
+
+BRACKETS = {")": "(", "]": "[", "}": "{"}
+STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`")
+
+
+def load_requests():
+    with open(REQUESTS_PATH, encoding="utf-8") as f:
+        requests = json.load(f)
+    del requests["template"]
+    return requests
+
+
+def scoped_requests():
+    return [
+        (request_key, request["request"])
+        for request_key, request in load_requests().items()
+        if "scope_query" in request
+    ]
+
+
+def balanced_brackets(query):
+    stack = []
+    for character in STRING.sub("", query):
+        if character in "([{":
+            stack.append(character)
+        elif character in BRACKETS:
+            if not stack or stack.pop() != BRACKETS[character]:
+                return False
+    return not stack
+
+
+@pytest.mark.parametrize("request_key, query", scoped_requests())
+def test_balanced_queries_are_complete(request_key, query):
+    queries = balanced_queries(query)
+    if queries is None:
+        return
+    for derived in queries:
+        assert not re.search(r"\bPARAM[12]\b", derived), request_key
+        assert balanced_brackets(derived), request_key
+
+
+def test_union_of_scoped_searches_is_not_split():
+    request = load_requests()["can_read_gmsapassword_of_adm"]["request"]
+    assert scoped_parts(request) is None
+    assert balanced_queries(request) is None
+
+
+def test_balanced_chunks():
+    costs = [(1, 10), (2, 7), (3, 5), (4, 4), (5, 1), (6, 1)]
+    chunks = balanced_chunks(costs, 3)
+    assert sorted(source for ids, _ in chunks for source in ids) == list(range(1, 7))
+    assert [total for _, total in chunks] == [10, 9, 9]
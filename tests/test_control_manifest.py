@@ -0,0 +1,37 @@
+import importlib
+import json
+import sys
+
+from ad_miner.scripts import control_manifest
+from ad_miner.sources.modules import controls
+
+
+def test_manifest_is_up_to_date(monkeypatch, capsys):
+    # Same check as python -m ad_miner.scripts.control_manifest --check
+    monkeypatch.setattr(sys, "argv", ["control_manifest", "--check"])
+    control_manifest.main()
+    assert "is up to date" in capsys.readouterr().out
+    assert control_manifest.build_manifest() == json.loads(
+        control_manifest.MANIFEST_PATH.read_text(encoding="utf-8")
+    )
+
+
+def test_manifest_matches_control_classes():
+    manifest = {
+        (entry.module, entry.class_name): entry for entry in controls.control_list
+    }
+    for module in sorted({module for module, _ in manifest}):
+        importlib.import_module("ad_miner.sources.modules.controls." + module)
+
+    classes = {
+        (control_class.__module__.rsplit(".", 1)[-1], control_class.__name__): (
+            control_class
+        )
+        for control_class in controls.registered_controls
+    }
+    assert classes.keys() == manifest.keys()
+    for key, control_class in classes.items():
+        entry = manifest[key]
+        assert control_class.control_key == entry.control_key, key
+        assert list(control_class.request_keys) == entry.request_keys, key
+        assert entry.load() is control_class
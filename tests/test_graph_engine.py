@@ -0,0 +1,126 @@
+import json
+import random
+from pathlib import Path
+
+from ad_miner.sources.modules.graph_engine import (
+    GraphSnapshot,
+    shortest_paths_to_targets,
+)
+
+RATINGS_PATH = (
+    Path(__file__).parents[1]
+    / "ad_miner"
+    / "sources"
+    / "modules"
+    / "exploitability_ratings.json"
+)
+
+
+def load_ratings():
+    with open(RATINGS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_weighted_path_differs_from_breadth_first_path():
+    # 1 -> 4 directly through an expensive relation, or through 2 and 3
+    # with cheap ones
+    snapshot = GraphSnapshot(
+        [
+            (1, 4, "AddAllowedToAct"),
+            (1, 2, "AdminTo"),
+            (2, 3, "AdminTo"),
+            (3, 4, "AdminTo"),
+        ]
+    )
+    relation_types = ["AddAllowedToAct", "AdminTo"]
+    weights = snapshot.relation_weights(load_ratings())
+
+    bfs = list(shortest_paths_to_targets(snapshot, [1], {4: [4]}, relation_types, 5))
+    dijkstra = list(
+        shortest_paths_to_targets(snapshot, [1], {4: [4]}, relation_types, 5, weights)
+    )
+    assert bfs == [([1, 4], ["AddAllowedToAct", ""])]
+    assert dijkstra == [([1, 2, 3, 4], ["AdminTo", "AdminTo", "AdminTo", ""])]
+
+
+def brute_force_distances(edges, source, targets, relation_types, max_depth):
+    """Length of the shortest path from source to any target, following
+    the allowed relation types forward (None if none within max_depth)"""
+    frontier = {source}
+    seen = {source}
+    for depth in range(1, max_depth + 1):
+        frontier = {
+            target
+            for node in frontier
+            for start, target, relation_type in edges
+            if start == node and relation_type in relation_types
+        } - seen
+        if frontier & set(targets):
+            return depth
+        seen |= frontier
+    return None
+
+
+def check_path(edges, node_ids, relation_types, relations):
+    assert relation_types[-1] == ""
+    for i in range(len(node_ids) - 1):
+        assert relation_types[i] in relations
+        assert (node_ids[i], node_ids[i + 1], relation_types[i]) in edges
+
+
+def random_edges(generator, nb_nodes, nb_edges, types):
+    return {
+        (
+            generator.randrange(nb_nodes),
+            generator.randrange(nb_nodes),
+            generator.choice(types),
+        )
+        for _ in range(nb_edges)
+    }
+
+
+def test_native_paths_match_brute_force_bfs():
+    generator = random.Random(0)
+    types = ["MemberOf", "AdminTo", "GenericAll"]
+    for _ in range(30):
+        edges = random_edges(generator, 30, generator.randint(10, 80), types)
+        snapshot = GraphSnapshot(sorted(edges))
+        relations = generator.sample(types, 2)
+        max_depth = generator.randint(1, 5)
+        targets = generator.sample(range(30), 3)
+        sources = [node for node in range(30) if node not in targets]
+
+        found = {}
+        for node_ids, relation_types in shortest_paths_to_targets(
+            snapshot, sources, {0: targets}, relations, max_depth
+        ):
+            check_path(edges, node_ids, relation_types, relations)
+            assert node_ids[-1] in targets
+            found[node_ids[0]] = len(node_ids) - 1
+
+        for source in sources:
+            expected = brute_force_distances(
+                edges, source, targets, relations, max_depth
+            )
+            assert found.get(source) == expected, source
+
+
+def test_max_depth_cutoff():
+    snapshot = GraphSnapshot(
+        [(1, 2, "MemberOf"), (2, 3, "MemberOf"), (3, 4, "MemberOf")]
+    )
+    paths = shortest_paths_to_targets(snapshot, [1, 2, 3], {4: [4]}, ["MemberOf"], 2)
+    assert sorted(node_ids[0] for node_ids, _ in paths) == [2, 3]
+
+
+def test_relation_mask():
+    snapshot = GraphSnapshot(
+        [(1, 3, "GenericAll"), (1, 2, "MemberOf"), (2, 3, "MemberOf")]
+    )
+    assert snapshot.relation_mask(["MemberOf", "Unknown"]).tolist() == [False, True]
+    assert list(
+        shortest_paths_to_targets(snapshot, [1], {3: [3]}, ["MemberOf"], 5)
+    ) == [([1, 2, 3], ["MemberOf", "MemberOf", ""])]
+    assert (
+        list(shortest_paths_to_targets(snapshot, [1], {3: [3]}, ["AdminTo"], 5)) == []
+    )
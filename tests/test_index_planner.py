@@ -0,0 +1,28 @@
+import json
+from pathlib import Path
+
+from ad_miner.sources.modules.index_planner import plan_indexes, query_predicates
+
+REQUESTS_PATH = (
+    Path(__file__).parents[1] / "ad_miner" / "sources" / "modules" / "requests.json"
+)
+
+
+def test_assigned_properties_are_not_indexed():
+    indexable, unlabeled = query_predicates(
+        "MATCH (g:Group{is_dag:true}) WHERE g.name STARTS WITH 'A' "
+        "SET g.is_admin=true, g.da_type='DA' RETURN g"
+    )
+    assert indexable == {("Group", "is_dag"), ("Group", "name")}
+    assert unlabeled == set()
+
+
+def test_labeled_flags_are_planned():
+    with open(REQUESTS_PATH, encoding="utf-8") as f:
+        requests = json.load(f)
+    del requests["template"]
+    indexable, unlabeled = plan_indexes(requests)
+    assert ("Group", "is_dag") in indexable
+    assert ("Computer", "is_dc") in indexable
+    assert "path_candidate" in unlabeled
+    assert not any(key == "has_path_to_da" for _, key in indexable)
@@ -0,0 +1,74 @@
+import random
+
+from ad_miner.sources.modules.membership_closure import (
+    MembershipClosure,
+    strongly_connected_components,
+)
+
+
+def brute_force_closure(edges):
+    """Groups reachable from every member through MemberOf*1.."""
+    adjacency = {}
+    for member, group in edges:
+        adjacency.setdefault(member, set()).add(group)
+    closure = {}
+    for member in adjacency:
+        reached = set()
+        stack = list(adjacency[member])
+        while stack:
+            group = stack.pop()
+            if group not in reached:
+                reached.add(group)
+                stack.extend(adjacency.get(group, ()))
+        closure[member] = sorted(reached)
+    return closure
+
+
+def test_nested_groups():
+    # user 1 -> group 10 -> group 20 -> group 30
+    closure = MembershipClosure([(1, 10), (10, 20), (20, 30), (2, 20)])
+    assert list(closure.groups_of(1)) == [10, 20, 30]
+    assert list(closure.groups_of(2)) == [20, 30]
+    assert list(closure.groups_of(30)) == []
+    assert closure.is_member(1, 30)
+    assert not closure.is_member(2, 10)
+    assert list(closure.members_of(30)) == [1, 2, 10, 20]
+    assert closure.nb_pairs == 3 + 2 + 2 + 1
+
+
+def test_cycle_members_include_themselves():
+    # groups 10, 11 and 12 are members of each other, 12 is in 20
+    closure = MembershipClosure([(10, 11), (11, 12), (12, 10), (12, 20), (1, 10)])
+    for group in (10, 11, 12):
+        assert list(closure.groups_of(group)) == [10, 11, 12, 20]
+        assert closure.is_member(group, group)
+    assert closure.groups_of(10) is closure.groups_of(11)
+    assert list(closure.groups_of(1)) == [10, 11, 12, 20]
+
+
+def test_principals_with_the_same_groups_share_an_array():
+    closure = MembershipClosure([(1, 10), (1, 11), (2, 11), (2, 10), (3, 10)])
+    assert closure.groups_of(1) is closure.groups_of(2)
+    assert closure.groups_of(1) is not closure.groups_of(3)
+    assert list(closure.groups_of(1)) == [10, 11]
+
+
+def test_components_are_yielded_sinks_first():
+    adjacency = {1: [2], 2: [3], 3: [2, 4], 4: []}
+    components = [sorted(c) for c in strongly_connected_components(adjacency)]
+    assert components == [[4], [2, 3], [1]]
+
+
+def test_random_graphs_match_brute_force():
+    generator = random.Random(0)
+    for _ in range(50):
+        nb_nodes = generator.randint(2, 40)
+        edges = [
+            (generator.randrange(nb_nodes), generator.randrange(nb_nodes))
+            for _ in range(generator.randint(1, 80))
+        ]
+        closure = MembershipClosure(edges)
+        expected = brute_force_closure(edges)
+        for member, groups in expected.items():
+            assert list(closure.groups_of(member)) == groups
+        assert closure.nb_pairs == sum(len(groups) for groups in expected.values())
@@ -0,0 +1,67 @@
+import pickle
+
+import pytest
+
+from ad_miner.sources.modules.path_store import PathStore, write_shard
+
+
+def path_tuple(start, length):
+    return [
+        (start + i, "User", "U%d" % (start + i), "DOMAIN.LOCAL", None, "MemberOf")
+        for i in range(length)
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PathStore(str(tmp_path))
+    shards = [
+        [path_tuple(0, 2), path_tuple(10, 3)],
+        [],
+        [path_tuple(20, 1), path_tuple(30, 2), path_tuple(40, 4)],
+    ]
+    for shard, paths in enumerate(shards):
+        store.add_shard(write_shard(str(tmp_path), shard, paths))
+    return store
+
+
+def first_ids(paths):
+    return [path.nodes[0].id for path in paths]
+
+
+def test_iteration_and_indexing(store):
+    assert len(store) == 5
+    assert first_ids(store) == [0, 10, 20, 30, 40]
+    assert first_ids(store[i] for i in range(len(store))) == first_ids(store)
+    assert store[-1] == list(store)[-1]
+    with pytest.raises(IndexError):
+        store[5]
+
+
+def test_indexing_in_order_reads_each_shard_once(store, monkeypatch):
+    loaded = []
+    load = PathStore._load
+
+    def counting_load(self, shard, name, typecode):
+        loaded.append(shard)
+        return load(self, shard, name, typecode)
+
+    monkeypatch.setattr(PathStore, "_load", counting_load)
+    for i in range(len(store)):
+        store[i]
+    # ids, relations and offsets of shards 0 and 2
+    assert loaded == [0, 0, 0, 2, 2, 2]
+
+
+def test_selection(store):
+    selection = store.select([1, 3, 4])
+    assert len(selection) == 3
+    assert first_ids(selection) == [10, 30, 40]
+    assert selection[-1] == store[4]
+
+
+def test_pickle_keeps_no_shard(store):
+    store[0]
+    copy = pickle.loads(pickle.dumps(store.select([0, 2])))
+    assert copy.store._cached_shard is None
+    assert first_ids(copy) == [0, 20]
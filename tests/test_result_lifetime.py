@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+from ad_miner.sources.modules.result_lifetime import DERIVED_RESULTS, ResultLifetime
+
+
+class MemoryCache:
+    def __init__(self):
+        self.entries = {}
+
+    def createCacheEntry(self, filename, data):
+        self.entries[filename] = data
+
+    def retrieveCacheEntry(self, filename):
+        return self.entries.get(filename, False)
+
+
+def lifetime_of(requests_results, controls):
+    neo4j = SimpleNamespace(
+        all_requests={
+            "objects_to_domain_admin": {"result": ["path"]},
+            "domains": {"result": [["DOMAIN.LOCAL"]]},
+        },
+        cache=MemoryCache(),
+    )
+    neo4j.cache.entries["objects_to_domain_admin"] = ["path"]
+    return ResultLifetime(neo4j, requests_results, controls, ["domains"])
+
+
+def test_derived_results_are_released_with_their_request():
+    derived_keys = DERIVED_RESULTS["objects_to_domain_admin"]
+    requests_results = {"objects_to_domain_admin": ["path"], "domains": []}
+    requests_results.update({key: {"DOMAIN.LOCAL": ["path"]} for key in derived_keys})
+    reader = SimpleNamespace(request_keys=["objects_to_domain_admin"])
+    lifetime = lifetime_of(requests_results, [reader])
+
+    lifetime.release_unused()
+    assert requests_results["users_to_domain_admin"] is not None
+
+    lifetime.control_done(0)
+    for key in ["objects_to_domain_admin"] + derived_keys:
+        assert requests_results[key] is None
+        assert lifetime.get(key) is not None
+    assert lifetime.get("dico_users_to_da") == {"DOMAIN.LOCAL": ["path"]}
+    assert lifetime.get("domains") == [["DOMAIN.LOCAL"]]
+
+
+def test_unreleased_derived_result_is_read_from_requests_results():
+    requests_results = {"objects_to_domain_admin": ["path"], "dico_users_to_da": {}}
+    lifetime = lifetime_of(requests_results, [])
+    assert lifetime.get("dico_users_to_da") == {}
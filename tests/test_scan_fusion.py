@@ -0,0 +1,396 @@
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from ad_miner.sources.modules.scan_fusion import (
+    FUSED_REQUESTS,
+    PRESENCE_ONLY_PROPERTIES,
+    ScannedNode,
+    hashable,
+)
+
+EXTRACT_DATE = 1700000000
+PASSWORD_RENEWAL = 90
+
+# Minimal cypher: the single node requests of FUSED_REQUESTS, evaluated with
+# the null semantics of neo4j, to check the fused version against the text
+# of the request instead of against a second python implementation
+QUERY = re.compile(
+    r"^\s*MATCH\s*(?:\w+\s*=\s*)?\((\w+):(\w+)\s*(?:\{([^}]*)\})?\s*\)"
+    r"\s*(?:WHERE\s+(.*?))?\s*RETURN\s+(.*?)(?:\s+ORDER\s+BY\s+(.*?))?\s*$",
+    re.S | re.I,
+)
+TOKEN = re.compile(
+    r"\s*(?:('[^']*'|\"[^\"]*\")|(\d+(?:\.\d+)?)|(\w+)|(<>|<=|>=|[=<>+\-*/(),.:]))"
+)
+
+
+def tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        assert match is not None, text[position:]
+        string, number, word, symbol = match.groups()
+        if string is not None:
+            tokens.append(("literal", string[1:-1]))
+        elif number is not None:
+            tokens.append(("literal", float(number) if "." in number else int(number)))
+        elif word is not None:
+            tokens.append(("word", word))
+        else:
+            tokens.append(("symbol", symbol))
+        position = match.end()
+    return tokens
+
+
+def divide(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        quotient = abs(a) // abs(b)
+        return quotient if (a >= 0) == (b >= 0) else -quotient
+    return a / b
+
+
+def compare(operator, a, b):
+    if a is None or b is None:
+        return None
+    if isinstance(a, bool) != isinstance(b, bool):
+        return False if operator in ("=", "<>") else None
+    if operator == "=":
+        return a == b
+    if operator == "<>":
+        return a != b
+    if isinstance(a, str) != isinstance(b, str):
+        return None
+    return {
+        "<": a < b,
+        ">": a > b,
+        "<=": a <= b,
+        ">=": a >= b,
+    }[operator]
+
+
+def string_predicate(operator, a, b):
+    if not isinstance(a, str) or not isinstance(b, str):
+        return None
+    if operator == "STARTS":
+        return a.startswith(b)
+    if operator == "ENDS":
+        return a.endswith(b)
+    return b in a
+
+
+def to_integer(value):
+    if value is None:
+        return None
+    return int(value)
+
+
+def to_string(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+FUNCTIONS = {
+    "coalesce": lambda *values: next((v for v in values if v is not None), None),
+    "tointeger": to_integer,
+    "tostring": to_string,
+    "toupper": lambda value: None if value is None else value.upper(),
+}
+CONSTANTS = {"true": True, "false": False, "null": None}
+
+
+class Parser:
+    """Expression of a request as a function of the node properties"""
+
+    def __init__(self, text, variable):
+        self.tokens = tokenize(text)
+        self.variable = variable
+        self.position = 0
+
+    def peek(self, offset=0):
+        if self.position + offset < len(self.tokens):
+            return self.tokens[self.position + offset]
+        return (None, None)
+
+    def keyword(self, *words):
+        for offset, word in enumerate(words):
+            kind, value = self.peek(offset)
+            if kind != "word" or value.upper() != word:
+                return False
+        self.position += len(words)
+        return True
+
+    def symbol(self, *symbols):
+        kind, value = self.peek()
+        if kind == "symbol" and value in symbols:
+            self.position += 1
+            return value
+        return None
+
+    def parse(self):
+        expression = self.conjunction()
+        assert self.position == len(self.tokens), self.tokens[self.position :]
+        return expression
+
+    def conjunction(self):
+        operands = [self.negation()]
+        while self.keyword("AND"):
+            operands.append(self.negation())
+        if len(operands) == 1:
+            return operands[0]
+
+        def evaluate(node):
+            values = [operand(node) for operand in operands]
+            if False in values:
+                return False
+            return None if None in values else True
+
+        return evaluate
+
+    def negation(self):
+        if self.keyword("NOT"):
+            operand = self.negation()
+            return lambda node: None if operand(node) is None else not operand(node)
+        return self.comparison()
+
+    def comparison(self):
+        left = self.additive()
+        operator = self.symbol("=", "<>", "<", ">", "<=", ">=")
+        if operator is not None:
+            right = self.additive()
+            return lambda node: compare(operator, left(node), right(node))
+        for words in (("STARTS", "WITH"), ("ENDS", "WITH"), ("CONTAINS",)):
+            if self.keyword(*words):
+                right = self.additive()
+                return lambda node: string_predicate(words[0], left(node), right(node))
+        if self.keyword("IS", "NOT", "NULL"):
+            return lambda node: left(node) is not None
+        if self.keyword("IS", "NULL"):
+            return lambda node: left(node) is None
+        return left
+
+    def additive(self):
+        left = self.multiplicative()
+        while self.symbol("-"):
+            right = self.multiplicative()
+            left = (
+                lambda l, r: lambda node: (
+                    None if l(node) is None or r(node) is None else l(node) - r(node)
+                )
+            )(left, right)
+        return left
+
+    def multiplicative(self):
+        left = self.primary()
+        while self.symbol("/"):
+            right = self.primary()
+            left = (
+                lambda l, r: lambda node: (
+                    None
+                    if l(node) is None or r(node) is None
+                    else divide(l(node), r(node))
+                )
+            )(left, right)
+        return left
+
+    def primary(self):
+        kind, value = self.peek()
+        self.position += 1
+        if kind == "literal":
+            return lambda node: value
+        if kind == "symbol" and value == "(":
+            expression = self.conjunction()
+            assert self.symbol(")")
+            return expression
+        assert kind == "word", value
+        if value.lower() in CONSTANTS:
+            return lambda node: CONSTANTS[value.lower()]
+        if self.symbol("("):
+            arguments = [self.conjunction()]
+            while self.symbol(","):
+                arguments.append(self.conjunction())
+            assert self.symbol(")")
+            function = FUNCTIONS[value.lower()]
+            return lambda node: function(*(argument(node) for argument in arguments))
+        assert value == self.variable and self.symbol("."), value
+        _, name = self.peek()
+        self.position += 1
+        return lambda node: node.get(name)
+
+
+def split_items(text):
+    """Comma separated items, outside of parentheses and strings"""
+    items, depth, quote, start = [], 0, None, 0
+    for i, character in enumerate(text):
+        if quote:
+            quote = None if character == quote else quote
+        elif character in "'\"`":
+            quote = character
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "," and depth == 0:
+            items.append(text[start:i].strip())
+            start = i + 1
+    items.append(text[start:].strip())
+    return items
+
+
+def run_cypher(request, nodes, label, output_type):
+    query = request.replace("$extract_date$", str(EXTRACT_DATE)).replace(
+        "$password_renewal$", str(PASSWORD_RENEWAL)
+    )
+    variable, node_label, inline, where, returned, order = QUERY.match(query).groups()
+    assert node_label == label
+
+    conditions = []
+    for item in split_items(inline or ""):
+        if item:
+            name, value = item.split(":")
+            conditions.append(Parser("%s.%s = %s" % (variable, name, value), variable))
+    if where:
+        conditions.append(Parser(where, variable))
+    conditions = [condition.parse() for condition in conditions]
+
+    distinct = re.match(r"DISTINCT\b", returned, re.I) is not None
+    if distinct:
+        returned = returned[len("DISTINCT") :]
+    columns = []
+    for item in split_items(returned):
+        match = re.match(r"(.*?)\s+AS\s+(.*)$", item, re.S | re.I)
+        expression, name = match.groups() if match else (item, item)
+        columns.append(
+            (name.strip("`"), expression, Parser(expression, variable).parse())
+        )
+
+    rows = []
+    seen = set()
+    for node in nodes:
+        if not all(condition(node) is True for condition in conditions):
+            continue
+        row = {name: value(node) for name, _, value in columns}
+        if distinct:
+            if hashable(list(row.values())) in seen:
+                continue
+            seen.add(hashable(list(row.values())))
+        rows.append(row)
+
+    order_by = None
+    if order:
+        key, descending = re.match(r"(.*?)(\s+DESC)?$", order.strip(), re.I).groups()
+        order_by = next(
+            name
+            for name, expression, _ in columns
+            if key in (name, expression.strip().strip("()").strip())
+        )
+        # null is the largest value: last ascending, first descending
+        rows.sort(
+            key=lambda row: (row[order_by] is None, row[order_by]),
+            reverse=descending is not None,
+        )
+    if output_type is list:
+        return order_by, [list(row.values()) for row in rows]
+    return order_by, rows
+
+
+def random_node(generator):
+    def timestamp():
+        return generator.choice(
+            [
+                None,
+                EXTRACT_DATE - generator.randrange(400 * 86400),
+                EXTRACT_DATE - generator.randrange(400 * 86400) + 0.5,
+                EXTRACT_DATE + generator.randrange(3 * 86400),
+            ]
+        )
+
+    flag = lambda: generator.choice([True, False, None])  # noqa: E731
+    node = {
+        "domain": generator.choice(["A.LOCAL", "B.LOCAL", None]),
+        "name": generator.choice(
+            ["KRBTGT@A.LOCAL", "ADMIN@A.LOCAL", "SRV01.B.LOCAL", "BOB@B.LOCAL", None]
+        ),
+        "operatingsystem": generator.choice(
+            ["Windows Server 2019", "windows 10", "Linux", None]
+        ),
+        "objectid": generator.choice(["S-1-5-21-1-501", "S-1-5-21-1-500", None]),
+        "serviceprincipalnames": generator.choice([None, ["HTTP/a"], ["HTTP/a", "b"]]),
+        "userpassword": generator.choice([None, "secret"]),
+        "gmsa": generator.choice([None, True]),
+        "da_type": generator.choice([None, "DA"]),
+        "fgpp_name": generator.choice([None, "pso"]),
+    }
+    for name in [
+        "enabled",
+        "is_dc",
+        "is_da",
+        "hasspn",
+        "dontreqpreauth",
+        "unconstraineddelegation",
+        "passwordnotreqd",
+        "pwdneverexpires",
+        "admincount",
+        "ghost_computer",
+        "haslaps",
+    ]:
+        node[name] = flag()
+    for name in ["lastlogontimestamp", "pwdlastset", "whencreated"]:
+        node[name] = timestamp()
+    for name in [
+        "fgpp_msds_psoappliesto",
+        "fgpp_msds_minimumpasswordlength",
+        "fgpp_msds_minimumpasswordage",
+        "fgpp_msds_maximumpasswordage",
+        "fgpp_msds_passwordreversibleencryptionenabled",
+        "fgpp_msds_passwordhistorylength",
+        "fgpp_msds_passwordcomplexityenabled",
+        "fgpp_msds_lockoutduration",
+        "fgpp_msds_lockoutthreshold",
+        "fgpp_msds_lockoutobservationwindow",
+    ]:
+        node[name] = generator.choice([None, 0, 14])
+    return node
+
+
+def scanned(node, properties):
+    """ScannedNode of the row returned by scan_query for node"""
+    row = {}
+    for name in properties:
+        if name in PRESENCE_ONLY_PROPERTIES:
+            row["has_" + name] = node.get(name) is not None
+        else:
+            row[name] = node.get(name)
+    return ScannedNode(row, EXTRACT_DATE, PASSWORD_RENEWAL)
+
+
+@pytest.mark.parametrize("request_key", sorted(FUSED_REQUESTS))
+@pytest.mark.parametrize("output_type", [list, dict])
+def test_fused_requests_match_their_cypher(request_key, output_type):
+    fused = FUSED_REQUESTS[request_key]
+    generator = random.Random(request_key)
+    nodes = [random_node(generator) for _ in range(300)]
+
+    order_by, expected = run_cypher(fused.request, nodes, fused.label, output_type)
+    rows = fused.evaluate(
+        [scanned(node, fused.properties) for node in nodes], output_type
+    )
+    assert expected, request_key
+
+    # Rows with the same sort key may come in any order
+    assert Counter(map(hashable, rows)) == Counter(map(hashable, expected))
+    assert fused.order_by == order_by
+    if order_by is not None:
+        column = (
+            [name for name, _ in fused.columns].index(order_by)
+            if output_type is list
+            else order_by
+        )
+        assert [row[column] for row in rows] == [row[column] for row in expected]